@@ -0,0 +1,161 @@
+"""
+Admission control for app.asgi_app (ADMISSION_LIMITS). Each request belongs to a route group:
+
+- reports: /v2/report/... and /v2/metrics/... (report and dashboard queries)
+- writes:  any other request that is not GET / HEAD / OPTIONS
+- reads:   everything else (GET /metrics itself is never limited)
+
+A group runs at most its limit of requests at once in a worker. Further requests wait in a FIFO
+queue of bounded length, each for at most ADMISSION_QUEUE_TIMEOUT seconds. A request that finds
+the queue full, or whose wait times out, is answered at once with a 429, a Retry-After header and
+the usual error body. Overload then shows up as fast 429s and bounded latency instead of a backlog
+that grows until clients time out. Queue depth, running requests, waits and rejections are
+exported in /metrics.
+"""
+import json
+import time
+import asyncio
+from collections import deque
+
+import metrics
+from config import ADMISSION_LIMITS, ADMISSION_QUEUE, ADMISSION_QUEUE_TIMEOUT, ADMISSION_RETRY_AFTER
+
+GROUPS = ("reports", "writes", "reads")
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def parse_groups(spec):
+    """ "reports=4,writes=16" -> {"reports": 4, "writes": 16}. ValueError for unknown groups or bad numbers."""
+    out = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, sep, value = part.partition("=")
+        name = name.strip()
+        if not sep or name not in GROUPS:
+            raise ValueError(f"invalid admission group {part!r}; expected <group>=<n> with group in {GROUPS}")
+        out[name] = int(value)
+    return out
+
+
+def route_group(scope):
+    """Route group of an ASGI http scope, or None for requests that are never limited."""
+    path = scope["path"]
+    if path == "/metrics":
+        return None
+    if path.startswith(("/v2/report/", "/v2/metrics/")):
+        return "reports"
+    return "reads" if scope["method"] in READ_METHODS else "writes"
+
+
+class _Group:
+    def __init__(self, name, limit, queue):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.labels = (("group", name),)
+        self.active = 0
+        self.waiting = 0
+        self.waiters = deque()
+
+
+def _expire(fut):
+    if not fut.done():
+        fut.set_result(False)
+
+
+class Admission:
+    """Per-group concurrency limits with bounded wait queues, for one event loop."""
+
+    def __init__(self, limits, queues=None, timeout=ADMISSION_QUEUE_TIMEOUT, retry_after=ADMISSION_RETRY_AFTER):
+        queues = queues or {}
+        self.groups = {
+            name: _Group(name, limit, queues.get(name, 4 * limit)) for name, limit in limits.items() if limit > 0
+        }
+        self.timeout = timeout
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_config(cls):
+        """Admission from ADMISSION_* settings, or None when no group is limited."""
+        limits = parse_groups(ADMISSION_LIMITS)
+        if not any(limit > 0 for limit in limits.values()):
+            return None
+        return cls(limits, parse_groups(ADMISSION_QUEUE))
+
+    def group(self, scope):
+        """The limited _Group of a request, or None."""
+        name = route_group(scope)
+        return self.groups.get(name) if name else None
+
+    async def acquire(self, group):
+        """Wait for a slot in group. Returns None once admitted, else the rejection reason."""
+        start = time.perf_counter()
+        if group.active < group.limit and not group.waiting:
+            self._admit(group, start)
+            return None
+        if group.waiting >= group.queue:
+            return self._reject(group, "queue_full")
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        timer = loop.call_later(self.timeout, _expire, fut)
+        group.waiters.append(fut)
+        group.waiting += 1
+        metrics.add("admission_queue_depth", group.labels, 1)
+        try:
+            admitted = await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled() and fut.result():
+                # The slot was handed over just before the client went away: pass it on.
+                self._hand_on(group)
+            else:
+                fut.cancel()
+            raise
+        finally:
+            timer.cancel()
+            group.waiting -= 1
+            metrics.add("admission_queue_depth", group.labels, -1)
+        if not admitted:
+            return self._reject(group, "timeout")
+        # release() handed its slot over: group.active already counts this request.
+        metrics.add("admission_active_requests", group.labels, 1)
+        metrics.observe("admission_wait_seconds", group.labels, time.perf_counter() - start)
+        return None
+
+    def _admit(self, group, start):
+        group.active += 1
+        metrics.add("admission_active_requests", group.labels, 1)
+        metrics.observe("admission_wait_seconds", group.labels, time.perf_counter() - start)
+
+    def _reject(self, group, reason):
+        metrics.add("admission_rejected_total", group.labels + (("reason", reason),), 1)
+        return reason
+
+    def release(self, group):
+        """End an admitted request: its slot goes to the oldest waiter, if any."""
+        metrics.add("admission_active_requests", group.labels, -1)
+        self._hand_on(group)
+
+    def _hand_on(self, group):
+        while group.waiters:
+            fut = group.waiters.popleft()
+            if not fut.done():
+                fut.set_result(True)
+                return
+        group.active -= 1
+
+    async def send_rejection(self, send, group, reason):
+        if reason == "queue_full":
+            details = f"Too many {group.name} requests are queued. Retry after {self.retry_after} second(s)."
+        else:
+            details = f"No {group.name} slot was free within {self.timeout:g} second(s). Retry after {self.retry_after} second(s)."
+        body = json.dumps({"error": {"code": "429", "message": "Too many requests", "details": details}}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"retry-after", str(self.retry_after).encode("ascii")),
+                (b"access-control-allow-origin", b"*"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,10 +1,14 @@
 import os
 from flask import Flask, jsonify, Response
 from flask_cors import CORS
-from asgiref.wsgi import WsgiToAsgi
 
 from config import BASE_URL
 from cache_config import cache
+import metrics
+from asgi import AsyncApp
+from admission import Admission
+from profiling import ProfilingMiddleware
+from capture import CaptureMiddleware
 from data_store import get_vtt_for_meeting
 from routes.users import users_bp
 from routes.meetings import meetings_bp
@@ -23,10 +27,20 @@ from routes.roles import roles_bp
 from routes.groups import groups_bp
 from routes.tracking_fields import tracking_fields_bp
 from routes.rooms import rooms_bp
+from routes.cache import cache_bp
+from routes.debug import debug_bp
+from routes.emulation import emulation_bp
 
 app = Flask(__name__)
 CORS(app)
 cache.init_app(app)
+# Each server run starts with an empty shared tier: what an earlier run cached (responses, tag
+# versions) may describe data that was edited, replaced or moved to another backend since.
+# serve.py imports the app once, before forking, and clears it again on SIGHUP.
+cache.clear()
+app.wsgi_app = ProfilingMiddleware(app.wsgi_app)
+metrics.init_app(app)
+app.wsgi_app = CaptureMiddleware(app.wsgi_app)
 
 # Base URL for API: https://api.zoom.us/v2/ (Zoom API reference)
 app.register_blueprint(users_bp, url_prefix="/v2")
@@ -46,6 +60,9 @@ app.register_blueprint(roles_bp, url_prefix="/v2")
 app.register_blueprint(groups_bp, url_prefix="/v2")
 app.register_blueprint(tracking_fields_bp, url_prefix="/v2")
 app.register_blueprint(rooms_bp, url_prefix="/v2")
+app.register_blueprint(cache_bp, url_prefix="/v2")
+app.register_blueprint(debug_bp, url_prefix="/v2")
+app.register_blueprint(emulation_bp, url_prefix="/v2")
 
 # Recording transcript download and cache (under /v2 to match Zoom base URL)
 @app.route("/v2/rec/download/<path:path>", methods=["GET"])
@@ -59,23 +76,6 @@ def download_vtt(path):
         return jsonify({"error": {"code": "404", "message": "VTT not found", "details": f"No transcript for meeting: {meeting_id}"}}), 404
     return Response(vtt_data, mimetype="text/vtt")
 
-@app.route("/v2/cache/clear", methods=["POST"])
-def clear_cache():
-    try:
-        cache.clear()
-        return jsonify({"message": "Cache cleared successfully"}), 200
-    except Exception as e:
-        return jsonify({"error": {"code": "500", "message": str(e)}}), 500
-
-
-@app.route("/v2/cache/clear/<key>", methods=["POST"])
-def clear_cache_key(key):
-    try:
-        cache.delete(key)
-        return jsonify({"message": f"Cache key {key} cleared"}), 200
-    except Exception as e:
-        return jsonify({"error": {"code": "500", "message": str(e)}}), 500
-
 
 @app.errorhandler(404)
 def not_found(e):
@@ -84,7 +84,7 @@ def not_found(e):
     }), 404
 
 
-asgi_app = WsgiToAsgi(app)
+asgi_app = AsyncApp(app, admission=Admission.from_config())
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,290 @@
+"""
+ASGI front of the Flask app (app.asgi_app).
+
+asgiref's WsgiToAsgi runs every request on one shared thread and hops back to the event loop
+for each message it sends, so under concurrency requests queue behind each other long before
+the CPU is busy. AsyncApp instead:
+
+- serves cached responses of the hot GET views natively: the route is matched with Flask's URL
+  map on the event loop, and the blocking part (entity validators and the cache lookup, see
+  cache_tags.cached_response) runs as one call on a bounded executor. The response carries the
+  same body and headers the Flask view would send, and is counted in /metrics under the same
+  endpoint. Cache misses and requests that need more than a plain lookup (conditional requests,
+  CORS, Server-Timing, profiling, capture, auth errors) go through Flask;
+- runs everything else through the full WSGI stack on the same executor (ASGI_EXECUTOR_WORKERS
+  threads), one call to start the response and one per further 64 KiB of streamed body.
+
+Before that, a request passes the emulated Zoom rate limits and latency (emulation.py) and, with an
+Admission (admission.py), waits for a slot of its route group or is answered 429 right away.
+"""
+import io
+import os
+import sys
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import http_date, quote_etag
+
+import metrics
+import timing
+from cache_tags import cached_404, cached_response
+from emulation import emulate
+from models.conditional import validators
+from projection import parse_fields
+from config import (
+    ASGI_EXECUTOR_WORKERS, ASGI_NATIVE_ROUTES, SERVER_TIMING, CAPTURE_ENABLED, PROFILING_ENABLED,
+)
+
+# Pull about this much of a streamed body per executor call.
+CHUNK_BYTES = 64 * 1024
+
+# A request carrying any of these needs Flask: validators, flask-cors, Server-Timing, profiling.
+_FLASK_HEADERS = {b"if-none-match", b"if-modified-since", b"origin", b"x-server-timing", b"x-profile"}
+
+
+def _environ(scope, body):
+    """WSGI environ for an ASGI http scope (as asgiref builds it)."""
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf8").decode("latin1"),
+        "PATH_INFO": scope["path"].encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope["query_string"].decode("ascii"),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    server = scope.get("server") or ("localhost", 80)
+    environ["SERVER_NAME"] = server[0]
+    environ["SERVER_PORT"] = str(server[1])
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin1")
+        if name == "content-length":
+            key = "CONTENT_LENGTH"
+        elif name == "content-type":
+            key = "CONTENT_TYPE"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        value = value.decode("latin1")
+        if key in environ:
+            value = environ[key] + "," + value
+        environ[key] = value
+    return environ
+
+
+def _fields(query_string):
+    """requested_fields of a raw query string: the first fields= value, as request.args.get reads it."""
+    if "fields=" not in query_string:
+        return None
+    for name, value in parse_qsl(query_string, keep_blank_values=True, errors="werkzeug.url_quote"):
+        if name == "fields":
+            return parse_fields(value)
+    return None
+
+
+def _pull(it, body):
+    """Up to about CHUNK_BYTES of body: (chunks, (it, body)), or (chunks, None) once it is exhausted and closed."""
+    chunks = []
+    size = 0
+    try:
+        while size < CHUNK_BYTES:
+            try:
+                chunk = next(it)
+            except StopIteration:
+                _close(body)
+                return chunks, None
+            if chunk:
+                chunks.append(chunk)
+                size += len(chunk)
+    except BaseException:
+        _close(body)
+        raise
+    return chunks, (it, body)
+
+
+def _close(body):
+    if hasattr(body, "close"):
+        body.close()
+
+
+class AsyncApp:
+    """ASGI application serving flask_app (see the module docstring)."""
+
+    def __init__(self, flask_app, workers=ASGI_EXECUTOR_WORKERS, native=ASGI_NATIVE_ROUTES, admission=None, emulation=True):
+        self.flask_app = flask_app
+        self.admission = admission
+        self.emulation = emulation
+        self.workers = workers
+        self.native = native
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._urls = None
+
+    def executor(self):
+        """The bounded executor of this process (a new one after a fork)."""
+        if self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="asgi")
+                    self._executor_pid = os.getpid()
+                    self._urls = self.flask_app.url_map.bind("localhost")
+        return self._executor
+
+    async def run_blocking(self, fn, *args):
+        """Run fn(*args) on the executor."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor(), fn, *args)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise ValueError(f"unsupported ASGI scope type {scope['type']!r}")
+        self.executor()
+        if self.emulation and await emulate(self._urls, scope, send):
+            return
+        group = self.admission.group(scope) if self.admission else None
+        if group is not None:
+            rejected = await self.admission.acquire(group)
+            if rejected:
+                await self.admission.send_rejection(send, group, rejected)
+                return
+        try:
+            if self.native and await self._native(scope, send):
+                return
+            await self._wsgi(scope, receive, send)
+        finally:
+            if group is not None:
+                self.admission.release(group)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._executor is not None and self._executor_pid == os.getpid():
+                    await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # ---- native routes ----
+    def _route(self, scope):
+        """(endpoint, view, view args) of a plain GET to a cached view, or None."""
+        if scope["method"] != "GET" or scope.get("root_path") or SERVER_TIMING or CAPTURE_ENABLED:
+            return None
+        auth = None
+        for name, value in scope["headers"]:
+            if name in _FLASK_HEADERS:
+                return None
+            if name == b"authorization":
+                auth = value
+        # require_auth's 401s are rendered by Flask.
+        if auth is None or not auth.startswith(b"Bearer "):
+            return None
+        if PROFILING_ENABLED and b"_profile=" in scope["query_string"]:
+            return None
+        try:
+            endpoint, kwargs = self._urls.match(scope["path"], "GET")
+        except HTTPException:
+            return None
+        view = self.flask_app.view_functions.get(endpoint)
+        if getattr(view, "cached_view", None) is None:
+            return None
+        return endpoint, view, kwargs
+
+    def _lookup(self, view, path, query_string, kwargs):
+        acc = timing.new_accumulator()
+        stack = timing.stack()
+        stack.append(acc)
+        try:
+            with self.flask_app.app_context():
+                conditional = getattr(view, "conditional_get", None)
+                if conditional is None:
+                    return cached_response(view, path, query_string, kwargs), None, acc
+                # A cached 404 is served without validators (no storage I/O).
+                hit = cached_404(view, path, query_string, kwargs)
+                if hit is not None:
+                    return hit, None, acc
+                # Validators before the lookup, so the body is never older than the ETag.
+                found = validators(conditional[0], kwargs.get(conditional[1]), _fields(query_string))
+                hit = cached_response(view, path, query_string, kwargs)
+        finally:
+            stack.pop()
+        return hit, found, acc
+
+    async def _native(self, scope, send):
+        """Send the cached response of a hot GET. False when the request has to go through Flask."""
+        route = self._route(scope)
+        if route is None:
+            return False
+        start = time.perf_counter()
+        endpoint, view, kwargs = route
+        query_string = scope["query_string"].decode("latin1")
+        hit, found, acc = await self.run_blocking(self._lookup, view, scope["path"], query_string, kwargs)
+        if hit is None:
+            return False
+        metrics.request_started(endpoint)
+        status, body, content_type = hit
+        headers = [(b"content-type", content_type.encode("latin1")), (b"content-length", str(len(body)).encode("ascii"))]
+        if found is not None and status == 200:
+            etag, last_modified = found
+            headers.append((b"etag", quote_etag(etag).encode("latin1")))
+            headers.append((b"last-modified", http_date(last_modified).encode("ascii")))
+        # What CORS(app) adds to a request without an Origin header.
+        headers.append((b"access-control-allow-origin", b"*"))
+        try:
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+        finally:
+            metrics.request_finished(endpoint, "GET", str(status), time.perf_counter() - start, 0, len(body), acc)
+        return True
+
+    # ---- everything else: the WSGI app ----
+    def _start(self, environ):
+        response = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response[:] = [
+                int(status.split(" ", 1)[0]),
+                [(name.lower().encode("latin1"), value.encode("latin1")) for name, value in headers],
+            ]
+            return lambda data: None
+
+        body = self.flask_app(environ, start_response)
+        chunks, rest = _pull(iter(body), body)
+        return response[0], response[1], chunks, rest
+
+    async def _wsgi(self, scope, receive, send):
+        data = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return
+            data.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        status, headers, chunks, rest = await self.run_blocking(self._start, _environ(scope, b"".join(data)))
+        try:
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            while rest is not None:
+                for chunk in chunks:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunks, rest = await self.run_blocking(_pull, *rest)
+            await send({"type": "http.response.body", "body": b"".join(chunks)})
+        finally:
+            if rest is not None:
+                await self.run_blocking(_close, rest[1])
@@ -1,10 +1,13 @@
 from flask_caching import Cache
 
-# Initialize cache without app
+from config import CACHE_TIMEOUT, CACHE_KEY_PREFIX, CACHE_DIR, CACHE_L1_MAX_BYTES, CACHE_L2_MAX_BYTES
+
+# Initialize cache without app. TieredCache is shared by the workers on one host (see tiered_cache.py).
 cache = Cache(config={
-    'CACHE_TYPE': 'simple',
-    'CACHE_DEFAULT_TIMEOUT': 3600,  # 1 hour in seconds
-    'CACHE_KEY_PREFIX': 'zoom_mock_'  # Add a prefix to avoid conflicts
+    'CACHE_TYPE': 'tiered_cache.TieredCache',
+    'CACHE_DEFAULT_TIMEOUT': CACHE_TIMEOUT,  # 1 hour in seconds
+    'CACHE_KEY_PREFIX': CACHE_KEY_PREFIX,  # Add a prefix to avoid conflicts
+    'CACHE_DIR': CACHE_DIR,
+    'CACHE_L1_MAX_BYTES': CACHE_L1_MAX_BYTES,
+    'CACHE_L2_MAX_BYTES': CACHE_L2_MAX_BYTES,
 })
-
-# Remove the init_cache function since we'll initialize directly in app.py 
\ No newline at end of file
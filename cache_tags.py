@@ -0,0 +1,225 @@
+"""
+Tag-versioned response caching for views.
+
+Each tag ("user:u1", "meetings:host:u1", "users", ...) has a current version stored in the shared
+cache. A cached response is keyed by the view, its path and query string and the versions of the
+tags it depends on. data_store reports every write as tags (see data_store.add_change_listener);
+invalidate() then drops those versions, so the next request computes under new ones and responses
+cached under the old versions are never served again (they age out of the cache). Versions expire
+after CACHE_TIMEOUT like the responses, and app.py starts every server run with an empty cache, so
+none outlives its run.
+
+Concurrent misses for the same key are coalesced (singleflight.py): one thread runs the view and
+the others reuse its rendered body. Views whose 404s are cheap to key (one entity id) can cache them
+too, so a storm of requests for a missing id never reaches data_store; creating the entity bumps
+its tag like any other write.
+
+Every cached view also depends on its own tag, "view:<module>.<name>", so all of its responses
+can be dropped at once (invalidate_views). Requests to single-entity views (cache_404) are counted
+per path; hottest_paths() feeds the warm-up endpoint.
+"""
+import uuid
+import itertools
+import threading
+from collections import Counter
+from functools import wraps
+from urllib.parse import parse_qsl, urlencode
+
+from flask import current_app, make_response, request
+
+import data_store
+from cache_config import cache
+from config import CACHE_TIMEOUT, NEGATIVE_CACHE_TIMEOUT, CACHE_MAX_STREAMED_BYTES
+from singleflight import SingleFlight
+from timing import phase
+
+TAG_KEY_PREFIX = "tag:"
+
+# Distinct paths counted before the counts are halved and the coldest dropped.
+HOT_MAX_PATHS = 10000
+
+_renders = SingleFlight()
+_views = {}  # view name -> {"hits", "misses", "coalesced"}
+_hot = Counter()
+_hot_lock = threading.Lock()
+
+
+def tag_version(tag):
+    """Current version of tag, starting a new one if it has none."""
+    key = TAG_KEY_PREFIX + tag
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex[:16]
+        # No longer than the responses cached under it: a version that missed an invalidation (or
+        # a change made to data/ behind the server's back) is retired after CACHE_TIMEOUT at most.
+        if not cache.add(key, version, timeout=CACHE_TIMEOUT):
+            version = cache.get(key) or version
+    return version
+
+
+def invalidate(*tags):
+    """Retire the current versions of tags in every worker."""
+    for tag in tags:
+        cache.delete(TAG_KEY_PREFIX + tag)
+
+
+data_store.add_change_listener(invalidate)
+
+
+def invalidate_views(prefix):
+    """Drop every cached response of the views whose name starts with prefix. Returns their names."""
+    names = sorted(name for name in _views if name.startswith(prefix))
+    invalidate(*(f"view:{name}" for name in names))
+    return names
+
+
+def view_stats():
+    """Per-view request counters of this process."""
+    return {name: dict(stats) for name, stats in sorted(_views.items())}
+
+
+def coalescing_stats():
+    """Renders run (leaders) and requests that waited for one instead (shared)."""
+    return {"leaders": _renders.leaders, "shared": _renders.shared}
+
+
+def hottest_paths(limit):
+    """The limit most requested single-entity paths of this process."""
+    with _hot_lock:
+        return [path for path, _ in _hot.most_common(limit)]
+
+
+def _count_hot(path):
+    with _hot_lock:
+        _hot[path] += 1
+        if len(_hot) > HOT_MAX_PATHS:
+            for p, n in list(_hot.items()):
+                if n // 2:
+                    _hot[p] = n // 2
+                else:
+                    del _hot[p]
+
+
+def cached_view(*tags, timeout=CACHE_TIMEOUT, cache_404=False):
+    """
+    Cache a view's 200 responses under the current versions of tags: str.format templates over the
+    view arguments, e.g. @cached_view("user:{user_id}", "users"). With cache_404, 404 responses
+    are kept for NEGATIVE_CACHE_TIMEOUT as well. Responses are rebuilt from status, body and
+    content type only. Streamed bodies are buffered up to CACHE_MAX_STREAMED_BYTES; a larger one
+    is streamed to the client that rendered it and not cached.
+    """
+    def decorator(f):
+        name = f"{f.__module__}.{f.__name__}"
+        stats = _views[name] = {"hits": 0, "misses": 0, "coalesced": 0}
+
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            with phase("cache"):
+                query = urlencode(sorted(request.args.items(multi=True)))
+                key = _view_key(name, tags, kwargs, request.path, query)
+                if cache_404:
+                    _count_hot(request.full_path if query else request.path)
+                hit = cache.get(key)
+            if hit is not None:
+                stats["hits"] += 1
+            else:
+                rendered = []
+
+                def render():
+                    out, response = _render(key, f, args, kwargs, timeout, cache_404)
+                    rendered.append(response)
+                    return out
+                hit = _renders.do(key, render)
+                stats["misses" if rendered else "coalesced"] += 1
+            status, body, content_type = hit
+            if body is None:
+                # Too large to cache: the renderer streams its response, requests that waited render their own.
+                return rendered[0] if rendered else f(*args, **kwargs)
+            return current_app.response_class(body, status=status, content_type=content_type)
+        decorated.cached_view = (name, tags, cache_404)
+        return decorated
+    return decorator
+
+
+def _view_key(name, tags, kwargs, path, query):
+    versions = ",".join(tag_version(t.format(**kwargs)) for t in (f"view:{name}",) + tags)
+    return f"view:{name}:{path}?{query}:{versions}"
+
+
+def cached_response(view, path, query_string, kwargs):
+    """
+    The cached (status, body, content type) of a @cached_view view for path, query_string (raw,
+    as in the request) and view arguments kwargs, or None on a miss. Works outside a request
+    (asgi.py serves hits without Flask); a hit is counted like one seen by the view.
+    """
+    hit = _peek(view, path, query_string, kwargs)
+    if hit is not None:
+        _count_hit(view, path, query_string)
+    return hit
+
+
+def cached_404(view, path, query_string, kwargs):
+    """
+    cached_response restricted to the negative cache: the cached 404 of a cache_404 view, else
+    None. Lets conditional_get and asgi.py answer a missing id without touching data_store.
+    """
+    if not view.cached_view[2]:
+        return None
+    hit = _peek(view, path, query_string, kwargs)
+    if hit is None or hit[0] != 404:
+        return None
+    _count_hit(view, path, query_string)
+    return hit
+
+
+def _peek(view, path, query_string, kwargs):
+    name, tags, _ = view.cached_view
+    with phase("cache"):
+        # Parsed like werkzeug's request.args.
+        items = parse_qsl(query_string, keep_blank_values=True, errors="werkzeug.url_quote")
+        query = urlencode(sorted(items))
+        return cache.get(_view_key(name, tags, kwargs, path, query))
+
+
+def _count_hit(view, path, query_string):
+    name, _, cache_404 = view.cached_view
+    _views[name]["hits"] += 1
+    if cache_404:
+        _count_hot(f"{path}?{query_string}" if query_string else path)
+
+
+def _render(key, f, args, kwargs, timeout, cache_404):
+    """((status, body, content type), response); body is None for a streamed response over CACHE_MAX_STREAMED_BYTES."""
+    response = make_response(f(*args, **kwargs))
+    if response.is_streamed:
+        body = _buffer(response)
+        if body is None:
+            return (response.status_code, None, response.content_type), response
+    else:
+        body = response.get_data()
+    out = (response.status_code, body, response.content_type)
+    with phase("cache"):
+        if out[0] == 200:
+            cache.set(key, out, timeout=timeout)
+        elif out[0] == 404 and cache_404:
+            cache.set(key, out, timeout=NEGATIVE_CACHE_TIMEOUT)
+    return out, None
+
+
+def _buffer(response):
+    """The body of a streamed response if it fits CACHE_MAX_STREAMED_BYTES, else None (response keeps streaming)."""
+    source = response.response
+    chunks = []
+    size = 0
+    it = response.iter_encoded()
+    for chunk in it:
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > CACHE_MAX_STREAMED_BYTES:
+            response.response = itertools.chain(chunks, it)
+            if hasattr(source, "close"):
+                response.call_on_close(source.close)
+            return None
+    if hasattr(source, "close"):
+        source.close()
+    return b"".join(chunks)
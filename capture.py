@@ -0,0 +1,407 @@
+"""
+Traffic capture and replay.
+
+Capture (CAPTURE_ENABLED): every request is appended to CAPTURE_PATH as one JSON line. A line
+holds start time, method, path, query, headers (without Authorization, Cookie and
+Proxy-Authorization), body, status, response size, the Flask endpoint and the server-side duration
+(until the last body byte). Writes (anything but GET/HEAD/OPTIONS) also keep the response body, so
+replay can follow the ids of the entities they create. The request thread only builds the record and puts it on a bounded
+queue. A writer thread per process drains the queue and appends the lines in batches, one write
+per batch with O_APPEND, so workers can share the file. When the queue is full the record is
+dropped and counted instead of slowing the request down.
+
+Replay re-issues a capture against the app, keeping the original spacing between requests or
+scaling it with --speed. It then reports, per endpoint, the recorded and the replayed p50/p95/p99
+latency and how many statuses differ. The replayed server assigns its own ids to created
+entities; later requests whose path uses a recorded id wait for the write that created it to be
+answered, then are sent with the replayed id instead.
+
+    python capture.py replay traffic.jsonl --speed 2          # scratch copy of data/, like loadtest.py
+    python capture.py replay traffic.jsonl --url http://127.0.0.1:8000 --json diff.json
+
+Replays of writes change the data they run against, so by default the server runs on a copy of
+--data-dir.
+"""
+import io
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import base64
+import asyncio
+import argparse
+import threading
+
+from config import CAPTURE_ENABLED, CAPTURE_PATH, CAPTURE_MAX_BODY, CAPTURE_QUEUE_MAX
+from metrics import ENDPOINT_KEY
+
+REDACTED_HEADERS = {"HTTP_AUTHORIZATION", "HTTP_COOKIE", "HTTP_PROXY_AUTHORIZATION"}
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+WRITE_BATCH = 256
+MIN_MAPPED_ID = 6
+
+_queue = queue.Queue(maxsize=CAPTURE_QUEUE_MAX)
+_writer_pid = None
+_writer_lock = threading.Lock()
+dropped = 0
+
+
+def _headers(environ):
+    out = {}
+    for key, value in environ.items():
+        if key.startswith("HTTP_") and key not in REDACTED_HEADERS:
+            out[key[5:].replace("_", "-").title()] = value
+    if environ.get("CONTENT_TYPE"):
+        out["Content-Type"] = environ["CONTENT_TYPE"]
+    return out
+
+
+def _body_fields(body, prefix="body"):
+    if not body:
+        return {}
+    fields = {f"{prefix}_truncated": True} if len(body) > CAPTURE_MAX_BODY else {}
+    body = body[:CAPTURE_MAX_BODY]
+    try:
+        fields[prefix] = body.decode("utf-8")
+    except UnicodeDecodeError:
+        fields[prefix] = base64.b64encode(body).decode("ascii")
+        fields[f"{prefix}_encoding"] = "base64"
+    return fields
+
+
+def decode_body(record, prefix="body"):
+    """Request (or with prefix="response_body", response) body bytes of a captured record."""
+    body = record.get(prefix)
+    if body is None:
+        return b""
+    if record.get(f"{prefix}_encoding") == "base64":
+        return base64.b64decode(body)
+    return body.encode("utf-8")
+
+
+def _writer_loop():
+    while True:
+        lines = [_queue.get()]
+        while len(lines) < WRITE_BATCH:
+            try:
+                lines.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        _write(lines)
+
+
+def _write(lines):
+    try:
+        directory = os.path.dirname(os.path.abspath(CAPTURE_PATH))
+        os.makedirs(directory, exist_ok=True)
+        fd = os.open(CAPTURE_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, "".join(lines).encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def _ensure_writer():
+    """Start the writer thread once per process (again after a fork)."""
+    global _writer_pid
+    if _writer_pid == os.getpid():
+        return
+    with _writer_lock:
+        if _writer_pid == os.getpid():
+            return
+        _writer_pid = os.getpid()
+    threading.Thread(target=_writer_loop, name="capture-writer", daemon=True).start()
+
+
+def _drain():
+    lines = []
+    while True:
+        try:
+            lines.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    if lines:
+        _write(lines)
+
+
+atexit.register(_drain)
+
+
+def _enqueue(record):
+    global dropped
+    try:
+        _queue.put_nowait(json.dumps(record, separators=(",", ":")) + "\n")
+    except queue.Full:
+        dropped += 1
+
+
+class CaptureMiddleware:
+    """WSGI middleware appending each request to CAPTURE_PATH (when CAPTURE_ENABLED)."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        if not CAPTURE_ENABLED:
+            return self.wsgi_app(environ, start_response)
+        _ensure_writer()
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+        body = environ["wsgi.input"].read(length) if length > 0 else b""
+        environ["wsgi.input"] = io.BytesIO(body)
+        record = {
+            "ts": round(started_at, 6),
+            "method": environ.get("REQUEST_METHOD", ""),
+            "path": environ.get("PATH_INFO", ""),
+            "query": environ.get("QUERY_STRING", ""),
+            "headers": _headers(environ),
+            **_body_fields(body),
+        }
+
+        def _start_response(status, headers, exc_info=None):
+            record["status"] = int(status.split(" ", 1)[0])
+            return start_response(status, headers, exc_info)
+
+        try:
+            response = self.wsgi_app(environ, _start_response)
+        except BaseException:
+            record["status"] = 500
+            self._finish(environ, record, start, 0)
+            raise
+        return self._iterate(environ, response, record, start)
+
+    def _iterate(self, environ, response, record, start):
+        sent = 0
+        kept = [] if record["method"] not in READ_METHODS else None
+        try:
+            for chunk in response:
+                sent += len(chunk)
+                if kept is not None and sent <= CAPTURE_MAX_BODY:
+                    kept.append(chunk)
+                yield chunk
+        finally:
+            if hasattr(response, "close"):
+                response.close()
+            if kept is not None:
+                record.update(_body_fields(b"".join(kept), "response_body"))
+            self._finish(environ, record, start, sent)
+
+    def _finish(self, environ, record, start, sent):
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        record["response_bytes"] = sent
+        record["endpoint"] = environ.get(ENDPOINT_KEY)
+        _enqueue(record)
+
+
+# ---- replay ----
+def read_capture(path):
+    """Captured records, oldest first (lines that do not parse are skipped)."""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    records.sort(key=lambda r: r.get("ts", 0))
+    return records
+
+
+def _route(record):
+    return record.get("endpoint") or f"{record.get('method')} {record.get('path')}"
+
+
+def _created_id(payload):
+    try:
+        doc = json.loads(payload)
+    except ValueError:
+        return None
+    if not isinstance(doc, dict) or doc.get("id") is None:
+        return None
+    # Short ids (per-channel chat message counters) would also match unrelated path segments.
+    created = str(doc["id"])
+    return created if len(created) >= MIN_MAPPED_ID else None
+
+
+def _map_path(path, ids):
+    if not ids:
+        return path
+    return "/".join(ids.get(segment, segment) for segment in path.split("/"))
+
+
+async def replay(records, base_url, speed=1.0, connections=64):
+    """
+    Send records to base_url at their recorded offsets divided by speed (speed 0: back to back).
+    A request whose path names an id created by an earlier write is held until that write has been
+    answered (the wait counts as start lag).
+    Returns a list of (record, replayed status or None, replayed seconds, start lag seconds).
+    """
+    from urllib.parse import urlsplit
+    from loadtest import _Connection
+
+    parts = urlsplit(base_url)
+    pool = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait(_Connection(parts.hostname, parts.port or 80))
+    results = []
+    ids = {}
+    # Recorded id -> position of the first write whose response carried it; position -> answered.
+    creators = {}
+    answered = {}
+    for position, record in enumerate(records):
+        if record.get("method") not in READ_METHODS and record.get("response_body"):
+            created = _created_id(decode_body(record, "response_body"))
+            if created and created not in creators:
+                creators[created] = position
+                answered[position] = asyncio.Event()
+    t0 = records[0].get("ts", 0) if records else 0
+    started = time.perf_counter()
+
+    async def send(position, record):
+        try:
+            await _send(position, record)
+        finally:
+            if position in answered:
+                answered[position].set()
+
+    async def _send(position, record):
+        due = started + ((record.get("ts", t0) - t0) / speed if speed else 0)
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        for segment in record.get("path", "/").split("/"):
+            creator = creators.get(segment)
+            if creator is not None and creator < position:
+                await answered[creator].wait()
+        conn = await pool.get()
+        lag = time.perf_counter() - due
+        path = _map_path(record.get("path", "/"), ids) + (f"?{record['query']}" if record.get("query") else "")
+        begin = time.perf_counter()
+        try:
+            status, payload = await conn.request(record.get("method", "GET"), path, raw_body=decode_body(record),
+                                                 headers=record.get("headers") or {})
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            status = payload = None
+        finally:
+            pool.put_nowait(conn)
+        if payload and record.get("response_body"):
+            recorded_id = _created_id(decode_body(record, "response_body"))
+            replayed_id = _created_id(payload)
+            if recorded_id and replayed_id and recorded_id != replayed_id:
+                ids[recorded_id] = replayed_id
+        results.append((record, status, time.perf_counter() - begin, max(lag, 0.0)))
+
+    await asyncio.gather(*(send(position, r) for position, r in enumerate(records)))
+    while not pool.empty():
+        pool.get_nowait().close()
+    return results
+
+
+def _percentiles(values):
+    from loadtest import PERCENTILES, _percentile
+
+    values = sorted(values)
+    return {f"p{p}_ms": round(_percentile(values, p) * 1000, 3) if values else None for p in PERCENTILES}
+
+
+def diff_report(results):
+    """Per endpoint: count, status mismatches, recorded vs replayed p50/p95/p99 and their change."""
+    by_route = {}
+    for record, status, seconds, lag in results:
+        by_route.setdefault(_route(record), []).append((record, status, seconds, lag))
+    routes = {}
+    for route, entries in sorted(by_route.items()):
+        recorded = _percentiles([r.get("duration_ms", 0) / 1000 for r, _, _, _ in entries])
+        replayed = _percentiles([s for _, _, s, _ in entries])
+        routes[route] = {
+            "count": len(entries),
+            "status_mismatches": sum(1 for r, status, _, _ in entries if status != r.get("status")),
+            "errors": sum(1 for _, status, _, _ in entries if status is None or status >= 500),
+            "recorded": recorded,
+            "replayed": replayed,
+            "change": {
+                key: round((replayed[key] - recorded[key]) / recorded[key], 4) if recorded[key] else None
+                for key in recorded
+            },
+        }
+    lags = sorted(lag for _, _, _, lag in results)
+    return {
+        "requests": len(results),
+        "max_start_lag_ms": round(lags[-1] * 1000, 3) if lags else 0,
+        "routes": routes,
+    }
+
+
+def _print_diff(report):
+    print(f"{'endpoint':<44} {'count':>6} {'mism':>5} {'rec p50':>8} {'rep p50':>8} {'rec p95':>8} {'rep p95':>8} {'rec p99':>8} {'rep p99':>8}")
+    for route, s in report["routes"].items():
+        rec, rep = s["recorded"], s["replayed"]
+        print(f"{route:<44} {s['count']:>6} {s['status_mismatches']:>5} "
+              + " ".join(f"{rec[k] or 0:>8} {rep[k] or 0:>8}" for k in ("p50_ms", "p95_ms", "p99_ms")))
+    print(f"requests: {report['requests']}, max start lag: {report['max_start_lag_ms']} ms")
+
+
+def main(argv=None):
+    from config import DATA_DIR
+
+    parser = argparse.ArgumentParser(description="Replay captured traffic")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rep = sub.add_parser("replay", help="re-issue a capture file against the app")
+    rep.add_argument("capture", help="JSONL file written with CAPTURE_ENABLED")
+    rep.add_argument("--speed", type=float, default=1.0, help="time scale: 2 = twice as fast, 0 = back to back")
+    rep.add_argument("--connections", type=int, default=64, help="concurrent keep-alive connections")
+    rep.add_argument("--url", help="replay against this server instead of starting one")
+    rep.add_argument("--data-dir", default=DATA_DIR, help="data tree the started server serves (copied first)")
+    rep.add_argument("--in-place", action="store_true", help="serve --data-dir itself instead of a copy")
+    rep.add_argument("--server-workers", type=int, default=1)
+    rep.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    import shutil
+    import tempfile
+    import subprocess
+    from loadtest import start_server, _copy_tree
+
+    records = read_capture(args.capture)
+    if not records:
+        print(f"no requests in {args.capture}", file=sys.stderr)
+        sys.exit(1)
+    proc = scratch = None
+    try:
+        url = args.url
+        if url is None:
+            data_dir = args.data_dir
+            if not args.in_place:
+                scratch = tempfile.mkdtemp(prefix="zoom-mock-replay-")
+                data_dir = os.path.join(scratch, "data")
+                _copy_tree(args.data_dir, data_dir)
+            # The replaying server must not capture its own traffic into the file being replayed.
+            proc, url = start_server(data_dir, workers=args.server_workers, env={"CAPTURE_ENABLED": "0"})
+        results = asyncio.run(replay(records, url, speed=args.speed, connections=args.connections))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+    report = diff_report(results)
+    report["meta"] = {"capture": args.capture, "speed": args.speed, "url": args.url}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    _print_diff(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,8 +21,9 @@ MAX_PAGE_SIZE = 300
 CACHE_TIMEOUT = 3600
 CACHE_KEY_PREFIX = "zoom_mock_"
 
-# Data directory: single source of truth for all API data
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+# Data directory: single source of truth for all API data (DATA_DIR points the server at another
+# tree, e.g. one written by `python datagen.py`)
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(__file__), "data"))
 DATA_ACCOUNTS = os.path.join(DATA_DIR, "accounts.json")
 DATA_USERS_DIR = os.path.join(DATA_DIR, "users")
 DATA_MEETINGS_DIR = os.path.join(DATA_DIR, "meetings")
@@ -31,4 +32,85 @@ DATA_TRACKING_FIELDS = os.path.join(DATA_DIR, "tracking_fields.json")
 DATA_ROOMS = os.path.join(DATA_DIR, "rooms.json")
 DATA_CHAT_CHANNELS = os.path.join(DATA_DIR, "chat_channels.json")
 DATA_CHAT_MESSAGES = os.path.join(DATA_DIR, "chat_messages.json")
+DATA_CHAT_LOGS_DIR = os.path.join(DATA_DIR, "chat_logs")
 DATA_QSS_FEEDBACK = os.path.join(DATA_DIR, "qss_feedback.json")
+DATA_JOURNAL = os.path.join(DATA_DIR, "journal.wal")
+
+# Storage backend behind data_store: "files" (the data/ tree) or "sqlite" (SQLITE_PATH;
+# import the data/ tree once with `python sqlite_storage.py import`).
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "files")
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(DATA_DIR, "zoom_mock.sqlite3"))
+
+# Persistence (files backend): sync (write files on the request thread), group (WAL + group commit every
+# GROUP_COMMIT_INTERVAL_MS, snapshots flushed in the background) or memory (no disk writes).
+PERSISTENCE_MODE = os.getenv("PERSISTENCE_MODE", "sync")
+GROUP_COMMIT_INTERVAL_MS = int(os.getenv("GROUP_COMMIT_INTERVAL_MS", "50"))
+
+# Chat logs: append-only per channel; the background compactor rewrites a log once it holds
+# at least CHAT_COMPACT_MIN_GARBAGE dead records and more dead than live ones.
+CHAT_COMPACT_INTERVAL = float(os.getenv("CHAT_COMPACT_INTERVAL", "30"))
+CHAT_COMPACT_MIN_GARBAGE = int(os.getenv("CHAT_COMPACT_MIN_GARBAGE", "64"))
+
+# Response cache (tiered_cache.TieredCache): per-process LRU of CACHE_L1_MAX_BYTES in front of a
+# CACHE_DIR tier of CACHE_L2_MAX_BYTES shared by all workers on the host. CACHE_DIR="" keeps
+# only the per-process tier (invalidations then do not reach other workers).
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(DATA_DIR, ".cache"))
+CACHE_L1_MAX_BYTES = int(os.getenv("CACHE_L1_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_L2_MAX_BYTES = int(os.getenv("CACHE_L2_MAX_BYTES", str(512 * 1024 * 1024)))
+# Streamed list responses (streaming.stream_json) larger than this are sent as they are produced
+# and not cached, so a cache miss never holds a whole large list in memory.
+CACHE_MAX_STREAMED_BYTES = int(os.getenv("CACHE_MAX_STREAMED_BYTES", str(256 * 1024)))
+# How long a 404 for a single entity id stays cached (creating the entity invalidates it earlier).
+NEGATIVE_CACHE_TIMEOUT = int(os.getenv("NEGATIVE_CACHE_TIMEOUT", "60"))
+
+# Metrics (/metrics): each worker writes a snapshot to METRICS_DIR every METRICS_FLUSH_INTERVAL seconds
+# and /metrics merges them. METRICS_DIR="" reports the answering process only.
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(DATA_DIR, ".metrics"))
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+# Add a Server-Timing header (auth, cache, data_store, shape, serialize, total) to every response;
+# without it a request can ask for one with "X-Server-Timing: 1".
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+
+# Per-request profiling (X-Profile: cprofile|sample or ?_profile=...): off unless PROFILING_ENABLED.
+# Profiles go to PROFILE_DIR (the newest PROFILE_KEEP are kept) and are served at /v2/_debug/profiles/<id>.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(DATA_DIR, ".profiles"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.001"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "100"))
+
+# Traffic capture: with CAPTURE_ENABLED every request (auth headers removed, bodies cut at
+# CAPTURE_MAX_BODY bytes) is appended to CAPTURE_PATH as JSON lines for `python capture.py replay`.
+# At most CAPTURE_QUEUE_MAX records wait for the writer thread; beyond that they are dropped.
+CAPTURE_ENABLED = os.getenv("CAPTURE_ENABLED", "0").lower() in ("1", "true", "yes")
+CAPTURE_PATH = os.getenv("CAPTURE_PATH", os.path.join(DATA_DIR, "traffic_capture.jsonl"))
+CAPTURE_MAX_BODY = int(os.getenv("CAPTURE_MAX_BODY", str(64 * 1024)))
+CAPTURE_QUEUE_MAX = int(os.getenv("CAPTURE_QUEUE_MAX", "10000"))
+
+# ASGI serving (app.asgi_app, see asgi.py): blocking work runs on at most ASGI_EXECUTOR_WORKERS
+# threads. With ASGI_NATIVE_ROUTES, cached responses of the hot GET views are served without
+# going through Flask.
+ASGI_EXECUTOR_WORKERS = int(os.getenv("ASGI_EXECUTOR_WORKERS", "16"))
+ASGI_NATIVE_ROUTES = os.getenv("ASGI_NATIVE_ROUTES", "1").lower() in ("1", "true", "yes")
+
+# serve.py (production launcher): worker processes; requests a worker serves before it is replaced
+# (0 = never), plus a random 0..MAX_REQUESTS_JITTER so workers do not restart together; seconds
+# workers get to finish in-flight requests on shutdown, restart (SIGHUP) or recycling.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", "0"))
+MAX_REQUESTS_JITTER = int(os.getenv("MAX_REQUESTS_JITTER", "0"))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
+# Admission control (admission.py, in app.asgi_app): concurrent requests per route group and worker,
+# e.g. ADMISSION_LIMITS="reports=4,writes=16,reads=64" (groups left out, or an empty value, are not
+# limited). Up to ADMISSION_QUEUE requests per group (same syntax, default 4x the limit) wait for a
+# slot, each for at most ADMISSION_QUEUE_TIMEOUT seconds; the rest get a 429 with Retry-After.
+ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS", "")
+ADMISSION_QUEUE = os.getenv("ADMISSION_QUEUE", "")
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+# Zoom rate-limit and latency emulation (emulation.py, in app.asgi_app): the profile at start, a name
+# (off, zoom_pro, zoom_business, zoom_realistic) or the path of a JSON profile. PUT /v2/_emulation
+# switches it at runtime; the choice is kept in EMULATION_STATE_PATH, which every worker follows.
+EMULATION_PROFILE = os.getenv("EMULATION_PROFILE", "off")
+EMULATION_STATE_PATH = os.getenv("EMULATION_STATE_PATH", os.path.join(DATA_DIR, ".emulation.json"))
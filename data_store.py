@@ -1,44 +1,106 @@
 """
-Zoom-style data store. The source of truth for all data is the data/ directory only.
-- data/accounts.json       → account list
-- data/users/<id>.json     → full user profile + meeting_ids, recording refs
-- data/meetings/<id>.json → meeting details + summary + vtt_data + recording_files + participants
-- data/webinars/<id>.json → webinar details + participants
-- data/tracking_fields.json, data/rooms.json, data/chat_*.json, data/qss_feedback.json
-
-All reads and writes go to data/; no in-memory source of truth.
+Zoom-style data store. Routes read and write through these helpers only; the documents live in
+the storage backend selected by STORAGE_BACKEND (see storage.py):
+- files (default) → the data/ directory is the source of truth (see file_storage.py)
+    data/accounts.json       → account list
+    data/users/<id>.json     → full user profile + meeting_ids, recording refs
+    data/meetings/<id>.json → meeting details + summary + vtt_data + recording_files + participants
+    data/webinars/<id>.json → webinar details + participants
+    data/tracking_fields.json, data/rooms.json, data/chat_channels.json, data/qss_feedback.json
+    data/chat_logs/<channel_id>.jsonl → append-only chat message log per channel
+- sqlite → tables in SQLITE_PATH (see sqlite_storage.py); accounts still come from data/accounts.json
+
+Read-modify-write cycles must go through the modify_* helpers, which run fn under a lock shared
+with other worker processes: fn gets a fresh copy and returns the value to store, or None to
+leave it unchanged.
+
+Every write reports what it changed to the change listeners as tags:
+    user:<id>, users                               → a user profile
+    meeting:<id>, meetings, meetings:host:<host_id> → a meeting (old and new host)
+    rooms, tracking_fields, chat_channels, qss_feedback → a collection
+    chat:channel:<id>, chat                        → a channel's messages
+
+Timing listeners (add_timing_listener) get the duration of every backend call.
 """
-import os
-import json
-from config import (
-    BASE_URL, DATA_DIR, DATA_ACCOUNTS, DATA_USERS_DIR, DATA_MEETINGS_DIR, DATA_WEBINARS_DIR,
-    DATA_TRACKING_FIELDS, DATA_ROOMS, DATA_CHAT_CHANNELS, DATA_CHAT_MESSAGES, DATA_QSS_FEEDBACK,
-)
+import time
+from config import BASE_URL, DATA_ACCOUNTS
+from file_storage import load_json as _load_json
+from storage import create_backend
+from singleflight import SingleFlight
+from timing import timed
+
+_timing_listeners = []
+
+
+def add_timing_listener(fn):
+    """Call fn(op, seconds) after every storage backend call (op: backend method name, e.g. "get_entity")."""
+    _timing_listeners.append(fn)
+
+
+class _TimedBackend:
+    """Forwards to the storage backend and reports each call's duration to the timing listeners."""
+
+    def __init__(self, backend):
+        self._inner = backend
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                for fn in _timing_listeners:
+                    fn(name, elapsed)
+        self.__dict__[name] = timed
+        return timed
+
+
+_backend = _TimedBackend(create_backend())
+
+# Concurrent loads of the same entity share one backend read.
+_loads = SingleFlight()
 
 _accounts_cache = None
-_user_ids_cache = None
 
+_change_listeners = []
 
-def _load_json(path, default=None):
-    if default is None:
-        default = {}
-    if not os.path.isfile(path):
-        return default
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return default
 
+def add_change_listener(fn):
+    """Call fn(*tags) after every write (see the tags above)."""
+    _change_listeners.append(fn)
+
+
+def _changed(*tags):
+    for fn in _change_listeners:
+        fn(*tags)
 
-def _list_json_files(dir_path):
-    if not os.path.isdir(dir_path):
-        return []
-    return [
-        os.path.splitext(f)[0]
-        for f in os.listdir(dir_path)
-        if f.endswith(".json")
-    ]
+
+def flush():
+    """Make acknowledged writes durable now (group-commit journal)."""
+    _backend.flush()
+
+
+def preload():
+    """
+    Parse and index the data set up front (files backend: every entity, the meeting index and the
+    chat logs). serve.py calls it before forking so the workers share one copy. Returns the number
+    of documents read.
+    """
+    load_accounts()
+    return _backend.preload()
+
+
+def entity_version(kind, entity_id):
+    """
+    (version, modified_at) of a user / meeting / webinar ("users", "meetings", "webinars") without
+    loading it, or None if it does not exist. version changes on every write.
+    """
+    return _backend.entity_version(kind, entity_id)
 
 
 # ---- Accounts (Zoom account structure) ----
@@ -64,66 +126,110 @@ def get_account(account_id):
 
 
 # ---- Users (source of truth: data/users/) ----
-def list_user_ids():
-    """List all user ids from data/users/."""
-    global _user_ids_cache
-    if _user_ids_cache is not None:
-        return _user_ids_cache
-    _user_ids_cache = sorted(_list_json_files(DATA_USERS_DIR))
-    return _user_ids_cache
+def _filter_page(ids, load, match, offset, limit):
+    """Ids whose loaded document satisfies match, skipping offset and stopping at limit."""
+    out = []
+    for entity_id in ids:
+        doc = load(entity_id)
+        if not doc or not match(doc):
+            continue
+        if offset:
+            offset -= 1
+            continue
+        out.append(entity_id)
+        if limit is not None and len(out) >= limit:
+            break
+    return out
+
+
+def list_user_ids(after=None, offset=0, limit=None, match=None):
+    """
+    User ids from data/users/, sorted. after (an id) / offset / limit select one page;
+    match(user) keeps only matching users (each candidate is loaded).
+    """
+    if match is None:
+        return _backend.list_entity_ids("users", after=after, offset=offset, limit=limit)
+    return _filter_page(_backend.list_entity_ids("users", after=after), load_user, match, offset, limit)
+
+
+def count_users(match=None):
+    """Number of users (matching match(user) when given)."""
+    if match is None:
+        return _backend.count_entities("users")
+    return len(list_user_ids(match=match))
+
+
+def _load(kind, entity_id, fields=None, omit=()):
+    if fields is None and not omit:
+        return _loads.do((kind, entity_id), lambda: _backend.get_entity(kind, entity_id))
+    # Partial reads are not coalesced: forget() after a write only knows the whole-document keys.
+    return _backend.get_entity(kind, entity_id, fields=fields, omit=omit)
 
 
 def load_user(user_id):
-    """Load user from data/users/<user_id>.json. Returns None if not found."""
-    path = os.path.join(DATA_USERS_DIR, f"{user_id}.json")
-    if not os.path.isfile(path):
-        return None
-    data = _load_json(path)
-    return data if data else None
+    """Load user from data/users/<user_id>.json. Returns None if not found. Treat the result as read-only."""
+    return _load("users", user_id)
 
 
 def save_user(user_id, payload):
     """Persist user to data/users/<id>.json (source of truth)."""
     payload = dict(payload)
     payload["id"] = user_id
-    os.makedirs(DATA_USERS_DIR, exist_ok=True)
-    path = os.path.join(DATA_USERS_DIR, f"{user_id}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2)
-    global _user_ids_cache
-    _user_ids_cache = None
+    _backend.put_entity("users", user_id, payload)
+    _loads.forget(("users", user_id))
+    _changed(f"user:{user_id}", "users")
+
+
+def modify_user(user_id, fn):
+    """Atomically update data/users/<id>.json: fn(user or None) returns the new profile or None. Returns it."""
+    def apply(u):
+        out = fn(u)
+        if out is not None:
+            out = dict(out)
+            out["id"] = user_id
+        return out
+    out = _backend.modify_entity("users", user_id, apply)
+    if out is not None:
+        _loads.forget(("users", user_id))
+        _changed(f"user:{user_id}", "users")
+    return out
 
 
 def add_meeting_to_user(user_id, meeting_id):
     """Add a meeting_id to user's meeting_ids and recording_meeting_ids. User must exist in data/users/."""
-    u = load_user(user_id)
-    if not u:
-        return
-    u = dict(u)
-    mids = list(u.get("meeting_ids") or [])
-    if meeting_id not in mids:
-        mids.append(meeting_id)
-    u["meeting_ids"] = mids
-    recs = list(u.get("recording_meeting_ids") or [])
-    if meeting_id not in recs:
-        recs.append(meeting_id)
-    u["recording_meeting_ids"] = recs
-    save_user(user_id, u)
+    def apply(u):
+        if not u:
+            return None
+        u = dict(u)
+        mids = list(u.get("meeting_ids") or [])
+        if meeting_id not in mids:
+            mids.append(meeting_id)
+        u["meeting_ids"] = mids
+        recs = list(u.get("recording_meeting_ids") or [])
+        if meeting_id not in recs:
+            recs.append(meeting_id)
+        u["recording_meeting_ids"] = recs
+        return u
+    modify_user(user_id, apply)
 
 
 # ---- Meetings (source of truth: data/meetings/) ----
+# Keys of a meeting document that only detail endpoints (summary, transcript, recordings,
+# participants) read; the GET meeting and list shapes leave them out.
+MEETING_DETAIL_KEYS = ("summary", "vtt_data", "participants", "recording_files")
+
 def list_meeting_ids():
     """List all meeting ids from data/meetings/."""
-    return sorted(_list_json_files(DATA_MEETINGS_DIR))
+    return _backend.list_entity_ids("meetings")
 
 
-def load_meeting(meeting_id):
-    """Load meeting from data/meetings/<meeting_id>.json. Returns None if not found."""
-    path = os.path.join(DATA_MEETINGS_DIR, f"{meeting_id}.json")
-    if not os.path.isfile(path):
-        return None
-    data = _load_json(path)
-    return data if data else None
+def load_meeting(meeting_id, fields=None, omit=()):
+    """
+    Load meeting from data/meetings/<meeting_id>.json. Returns None if not found. Treat the result as read-only.
+    fields / omit: the top-level keys needed and not needed; the backend may skip reading the
+    others (see StorageBackend.get_entity), but the result can still contain them.
+    """
+    return _load("meetings", meeting_id, fields, omit)
 
 
 def save_meeting(meeting_id, payload):
@@ -131,15 +237,84 @@ def save_meeting(meeting_id, payload):
     payload = dict(payload)
     payload["id"] = meeting_id
     payload["uuid"] = payload.get("uuid") or meeting_id
-    os.makedirs(DATA_MEETINGS_DIR, exist_ok=True)
-    path = os.path.join(DATA_MEETINGS_DIR, f"{meeting_id}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2)
+    _backend.put_entity("meetings", meeting_id, payload)
+    _loads.forget(("meetings", meeting_id))
+    _changed(*_meeting_tags(meeting_id, payload.get("host_id")))
+
+
+def _meeting_tags(meeting_id, *host_ids):
+    return [f"meeting:{meeting_id}", "meetings"] + [f"meetings:host:{h}" for h in dict.fromkeys(host_ids) if h]
+
+
+def modify_meeting(meeting_id, fn):
+    """Atomically update data/meetings/<id>.json: fn(meeting or None) returns the new meeting or None. Returns it."""
+    old_host = []
+
+    def apply(m):
+        old_host[:] = [(m or {}).get("host_id")]
+        out = fn(m)
+        if out is not None:
+            out = dict(out)
+            out["id"] = meeting_id
+            out["uuid"] = out.get("uuid") or meeting_id
+        return out
+    out = _backend.modify_entity("meetings", meeting_id, apply)
+    if out is not None:
+        _loads.forget(("meetings", meeting_id))
+        _changed(*_meeting_tags(meeting_id, out.get("host_id"), *old_host))
+    return out
+
+
+def list_meeting_ids_in_range(from_date=None, to_date=None, host_id=None):
+    """
+    Meeting ids ordered by start_time, optionally limited to one host and to
+    from_date / to_date (string YYYY-MM-DD, to_date inclusive). Served from the backend's start_time index.
+    """
+    return _backend.meeting_ids_in_range(host_id=host_id, from_date=from_date, to_date=to_date)
+
+
+def list_meeting_keys_in_range(from_date=None, to_date=None, host_id=None, after=None, offset=0, limit=None, match=None):
+    """
+    (start_time, id) keys of list_meeting_ids_in_range, resuming after key `after` with an index seek;
+    offset / limit select one page and match(meeting) keeps only matching meetings.
+    """
+    if match is None:
+        return _backend.meeting_keys_in_range(host_id, from_date, to_date, after=after, offset=offset, limit=limit)
+    keys = {key[1]: key for key in _backend.meeting_keys_in_range(host_id, from_date, to_date, after=after)}
+    return [keys[mid] for mid in _filter_page(keys, load_meeting, match, offset, limit)]
 
 
+def count_meetings_in_range(from_date=None, to_date=None, host_id=None, match=None):
+    """Number of meetings in list_meeting_ids_in_range (matching match(meeting) when given)."""
+    if match is None:
+        return _backend.count_meetings_in_range(host_id, from_date, to_date)
+    return len(list_meeting_keys_in_range(from_date, to_date, host_id, match=match))
+
+
+@timed("shape")
+def meeting_list_item(meeting_id, host_id=None):
+    """Zoom list-meeting shape for one meeting, or None if it does not exist."""
+    m = load_meeting(meeting_id, omit=MEETING_DETAIL_KEYS)
+    if not m:
+        return None
+    return {
+        "uuid": m.get("uuid") or meeting_id,
+        "id": m.get("id") or meeting_id,
+        "host_id": m.get("host_id") or host_id,
+        "topic": m.get("topic", ""),
+        "type": m.get("type", 2),
+        "start_time": m.get("start_time", ""),
+        "duration": m.get("duration", 60),
+        "timezone": m.get("timezone", "America/New_York"),
+        "created_at": m.get("created_at", ""),
+        "join_url": m.get("join_url") or f"{BASE_URL}/j/{meeting_id}",
+    }
+
+
+@timed("shape")
 def get_meeting_summary_payload(meeting_id):
-    """Get the meeting summary + vtt for a meeting. Returns None if not found."""
-    m = load_meeting(meeting_id)
+    """Get the meeting summary with the meeting's host and times (no transcript). Returns None if not found."""
+    m = load_meeting(meeting_id, omit=("vtt_data", "participants", "recording_files"))
     if not m:
         return None
     summary = m.get("summary") or {}
@@ -147,11 +322,13 @@ def get_meeting_summary_payload(meeting_id):
         "meeting_id": m.get("id") or meeting_id,
         "meeting_uuid": m.get("uuid") or meeting_id,
         "meeting_topic": m.get("topic", ""),
+        "host_id": m.get("host_id", ""),
+        "host_email": m.get("host_email", ""),
+        "start_time": m.get("start_time", ""),
         "summary_title": summary.get("summary_title", ""),
         "summary_overview": summary.get("summary_overview", ""),
         "summary_details": summary.get("summary_details", []),
         "next_steps": summary.get("next_steps", []),
-        "vtt_data": m.get("vtt_data", ""),
     }
 
 
@@ -176,40 +353,55 @@ def get_recordings_for_meeting(meeting_id):
     return m.get("recording_files") or []
 
 
+def get_recording_meeting_ids(user_id):
+    """Meeting ids to look for recordings of user (recording_meeting_ids, else meeting_ids), in stored order."""
+    u = load_user(user_id)
+    if not u:
+        return []
+    return u.get("recording_meeting_ids") or u.get("meeting_ids") or []
+
+
+@timed("shape")
+def recording_item(meeting_id, user_id=None, from_date=None, to_date=None):
+    """
+    Recording object (meeting info + recording_files) for one meeting, or None if it has no
+    recordings or its start_time is outside from_date / to_date (string YYYY-MM-DD).
+    """
+    m = load_meeting(meeting_id)
+    if not m:
+        return None
+    files = m.get("recording_files") or []
+    if not files:
+        return None
+    start_str = (m.get("start_time") or "")[:10]
+    if from_date and start_str < from_date:
+        return None
+    if to_date and start_str > to_date:
+        return None
+    return {
+        "uuid": m.get("uuid") or meeting_id,
+        "id": m.get("id") or meeting_id,
+        "host_id": m.get("host_id") or user_id,
+        "topic": m.get("topic", ""),
+        "start_time": m.get("start_time", ""),
+        "duration": m.get("duration", 60),
+        "total_size": sum(f.get("file_size", 0) for f in files),
+        "recording_count": len(files),
+        "recording_files": files,
+    }
+
+
 def get_recordings_for_user(user_id, from_date=None, to_date=None):
     """
     Return list of recording objects (each with meeting info + recording_files) for user.
     Uses user's recording_meeting_ids or meeting_ids from user file, then loads each meeting.
     Optionally filter by from_date / to_date (string YYYY-MM-DD) based on meeting start_time.
     """
-    u = load_user(user_id)
-    if not u:
-        return []
-    meeting_ids = u.get("recording_meeting_ids") or u.get("meeting_ids") or []
     out = []
-    for mid in meeting_ids:
-        m = load_meeting(mid)
-        if not m:
-            continue
-        files = m.get("recording_files") or []
-        if not files:
-            continue
-        start_str = (m.get("start_time") or "")[:10]
-        if from_date and start_str < from_date:
-            continue
-        if to_date and start_str > to_date:
-            continue
-        out.append({
-            "uuid": m.get("uuid") or mid,
-            "id": m.get("id") or mid,
-            "host_id": m.get("host_id") or user_id,
-            "topic": m.get("topic", ""),
-            "start_time": m.get("start_time", ""),
-            "duration": m.get("duration", 60),
-            "total_size": sum(f.get("file_size", 0) for f in files),
-            "recording_count": len(files),
-            "recording_files": files,
-        })
+    for mid in get_recording_meeting_ids(user_id):
+        item = recording_item(mid, user_id, from_date, to_date)
+        if item:
+            out.append(item)
     return out
 
 
@@ -223,82 +415,70 @@ def get_participants_for_meeting(meeting_id):
 
 def get_meetings_for_user(user_id, from_date=None, to_date=None):
     """
-    Return list of meeting objects for user from data store (from user's meeting_ids).
+    Return list of meeting objects hosted by user, ordered by start_time.
     Optionally filter by from_date / to_date (string YYYY-MM-DD).
     """
-    u = load_user(user_id)
-    if not u:
+    if not load_user(user_id):
         return []
-    meeting_ids = u.get("meeting_ids") or []
     meetings = []
-    for mid in meeting_ids:
-        m = load_meeting(mid)
-        if not m:
-            continue
-        # Return Zoom list-meeting shape (uuid, id, host_id, topic, type, start_time, duration, timezone, created_at, join_url)
-        start = m.get("start_time") or ""
-        if from_date and start < from_date:
-            continue
-        if to_date and start > to_date + "T23:59:59":
-            continue
-        meetings.append({
-            "uuid": m.get("uuid") or mid,
-            "id": m.get("id") or mid,
-            "host_id": m.get("host_id") or user_id,
-            "topic": m.get("topic", ""),
-            "type": m.get("type", 2),
-            "start_time": m.get("start_time", ""),
-            "duration": m.get("duration", 60),
-            "timezone": m.get("timezone", "America/New_York"),
-            "created_at": m.get("created_at", ""),
-            "join_url": m.get("join_url") or f"{BASE_URL}/j/{mid}",
-        })
+    for mid in list_meeting_ids_in_range(from_date=from_date, to_date=to_date, host_id=user_id):
+        item = meeting_list_item(mid, host_id=user_id)
+        if item:
+            meetings.append(item)
     return meetings
 
 
 # ---- Webinars (Zoom webinar: type 5, separate from meetings) ----
 def list_webinar_ids():
     """List all webinar ids (from filenames in data/webinars/)."""
-    return _list_json_files(DATA_WEBINARS_DIR)
+    return _backend.list_entity_ids("webinars")
 
 
-def load_webinar(webinar_id):
-    """Load webinar from data/webinars/<webinar_id>.json. Returns None if not found."""
-    path = os.path.join(DATA_WEBINARS_DIR, f"{webinar_id}.json")
-    if not os.path.isfile(path):
-        return None
-    data = _load_json(path)
-    return data if data else None
+def load_webinar(webinar_id, fields=None, omit=()):
+    """Load webinar from data/webinars/<webinar_id>.json. Returns None if not found. fields / omit as in load_meeting."""
+    return _load("webinars", webinar_id, fields, omit)
 
 
-def get_webinars_for_user(user_id, from_date=None, to_date=None):
-    """Return list of webinar objects for user (from user's webinar_ids). Filter by from_date/to_date (YYYY-MM-DD)."""
+def get_webinar_ids_for_user(user_id):
+    """User's webinar_ids, in stored order."""
     u = load_user(user_id)
     if not u:
         return []
-    webinar_ids = u.get("webinar_ids") or []
+    return u.get("webinar_ids") or []
+
+
+@timed("shape")
+def webinar_list_item(webinar_id, user_id=None, from_date=None, to_date=None):
+    """Zoom list-webinar shape for one webinar, or None if missing or outside from_date / to_date (YYYY-MM-DD)."""
+    w = load_webinar(webinar_id, omit=("participants",))
+    if not w:
+        return None
+    start = (w.get("start_time") or "")[:10]
+    if from_date and start < from_date:
+        return None
+    if to_date and start > to_date:
+        return None
+    return {
+        "uuid": w.get("uuid") or webinar_id,
+        "id": w.get("id") or webinar_id,
+        "host_id": w.get("host_id") or user_id,
+        "topic": w.get("topic", ""),
+        "type": 5,
+        "start_time": w.get("start_time", ""),
+        "duration": w.get("duration", 60),
+        "timezone": w.get("timezone", "America/New_York"),
+        "created_at": w.get("created_at", ""),
+        "join_url": w.get("join_url") or f"{BASE_URL}/w/{webinar_id}",
+    }
+
+
+def get_webinars_for_user(user_id, from_date=None, to_date=None):
+    """Return list of webinar objects for user (from user's webinar_ids). Filter by from_date/to_date (YYYY-MM-DD)."""
     webinars = []
-    for wid in webinar_ids:
-        w = load_webinar(wid)
-        if not w:
-            continue
-        start = (w.get("start_time") or "")[:10]
-        if from_date and start < from_date:
-            continue
-        if to_date and start > to_date:
-            continue
-        webinars.append({
-            "uuid": w.get("uuid") or wid,
-            "id": w.get("id") or wid,
-            "host_id": w.get("host_id") or user_id,
-            "topic": w.get("topic", ""),
-            "type": 5,
-            "start_time": w.get("start_time", ""),
-            "duration": w.get("duration", 60),
-            "timezone": w.get("timezone", "America/New_York"),
-            "created_at": w.get("created_at", ""),
-            "join_url": w.get("join_url") or f"{BASE_URL}/w/{wid}",
-        })
+    for wid in get_webinar_ids_for_user(user_id):
+        item = webinar_list_item(wid, user_id, from_date, to_date)
+        if item:
+            webinars.append(item)
     return webinars
 
 
@@ -313,77 +493,139 @@ def get_participants_for_webinar(webinar_id):
 # ---- Tracking fields (source of truth: data/tracking_fields.json) ----
 def load_tracking_fields():
     """Load tracking fields list from data/tracking_fields.json."""
-    data = _load_json(DATA_TRACKING_FIELDS, default={"tracking_fields": []})
-    if isinstance(data, dict) and "tracking_fields" in data:
-        return data["tracking_fields"]
-    return data if isinstance(data, list) else []
+    return _backend.get_collection("tracking_fields")
 
 
 def save_tracking_fields(fields):
     """Persist tracking fields to data/tracking_fields.json."""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(DATA_TRACKING_FIELDS, "w", encoding="utf-8") as f:
-        json.dump({"tracking_fields": fields}, f, indent=2)
+    _backend.put_collection("tracking_fields", fields)
+    _changed("tracking_fields")
+
+
+def modify_tracking_fields(fn):
+    """Atomically update data/tracking_fields.json: fn(fields) returns the list to store or None."""
+    out = _backend.modify_collection("tracking_fields", fn)
+    if out is not None:
+        _changed("tracking_fields")
+    return out
 
 
 # ---- Rooms (source of truth: data/rooms.json) ----
 def load_rooms():
     """Load rooms list from data/rooms.json."""
-    data = _load_json(DATA_ROOMS, default={"rooms": []})
-    if isinstance(data, dict) and "rooms" in data:
-        return data["rooms"]
-    return data if isinstance(data, list) else []
+    return _backend.get_collection("rooms")
 
 
 def save_rooms(rooms):
     """Persist rooms to data/rooms.json."""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(DATA_ROOMS, "w", encoding="utf-8") as f:
-        json.dump({"rooms": rooms}, f, indent=2)
+    _backend.put_collection("rooms", rooms)
+    _changed("rooms")
 
 
-# ---- Chat (source of truth: data/chat_channels.json, data/chat_messages.json) ----
+def modify_rooms(fn):
+    """Atomically update data/rooms.json: fn(rooms) returns the list to store or None."""
+    out = _backend.modify_collection("rooms", fn)
+    if out is not None:
+        _changed("rooms")
+    return out
+
+
+# ---- Chat (source of truth: data/chat_channels.json, data/chat_logs/) ----
 def load_chat_channels():
     """Load chat channels from data/chat_channels.json. Returns dict id -> channel."""
-    data = _load_json(DATA_CHAT_CHANNELS, default={"channels": {}})
-    if isinstance(data, dict) and "channels" in data:
-        return data["channels"]
-    return data if isinstance(data, dict) else {}
+    return _backend.get_collection("chat_channels")
 
 
 def save_chat_channels(channels):
     """Persist chat channels to data/chat_channels.json. channels: dict id -> channel."""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(DATA_CHAT_CHANNELS, "w", encoding="utf-8") as f:
-        json.dump({"channels": channels}, f, indent=2)
+    _backend.put_collection("chat_channels", channels)
+    _changed("chat_channels")
+
+
+def modify_chat_channels(fn):
+    """Atomically update data/chat_channels.json: fn(channels) returns the dict to store or None."""
+    out = _backend.modify_collection("chat_channels", fn)
+    if out is not None:
+        _changed("chat_channels")
+    return out
+
+
+def list_chat_message_channels():
+    """Channel ids (plus "_direct_messages") that have stored messages."""
+    return _backend.chat_channel_ids()
+
+
+def get_chat_messages(channel_id):
+    """Messages of one channel (or "_direct_messages"), oldest first."""
+    return _backend.chat_messages(channel_id)
+
+
+def next_chat_message_id(channel_id):
+    """Next sequential message id for a channel; never reuses ids of deleted messages."""
+    return _backend.chat_next_id(channel_id)
+
+
+def append_chat_message(channel_id, message):
+    """Append a message to the channel's log. A message without "id" gets the next sequential id. Returns the stored message."""
+    out = _backend.chat_append(channel_id, message)
+    _changed(f"chat:channel:{channel_id}", "chat")
+    return out
+
+
+def update_chat_message(channel_id, message_id, fields, sender=None):
+    """Edit the first message with message_id (and sender). Returns the updated message, or None if not found."""
+    out = _backend.chat_update(channel_id, message_id, fields, sender=sender)
+    if out is not None:
+        _changed(f"chat:channel:{channel_id}", "chat")
+    return out
+
+
+def delete_chat_message(channel_id, message_id, sender=None):
+    """Delete the first message with message_id (and sender). Returns False if the message was not found."""
+    deleted = _backend.chat_delete(channel_id, message_id, sender=sender)
+    if deleted:
+        _changed(f"chat:channel:{channel_id}", "chat")
+    return deleted
+
+
+def delete_chat_channel_messages(channel_id):
+    """Drop a channel's whole message log."""
+    _backend.chat_drop(channel_id)
+    _changed(f"chat:channel:{channel_id}", "chat")
 
 
 def load_chat_messages():
-    """Load all chat messages from data/chat_messages.json. Returns dict channel_id -> list of messages."""
-    data = _load_json(DATA_CHAT_MESSAGES, default={"messages": {}})
-    if isinstance(data, dict) and "messages" in data:
-        return data["messages"]
-    return data if isinstance(data, dict) else {}
+    """Load all chat messages. Returns dict channel_id -> list of messages."""
+    return {cid: _backend.chat_messages(cid) for cid in _backend.chat_channel_ids()}
 
 
 def save_chat_messages(messages):
-    """Persist chat messages to data/chat_messages.json. messages: dict channel_id -> list."""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(DATA_CHAT_MESSAGES, "w", encoding="utf-8") as f:
-        json.dump({"messages": messages}, f, indent=2)
+    """Replace all chat messages: dict channel_id -> list. Prefer append_chat_message for single writes."""
+    old_ids = _backend.chat_channel_ids()
+    _backend.chat_replace_all(messages)
+    _changed(*[f"chat:channel:{cid}" for cid in dict.fromkeys(list(old_ids) + list(messages))], "chat")
+
+
+def compact_chat_logs():
+    """Reclaim space left by chat edits/deletes (file backend: rewrite tombstone-heavy logs)."""
+    return _backend.compact()
 
 
 # ---- QSS feedback (source of truth: data/qss_feedback.json) ----
 def load_qss_feedback():
     """Load QSS feedback from data/qss_feedback.json. Returns dict id -> feedback."""
-    data = _load_json(DATA_QSS_FEEDBACK, default={"feedback": {}})
-    if isinstance(data, dict) and "feedback" in data:
-        return data["feedback"]
-    return data if isinstance(data, dict) else {}
+    return _backend.get_collection("qss_feedback")
 
 
 def save_qss_feedback(feedback):
     """Persist QSS feedback to data/qss_feedback.json. feedback: dict id -> entry."""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(DATA_QSS_FEEDBACK, "w", encoding="utf-8") as f:
-        json.dump({"feedback": feedback}, f, indent=2)
+    _backend.put_collection("qss_feedback", feedback)
+    _changed("qss_feedback")
+
+
+def modify_qss_feedback(fn):
+    """Atomically update data/qss_feedback.json: fn(feedback) returns the dict to store or None."""
+    out = _backend.modify_collection("qss_feedback", fn)
+    if out is not None:
+        _changed("qss_feedback")
+    return out
@@ -0,0 +1,562 @@
+"""
+Seeded synthetic datasets for scale testing, written through a storage backend: the data/ layout
+of FileStorage or a SQLite database.
+
+    python datagen.py --data-dir /tmp/zoom-data --users 100000 --meetings-per-user 20 --seed 7
+    python datagen.py --backend sqlite --db /tmp/zoom.sqlite3 --users 100000
+
+Every record is drawn from its own random.Random seeded with (seed, kind, index), so a seed and a
+set of sizes always give the same ids and documents, whatever --workers and --batch-size are.
+Users are generated in batches by a multiprocessing pool. Each user comes with its meetings and
+webinars. Meetings that have already happened (before --past-until) also get participants and QSS
+feedback. Some of them also get recording_files, a VTT transcript and a summary. Chat messages
+are split into batches the same way. With the files backend the workers write the entity
+documents themselves. Otherwise they hand them to the parent, which writes each batch in one bulk
+call (put_entities / chat_extend).
+
+Collections (rooms, tracking_fields, chat_channels, qss_feedback) are merged by id into what the
+target already holds, so a dataset can be added to an existing tree. accounts.json (read from
+--data-dir by both backends) is only written when there is none.
+
+Serve the result with DATA_DIR=<dir> (or STORAGE_BACKEND=sqlite SQLITE_PATH=<db>).
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+import multiprocessing
+from functools import lru_cache
+
+from config import BASE_URL, DATA_DIR, SQLITE_PATH, DEFAULT_DATE_FROM, DEFAULT_DATE_TO
+from helpers import generate_base_user_data, generate_random_string, generate_uuid
+from file_storage import load_json
+from journal import write_json_file
+from storage import ENTITY_KINDS, BACKENDS
+
+DEFAULTS = {
+    "seed": 1,
+    "users": 1000,
+    "meetings_per_user": 10,        # mean; per-user counts are skewed (exponential)
+    "webinars_per_user": 0.2,
+    "participants_per_meeting": 6,  # mean, host included
+    "recording_ratio": 0.3,         # share of past meetings with recordings, transcript and summary
+    "feedback_ratio": 0.2,          # share of past meetings with QSS feedback
+    "channels": 20,
+    "messages_per_channel": 100,
+    "direct_messages": 500,
+    "rooms": 10,
+    "date_from": DEFAULT_DATE_FROM,
+    "date_to": DEFAULT_DATE_TO,
+    "past_until": "2026-07-01",
+}
+
+DEFAULT_BATCH_SIZE = 200     # users per job
+CHAT_BATCH_SIZE = 5000       # chat messages per job
+DIRECT_MESSAGES_CHANNEL = "_direct_messages"
+
+# Fixed UTC offsets (hours) are close enough to place meetings in business hours.
+TIMEZONES = {
+    "America/Los_Angeles": -8, "America/Chicago": -6, "America/New_York": -5, "America/Sao_Paulo": -3,
+    "Europe/London": 0, "Europe/Berlin": 1, "Africa/Lagos": 1, "Asia/Kolkata": 5.5,
+    "Asia/Singapore": 8, "Asia/Tokyo": 9, "Australia/Sydney": 10,
+}
+MEETING_TOPICS = [
+    "Sprint Planning", "Daily Standup", "Design Review", "Customer Onboarding", "Quarterly Business Review",
+    "1:1", "Architecture Sync", "Sales Pipeline Review", "Marketing Campaign Kickoff", "Incident Retrospective",
+    "Hiring Debrief", "Product Roadmap", "Budget Planning", "Partner Check-in", "All Hands Prep",
+]
+WEBINAR_TOPICS = [
+    "Product Launch", "Quarterly All-Hands", "Customer Success Stories", "Security Best Practices",
+    "Feature Deep Dive", "Industry Trends", "Getting Started", "Release Highlights",
+]
+SENTENCES = [
+    "Let's start with a quick round of updates.", "We are on track for the release at the end of the month.",
+    "The backend work is done, the frontend still needs a review.", "Can you share your screen?",
+    "I think we should revisit the priorities for next quarter.", "The customer asked for a demo next week.",
+    "We saw a spike in latency after the last deploy.", "Marketing wants the final copy by Friday.",
+    "Let's take that offline and follow up by email.", "The budget was approved with minor changes.",
+    "We need one more reviewer for the design doc.", "Thanks everyone, that's all for today.",
+    "I'll send the notes and action items after the call.", "Does anyone have blockers?",
+    "The new dashboard is live in staging.", "We should loop in the legal team on the contract.",
+]
+NEXT_STEPS = [
+    "Share the meeting notes with the team.", "Schedule a follow-up review.", "Update the project tracker.",
+    "Send the proposal to the customer.", "Fix the open bugs before the release.", "Prepare the demo environment.",
+    "Confirm the budget with finance.", "Collect feedback from stakeholders.",
+]
+CHAT_MESSAGES = [
+    "Morning all!", "Can someone review my PR?", "Meeting moved to 3pm.", "Thanks!", "Deploy is done.",
+    "Who owns the release notes?", "Lunch?", "Slides are in the shared drive.", "On it.", "Great work team!",
+    "Anyone seeing errors in staging?", "Reminder: retro tomorrow.", "Joining in 5.", "LGTM",
+]
+FEEDBACK_COMMENTS = ["", "", "", "Great call quality.", "Audio cut out a few times.", "Video was blurry.", "Screen share lagged."]
+CHANNEL_NAMES = ["engineering", "sales", "marketing", "product", "support", "random", "announcements", "design", "ops"]
+ROOM_STATUSES = ["Available", "In Meeting", "Offline", "Under Construction"]
+TRACKING_FIELDS = [("Cost Center", "CC-100"), ("Department", "Engineering"), ("Project", "Apollo"), ("Region", "EMEA")]
+
+_worker = {}  # per process: spec, and the backend entity documents are written to (files backend)
+
+
+def _rng(spec, *parts):
+    """Random generator for one record: the same seed and parts always draw the same values."""
+    return random.Random(":".join(str(p) for p in (spec["seed"],) + parts))
+
+
+def _fmt(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_date(value):
+    return datetime.datetime.strptime(value, "%Y-%m-%d")
+
+
+@lru_cache(maxsize=65536)
+def _identity(seed, index):
+    """(id, display_name, email) of user index, as user_batch generates it."""
+    u = generate_base_user_data(random.Random(f"{seed}:user:{index}"))
+    return u["id"], u["display_name"], u["email"]
+
+
+def _start_time(rng, spec, tz_offset):
+    """Business-hours start in the host's timezone (peaks late morning and mid afternoon), mostly on weekdays."""
+    first, last = _parse_date(spec["date_from"]), _parse_date(spec["date_to"])
+    days = (last - first).days + 1
+    day = first + datetime.timedelta(days=rng.randrange(days))
+    while day.weekday() >= 5 and rng.random() < 0.9:
+        day = first + datetime.timedelta(days=rng.randrange(days))
+    hour = min(max(int(rng.gauss(rng.choice((10.5, 14.5)), 1.5)), 7), 19)
+    minute = rng.choices((0, 30, 15, 45), weights=(60, 30, 5, 5))[0]
+    return day + datetime.timedelta(hours=hour - tz_offset, minutes=minute)
+
+
+def _participants(rng, spec, host, start, duration):
+    mean = max(1, spec["participants_per_meeting"])
+    count = min(1 + int(rng.expovariate(1 / mean)), 300)
+    out = []
+    for k in range(count):
+        if k == 0:
+            user_id, name, email = host
+        elif rng.random() < 0.8:
+            user_id, name, email = _identity(spec["seed"], rng.randrange(spec["users"]))
+        else:
+            user_id, name = "", f"Guest {generate_random_string(4, rng)}"
+            email = f"{name.split()[1].lower()}@example.com"
+        join = start + datetime.timedelta(seconds=rng.randint(0, 300) if k else 0)
+        leave = start + datetime.timedelta(minutes=duration) - datetime.timedelta(
+            seconds=rng.randint(0, duration * 60 // 2) if rng.random() < 0.2 else rng.randint(0, 120))
+        leave = max(leave, join + datetime.timedelta(seconds=60))
+        out.append({
+            "id": generate_random_string(22, rng),
+            "name": name,
+            "user_id": user_id,
+            "user_email": email,
+            "join_time": _fmt(join),
+            "leave_time": _fmt(leave),
+            "duration": int((leave - join).total_seconds()),
+        })
+    return out
+
+
+def _vtt(rng, participants, duration):
+    lines = ["WEBVTT", ""]
+    t = 0
+    for n in range(1, min(duration * 2, 120) + 1):
+        length = rng.randint(3, 20)
+        lines.append(str(n))
+        lines.append(f"{t // 3600:02d}:{t // 60 % 60:02d}:{t % 60:02d}.000 --> "
+                     f"{(t + length) // 3600:02d}:{(t + length) // 60 % 60:02d}:{(t + length) % 60:02d}.000")
+        lines.append(f"{rng.choice(participants)['name']}: {rng.choice(SENTENCES)}")
+        lines.append("")
+        t += length + rng.randint(0, 10)
+    return "\n".join(lines)
+
+
+def _summary(rng, topic, participants):
+    names = [p["name"].split()[0] for p in participants]
+    return {
+        "summary_title": f"{topic} Meeting",
+        "summary_overview": f"The team met for {topic.lower()} and agreed on the next steps.",
+        "summary_details": [f"{rng.choice(names)}: {rng.choice(SENTENCES)}" for _ in range(rng.randint(2, 5))],
+        "next_steps": rng.sample(NEXT_STEPS, rng.randint(1, 3)),
+    }
+
+
+def _recording_files(rng, meeting_id, start, duration, vtt):
+    end = start + datetime.timedelta(minutes=duration)
+    files = []
+    for file_type, ext, size in (
+        ("MP4", "MP4", duration * 60 * rng.randint(20000, 60000)),
+        ("M4A", "M4A", duration * 60 * rng.randint(12000, 16000)),
+        ("TRANSCRIPT", "VTT", len(vtt.encode("utf-8"))),
+    ):
+        file_id = str(generate_uuid(rng))
+        files.append({
+            "id": file_id,
+            "meeting_id": meeting_id,
+            "recording_start": _fmt(start),
+            "recording_end": _fmt(end),
+            "file_type": file_type,
+            "file_extension": ext,
+            "file_size": size,
+            "play_url": f"{BASE_URL}/rec/play/{file_id[:8]}",
+            "download_url": f"{BASE_URL}/rec/download/{meeting_id}/{file_id[:8]}.{ext.lower()}",
+            "status": "completed",
+            "recording_type": "audio_only" if file_type == "M4A" else "shared_screen_with_speaker_view",
+        })
+    return files
+
+
+def _feedback(rng, meeting_id, end):
+    out = {}
+    for _ in range(rng.randint(1, 3)):
+        feedback_id = generate_random_string(22, rng)
+        out[feedback_id] = {
+            "id": feedback_id,
+            "meeting_id": meeting_id,
+            "rating": rng.choices((1, 2, 3, 4, 5), weights=(3, 4, 10, 33, 50))[0],
+            "comments": rng.choice(FEEDBACK_COMMENTS),
+            "created_at": _fmt(end + datetime.timedelta(minutes=rng.randint(0, 120))),
+        }
+    return out
+
+
+def build_meeting(spec, user_index, k, host, tz):
+    """Meeting k of user user_index; returns (meeting, qss feedback dict)."""
+    rng = _rng(spec, "meeting", user_index, k)
+    meeting_id = generate_random_string(22, rng)
+    start = _start_time(rng, spec, TIMEZONES[tz])
+    duration = rng.choices((15, 30, 45, 60, 90, 120), weights=(10, 35, 10, 30, 10, 5))[0]
+    topic = rng.choice(MEETING_TOPICS)
+    m = {
+        "uuid": meeting_id,
+        "id": meeting_id,
+        "host_id": host[0],
+        "host_email": host[2],
+        "topic": topic,
+        "type": rng.choices((2, 8, 1), weights=(80, 15, 5))[0],
+        "start_time": _fmt(start),
+        "duration": duration,
+        "timezone": tz,
+        "created_at": _fmt(start - datetime.timedelta(days=rng.randint(1, 30), minutes=rng.randint(0, 600))),
+        "join_url": f"{BASE_URL}/j/{meeting_id}",
+        "start_url": f"{BASE_URL}/s/{meeting_id}",
+        "password": generate_random_string(6, rng),
+        "agenda": f"{topic}: {rng.choice(SENTENCES)}",
+        "settings": {
+            "host_video": rng.random() < 0.7,
+            "participant_video": rng.random() < 0.5,
+            "join_before_host": rng.random() < 0.3,
+            "mute_upon_entry": rng.random() < 0.6,
+            "waiting_room": rng.random() < 0.5,
+            "meeting_authentication": rng.random() < 0.2,
+        },
+    }
+    feedback = {}
+    if m["start_time"] < spec["past_until"]:
+        m["participants"] = _participants(rng, spec, host, start, duration)
+        if rng.random() < spec["recording_ratio"]:
+            m["vtt_data"] = _vtt(rng, m["participants"], duration)
+            m["summary"] = _summary(rng, topic, m["participants"])
+            m["recording_files"] = _recording_files(rng, meeting_id, start, duration, m["vtt_data"])
+        if rng.random() < spec["feedback_ratio"]:
+            feedback = _feedback(rng, meeting_id, start + datetime.timedelta(minutes=duration))
+    return m, feedback
+
+
+def build_webinar(spec, user_index, k, host, tz):
+    rng = _rng(spec, "webinar", user_index, k)
+    webinar_id = generate_random_string(22, rng)
+    start = _start_time(rng, spec, TIMEZONES[tz])
+    duration = rng.choice((45, 60, 90, 120))
+    w = {
+        "id": webinar_id,
+        "uuid": webinar_id,
+        "host_id": host[0],
+        "topic": f"{rng.choice(WEBINAR_TOPICS)} Webinar",
+        "type": 5,
+        "start_time": _fmt(start),
+        "duration": duration,
+        "timezone": tz,
+        "created_at": _fmt(start - datetime.timedelta(days=rng.randint(7, 60))),
+        "join_url": f"{BASE_URL}/w/{webinar_id}",
+        "start_url": f"{BASE_URL}/s/{webinar_id}",
+        "password": generate_random_string(8, rng),
+        "agenda": rng.choice(SENTENCES),
+        "settings": {
+            "host_video": True,
+            "panelists_video": rng.random() < 0.8,
+            "practice_session": rng.random() < 0.5,
+            "hd_video": rng.random() < 0.7,
+            "approval_type": rng.choice((0, 1, 2)),
+            "registration_type": rng.choice((1, 2, 3)),
+            "audio": rng.choice(("both", "telephony", "voip")),
+            "auto_recording": rng.choice(("cloud", "local", "none")),
+        },
+    }
+    if w["start_time"] < spec["past_until"]:
+        attendees = []
+        for n in range(min(1 + int(rng.expovariate(1 / (5 * max(1, spec["participants_per_meeting"])))), 1000)):
+            stay = rng.randint(5, duration)
+            join = start + datetime.timedelta(minutes=rng.randint(0, 10))
+            attendees.append({
+                "id": generate_random_string(22, rng),
+                "name": f"Attendee {n + 1}",
+                "user_email": f"attendee{n + 1}.{generate_random_string(5, rng).lower()}@example.com",
+                "duration": stay,
+                "join_time": _fmt(join),
+                "leave_time": _fmt(join + datetime.timedelta(minutes=stay)),
+            })
+        w["participants"] = attendees
+    return w
+
+
+def user_batch(spec, start, stop):
+    """Users start..stop-1 with their meetings and webinars: dict users/meetings/webinars (lists) and qss_feedback."""
+    batch = {"users": [], "meetings": [], "webinars": [], "qss_feedback": {}}
+    for i in range(start, stop):
+        rng = _rng(spec, "user", i)
+        u = generate_base_user_data(rng)
+        host = (u["id"], u["display_name"], u["email"])
+        tz = rng.choice(sorted(TIMEZONES))
+        mean = spec["meetings_per_user"]
+        meeting_count = min(int(rng.expovariate(1 / mean) + 0.5), 20 * mean) if mean > 0 else 0
+        webinars = spec["webinars_per_user"]
+        webinar_count = int(webinars) + (rng.random() < webinars - int(webinars))
+        handle = f"{u['first_name']}.{u['last_name']}{i}".lower()
+        u.update({
+            "timezone": tz,
+            "status": "active" if rng.random() < 0.9 else "inactive",
+            "account_id": spec["account_id"],
+            "vanity_url": f"https://zoom.us/my/{handle}",
+            "personal_meeting_url": f"https://zoom.us/j/{u['pmi']}",
+            "phone_country": rng.choice(("US", "GB", "DE", "JP", "IN", "BR", "AU", "NG", "SG")),
+            "meeting_ids": [],
+            "recording_meeting_ids": [],
+            "webinar_ids": [],
+        })
+        for k in range(meeting_count):
+            m, feedback = build_meeting(spec, i, k, host, tz)
+            batch["meetings"].append(m)
+            batch["qss_feedback"].update(feedback)
+            u["meeting_ids"].append(m["id"])
+            if m.get("recording_files"):
+                u["recording_meeting_ids"].append(m["id"])
+        for k in range(webinar_count):
+            w = build_webinar(spec, i, k, host, tz)
+            batch["webinars"].append(w)
+            u["webinar_ids"].append(w["id"])
+        batch["users"].append(u)
+    return batch
+
+
+def build_channels(spec):
+    """Chat channels: dict id -> channel."""
+    channels = {}
+    for c in range(spec["channels"]):
+        rng = _rng(spec, "channel", c)
+        channel_id = generate_random_string(8, rng)
+        channels[channel_id] = {
+            "id": channel_id,
+            "name": f"{rng.choice(CHANNEL_NAMES)}-{c + 1}",
+            "type": rng.choice((1, 2, 3)),
+            "channel_settings": {},
+        }
+    return channels
+
+
+def chat_batch(spec, channel_index, start, stop, total):
+    """Messages start..stop-1 of a channel (channel_index -1: direct messages), oldest first, without ids."""
+    first = _parse_date(spec["date_from"])
+    span_ms = int(((_parse_date(spec["date_to"]) - first).days + 1) * 86400 * 1000)
+    step = max(1, span_ms // max(1, total))
+    base_ms = int((first - datetime.datetime(1970, 1, 1)).total_seconds() * 1000)
+    out = []
+    for n in range(start, stop):
+        rng = _rng(spec, "chat", channel_index, n)
+        msg = {
+            "message": rng.choice(CHAT_MESSAGES),
+            "sender": _identity(spec["seed"], rng.randrange(spec["users"]))[0] if spec["users"] else "",
+            "timestamp": base_ms + n * step + rng.randrange(step),
+        }
+        if channel_index < 0 and spec["users"]:
+            msg["receiver"] = _identity(spec["seed"], rng.randrange(spec["users"]))[0]
+        out.append(msg)
+    return out
+
+
+def _jobs(spec, channel_ids, batch_size):
+    for start in range(0, spec["users"], batch_size):
+        yield ("users", start, min(start + batch_size, spec["users"]))
+    streams = [(c, channel_id, spec["messages_per_channel"]) for c, channel_id in enumerate(channel_ids)]
+    streams.append((-1, DIRECT_MESSAGES_CHANNEL, spec["direct_messages"]))
+    for c, channel_id, total in streams:
+        for start in range(0, total, CHAT_BATCH_SIZE):
+            yield ("chat", channel_id, c, start, min(start + CHAT_BATCH_SIZE, total), total)
+
+
+def open_backend(name, path):
+    """Backend writing to path: a data/ directory (files) or a database file (sqlite)."""
+    if name == "files":
+        from file_storage import FileStorage
+        return FileStorage(path)
+    if name == "sqlite":
+        from sqlite_storage import SQLiteStorage
+        return SQLiteStorage(path)
+    raise ValueError(f"backend must be one of {', '.join(BACKENDS)}; got {name!r}")
+
+
+def _init_worker(spec, backend_name, path):
+    _worker["spec"] = spec
+    # Entity files are independent: with the files backend each worker writes its own batches.
+    _worker["backend"] = open_backend(backend_name, path) if backend_name == "files" else None
+
+
+def _run(job):
+    spec, backend = _worker["spec"], _worker["backend"]
+    if job[0] == "chat":
+        _, channel_id, c, start, stop, total = job
+        return {"chat": (channel_id, chat_batch(spec, c, start, stop, total))}
+    batch = user_batch(spec, job[1], job[2])
+    if backend is not None:
+        for kind in ENTITY_KINDS:
+            backend.put_entities(kind, batch[kind])
+            batch[kind] = len(batch[kind])
+    return batch
+
+
+def _account_id(spec, data_dir):
+    """Id of the first account in data_dir/accounts.json, creating the file when it has none."""
+    path = os.path.join(data_dir, "accounts.json")
+    data = load_json(path, default={"accounts": []})
+    accounts = data.get("accounts") if isinstance(data, dict) else data
+    if accounts:
+        return accounts[0]["id"]
+    rng = _rng(spec, "account")
+    account = {
+        "id": f"acct_{generate_random_string(12, rng).lower()}",
+        "account_name": "Synthetic Load Test Inc.",
+        "owner_email": "admin@example.com",
+        "owner_id": _identity(spec["seed"], 0)[0] if spec["users"] else "",
+        "account_type": "2",
+        "seats": max(spec["users"], 1),
+        "subscription_start_time": f"{spec['date_from']}T00:00:00Z",
+        "subscription_end_time": f"{spec['date_to']}T23:59:59Z",
+        "created_at": f"{spec['date_from']}T00:00:00Z",
+    }
+    write_json_file(path, {"accounts": [account]})
+    return account["id"]
+
+
+def _static_collections(spec):
+    rooms = []
+    for r in range(spec["rooms"]):
+        rng = _rng(spec, "room", r)
+        rooms.append({
+            "id": generate_random_string(22, rng),
+            "name": f"Conference Room {r + 1}",
+            "calendar_name": f"Room {r + 1}",
+            "status": rng.choice(ROOM_STATUSES),
+            "location_id": f"loc{r // 10 + 1}",
+        })
+    rng = _rng(spec, "tracking_fields")
+    fields = [{"id": generate_random_string(22, rng), "field": field, "value": value, "visible": True}
+              for field, value in TRACKING_FIELDS]
+    return rooms, fields
+
+
+def _merge_list(existing, new):
+    ids = {item["id"] for item in new}
+    return [item for item in existing if item.get("id") not in ids] + new
+
+
+def generate(backend="files", path=DATA_DIR, data_dir=None, workers=None, batch_size=DEFAULT_BATCH_SIZE,
+             progress=None, **sizes):
+    """
+    Write a dataset to backend ("files" or "sqlite") at path; sizes override DEFAULTS. data_dir
+    holds accounts.json (path itself for files, DATA_DIR otherwise). progress(done, total) is
+    called after every job. Returns the number of records written per kind.
+    """
+    unknown = set(sizes) - set(DEFAULTS)
+    if unknown:
+        raise TypeError(f"unknown dataset sizes: {', '.join(sorted(unknown))}")
+    spec = dict(DEFAULTS, **sizes)
+    if data_dir is None:
+        data_dir = path if backend == "files" else DATA_DIR
+    spec["account_id"] = _account_id(spec, data_dir)
+    target = open_backend(backend, path)
+    channels = build_channels(spec)
+    jobs = list(_jobs(spec, list(channels), max(1, batch_size)))
+    counts = dict.fromkeys(("users", "meetings", "webinars", "qss_feedback", "chat_messages"), 0)
+    feedback = {}
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(spec, backend, path))
+        results = pool.imap(_run, jobs)
+    else:
+        _init_worker(spec, backend, path)
+        results = map(_run, jobs)
+    try:
+        for done, batch in enumerate(results, 1):
+            if "chat" in batch:
+                channel_id, messages = batch["chat"]
+                target.chat_extend(channel_id, messages)
+                counts["chat_messages"] += len(messages)
+            else:
+                for kind in ENTITY_KINDS:
+                    docs = batch[kind]
+                    if isinstance(docs, list):
+                        target.put_entities(kind, docs)
+                        docs = len(docs)
+                    counts[kind] += docs
+                feedback.update(batch["qss_feedback"])
+            if progress is not None:
+                progress(done, len(jobs))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    rooms, fields = _static_collections(spec)
+    target.modify_collection("rooms", lambda existing: _merge_list(existing, rooms))
+    target.modify_collection("tracking_fields", lambda existing: _merge_list(existing, fields))
+    target.modify_collection("chat_channels", lambda existing: dict(existing, **channels))
+    target.modify_collection("qss_feedback", lambda existing: dict(existing, **feedback))
+    target.flush()
+    counts.update(qss_feedback=len(feedback), chat_channels=len(channels), rooms=len(rooms), tracking_fields=len(fields))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic dataset")
+    parser.add_argument("--backend", choices=BACKENDS, default="files")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="files backend target; accounts.json location")
+    parser.add_argument("--db", default=SQLITE_PATH, help="sqlite backend target")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="users per job")
+    for key, default in DEFAULTS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(default), default=default)
+    args = parser.parse_args(argv)
+    sizes = {key: getattr(args, key) for key in DEFAULTS}
+    shown = [0]
+
+    def progress(done, total):
+        pct = done * 100 // total
+        if pct >= shown[0] + 5 or done == total:
+            shown[0] = pct
+            print(f"{pct}% ({done}/{total} jobs)", file=sys.stderr)
+
+    started = time.perf_counter()
+    counts = generate(
+        args.backend, args.data_dir if args.backend == "files" else args.db, data_dir=args.data_dir,
+        workers=args.workers, batch_size=args.batch_size, progress=progress, **sizes,
+    )
+    for name, n in counts.items():
+        print(f"{name}: {n}")
+    print(f"elapsed: {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
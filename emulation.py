@@ -0,0 +1,320 @@
+"""
+Zoom rate-limit and latency emulation for app.asgi_app. It is mock-only, so clients can exercise
+their batching, backoff and timeouts.
+
+A profile assigns each endpoint to one of Zoom's rate-limit categories and gives the settings for
+each category. Individual endpoints can override them:
+
+    {
+      "categories": {
+        "light":  {"rate": 80, "latency_ms": [60, 250]},
+        "heavy":  {"rate": 40, "latency_ms": [250, 1500], "error_rate": 0.01, "error_status": 503}
+      },
+      "endpoints": {"meetings.get_meeting_by_id": {"category": "medium", "rate": 5}}
+    }
+
+- rate: requests per second in one token bucket per endpoint (burst: one second's worth, at least
+  1). A request that finds the bucket empty gets an immediate 429 with Retry-After and Zoom's
+  X-RateLimit-Category / X-RateLimit-Type headers. Missing or null means no limit.
+- latency_ms: a fixed delay, or [median, p99] of a log-normal delay. The delay is awaited on the
+  event loop, so it holds no executor thread.
+- error_rate / error_status: the share of requests answered with error_status (default 500)
+  instead of reaching the app.
+
+Endpoints without an override are categorized from their URL rule. /v2/metrics/... is
+resource_intensive and /v2/report/... is heavy. A GET of a single resource (the rule ends in a
+<variable>) is light and any other GET is medium. POST is medium and other writes are light.
+/metrics, CORS preflights and the mock's own /cache, /_debug and /_emulation endpoints are never
+emulated.
+
+EMULATION_PROFILE is the profile at start: a name from PROFILES or the path of a JSON file. PUT
+/v2/_emulation switches profiles at runtime. The choice is written to EMULATION_STATE_PATH, and
+every worker reloads that file within RELOAD_INTERVAL. Buckets are kept per worker process, so N
+workers allow up to N times the rate.
+"""
+import os
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import threading
+
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import HTTP_STATUS_CODES
+
+import metrics
+from helpers import error_response
+from journal import write_json_file
+from config import EMULATION_PROFILE, EMULATION_STATE_PATH
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("light", "medium", "heavy", "resource_intensive")
+CATEGORY_HEADERS = {"light": "Light", "medium": "Medium", "heavy": "Heavy", "resource_intensive": "Resource-intensive"}
+SETTINGS = ("rate", "latency_ms", "error_rate", "error_status")
+EXEMPT_BLUEPRINTS = {"cache", "debug", "emulation"}
+RELOAD_INTERVAL = 1.0
+MAX_DELAY = 60.0
+# z-score of the 99th percentile of a standard normal distribution.
+Z_P99 = 2.3263
+
+_business = {"light": {"rate": 80}, "medium": {"rate": 60}, "heavy": {"rate": 40}, "resource_intensive": {"rate": 20}}
+
+# Per-second limits of Zoom's Pro and Business+ plans; zoom_realistic adds latency and rare errors.
+PROFILES = {
+    "off": {},
+    "zoom_pro": {"categories": {
+        "light": {"rate": 30}, "medium": {"rate": 20}, "heavy": {"rate": 10}, "resource_intensive": {"rate": 10 / 60},
+    }},
+    "zoom_business": {"categories": _business},
+    "zoom_realistic": {"categories": {
+        name: dict(settings, latency_ms=latency, error_rate=0.001)
+        for (name, settings), latency in zip(_business.items(), ([60, 250], [90, 400], [250, 1500], [500, 3000]))
+    }},
+}
+
+LIMITED_MESSAGE = "You have reached the maximum per-second rate limit for this API. Try again later."
+
+
+def _check_settings(where, settings, allow_category=False):
+    if not isinstance(settings, dict):
+        raise ValueError(f"{where} must be an object")
+    allowed = SETTINGS + (("category",) if allow_category else ())
+    unknown = set(settings) - set(allowed)
+    if unknown:
+        raise ValueError(f"{where}: unknown settings {sorted(unknown)}; expected some of {list(allowed)}")
+    rate = settings.get("rate")
+    if rate is not None and (not isinstance(rate, (int, float)) or rate <= 0):
+        raise ValueError(f"{where}.rate must be a positive number or null")
+    latency = settings.get("latency_ms")
+    if latency is not None:
+        ok = isinstance(latency, (int, float)) and latency >= 0
+        ok = ok or (isinstance(latency, list) and len(latency) == 2 and all(isinstance(v, (int, float)) for v in latency)
+                    and 0 < latency[0] <= latency[1])
+        if not ok:
+            raise ValueError(f"{where}.latency_ms must be a number of ms or [median, p99] with 0 < median <= p99")
+    error_rate = settings.get("error_rate")
+    if error_rate is not None and (not isinstance(error_rate, (int, float)) or not 0 <= error_rate <= 1):
+        raise ValueError(f"{where}.error_rate must be between 0 and 1")
+    status = settings.get("error_status")
+    if status is not None and (not isinstance(status, int) or not 400 <= status <= 599):
+        raise ValueError(f"{where}.error_status must be an HTTP error status")
+    category = settings.get("category")
+    if category is not None and category not in CATEGORIES:
+        raise ValueError(f"{where}.category must be one of {list(CATEGORIES)}")
+
+
+def resolve(spec):
+    """(name, profile dict) for a profile name, JSON file path or profile dict. ValueError if invalid."""
+    if isinstance(spec, str):
+        if spec in PROFILES:
+            return spec, PROFILES[spec]
+        if not os.path.isfile(spec):
+            raise ValueError(f"unknown emulation profile {spec!r}; expected one of {sorted(PROFILES)} or a JSON file")
+        with open(spec, "r", encoding="utf-8") as f:
+            name, profile = spec, json.load(f)
+    elif isinstance(spec, dict):
+        name, profile = "custom", spec
+    else:
+        raise ValueError("profile must be a profile name or an object")
+    if not isinstance(profile, dict) or set(profile) - {"categories", "endpoints"}:
+        raise ValueError("a profile is an object with categories and/or endpoints")
+    categories = profile.get("categories") or {}
+    endpoints = profile.get("endpoints") or {}
+    if not isinstance(categories, dict) or not isinstance(endpoints, dict):
+        raise ValueError("categories and endpoints must be objects")
+    for category, settings in categories.items():
+        if category not in CATEGORIES:
+            raise ValueError(f"unknown category {category!r}; expected one of {list(CATEGORIES)}")
+        _check_settings(f"categories.{category}", settings)
+    for endpoint, settings in endpoints.items():
+        _check_settings(f"endpoints.{endpoint}", settings, allow_category=True)
+    return name, profile
+
+
+def categorize(method, rule):
+    """Zoom rate-limit category of a request to the URL rule (e.g. "/v2/meetings/<meeting_id>")."""
+    if rule.startswith("/v2/metrics/"):
+        return "resource_intensive"
+    if rule.startswith("/v2/report/"):
+        return "heavy"
+    if method == "GET":
+        return "light" if rule.endswith(">") else "medium"
+    return "medium" if method == "POST" else "light"
+
+
+class _Endpoint:
+    """Settings and token bucket of one endpoint under one profile."""
+
+    def __init__(self, category, settings):
+        self.category = category
+        self.header = CATEGORY_HEADERS[category].encode("ascii")
+        self.labels = (("category", category),)
+        self.rate = settings.get("rate")
+        self.burst = max(1.0, self.rate) if self.rate else None
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+        latency = settings.get("latency_ms")
+        if isinstance(latency, list):
+            median, p99 = latency
+            self.latency = (math.log(median / 1000.0), math.log(p99 / median) / Z_P99)
+        elif latency:
+            self.latency = (latency / 1000.0, None)
+        else:
+            self.latency = None
+        self.error_rate = settings.get("error_rate") or 0.0
+        self.error_status = settings.get("error_status") or 500
+
+    def take(self, now):
+        """Take a token: 0 when allowed, else the seconds until the next one."""
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0
+        return (1.0 - self.tokens) / self.rate
+
+    def delay(self):
+        mu, sigma = self.latency
+        if sigma is None:
+            return mu
+        return min(MAX_DELAY, random.lognormvariate(mu, sigma))
+
+
+class _Profile:
+    def __init__(self, name, profile, source):
+        self.name = name
+        self.profile = profile
+        self.source = source
+        self.endpoints = {}  # endpoint -> _Endpoint, filled as requests arrive
+
+    def endpoint(self, endpoint, method, rule):
+        found = self.endpoints.get((endpoint, method))
+        if found is None:
+            override = (self.profile.get("endpoints") or {}).get(endpoint, {})
+            category = override.get("category") or categorize(method, rule)
+            settings = dict((self.profile.get("categories") or {}).get(category, {}))
+            settings.update((k, v) for k, v in override.items() if k != "category")
+            found = self.endpoints[(endpoint, method)] = _Endpoint(category, settings)
+        return found
+
+    def describe(self):
+        now = time.monotonic()
+        return {
+            "profile": self.name,
+            "source": self.source,
+            "definition": self.profile,
+            "endpoints": {
+                f"{method} {endpoint}": {
+                    "category": e.category,
+                    "rate": e.rate,
+                    "tokens": round(min(e.burst, e.tokens + (now - e.stamp) * e.rate), 3) if e.rate else None,
+                }
+                for (endpoint, method), e in sorted(self.endpoints.items())
+            },
+        }
+
+
+_lock = threading.Lock()
+_state = {"profile": None, "mtime": None, "next_check": 0.0}
+
+
+def _default():
+    return _Profile(*resolve(EMULATION_PROFILE), source="EMULATION_PROFILE")
+
+
+def _reload():
+    try:
+        mtime = os.stat(EMULATION_STATE_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+    if _state["profile"] is not None and mtime == _state["mtime"]:
+        return
+    profile = None
+    if mtime is not None:
+        try:
+            with open(EMULATION_STATE_PATH, "r", encoding="utf-8") as f:
+                profile = _Profile(*resolve(json.load(f)["profile"]), source="runtime")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("ignoring emulation state %s: %s", EMULATION_STATE_PATH, e)
+    _state["profile"] = profile or _default()
+    _state["mtime"] = mtime
+
+
+def current():
+    """The active _Profile (re-reading EMULATION_STATE_PATH at most once per RELOAD_INTERVAL)."""
+    now = time.monotonic()
+    if now >= _state["next_check"]:
+        with _lock:
+            if now >= _state["next_check"]:
+                _reload()
+                _state["next_check"] = now + RELOAD_INTERVAL
+    return _state["profile"]
+
+
+def set_profile(spec):
+    """Switch every worker to spec (see resolve); None goes back to EMULATION_PROFILE. Returns the new profile."""
+    with _lock:
+        if spec is None:
+            try:
+                os.remove(EMULATION_STATE_PATH)
+            except FileNotFoundError:
+                pass
+            profile, mtime = _default(), None
+        else:
+            profile = _Profile(*resolve(spec), source="runtime")
+            write_json_file(EMULATION_STATE_PATH, {"profile": spec})
+            mtime = os.stat(EMULATION_STATE_PATH).st_mtime_ns
+        _state.update(profile=profile, mtime=mtime, next_check=time.monotonic() + RELOAD_INTERVAL)
+    return profile
+
+
+async def _send_error(send, status, message, headers):
+    body = json.dumps(error_response(status, message)).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"access-control-allow-origin", b"*"),
+        ] + headers,
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def emulate(urls, scope, send):
+    """Apply the active profile to an http request. True when it was answered here (429 or injected error)."""
+    profile = current()
+    if not profile.profile or scope["method"] == "OPTIONS":
+        return False
+    try:
+        rule, _ = urls.match(scope["path"], scope["method"], return_rule=True)
+    except HTTPException:
+        return False
+    if rule.endpoint == "metrics" or rule.endpoint.partition(".")[0] in EXEMPT_BLUEPRINTS:
+        return False
+    e = profile.endpoint(rule.endpoint, scope["method"], rule.rule)
+    if e.rate:
+        wait = e.take(time.monotonic())
+        if wait:
+            metrics.add("emulation_rate_limited_total", e.labels)
+            await _send_error(send, 429, LIMITED_MESSAGE, [
+                (b"retry-after", str(math.ceil(wait)).encode("ascii")),
+                (b"x-ratelimit-category", e.header),
+                (b"x-ratelimit-type", b"QPS"),
+                (b"x-ratelimit-limit", f"{e.rate:g}".encode("ascii")),
+                (b"x-ratelimit-remaining", b"0"),
+            ])
+            return True
+    if e.latency:
+        delay = e.delay()
+        metrics.observe("emulation_delay_seconds", e.labels, delay)
+        await asyncio.sleep(delay)
+    if e.error_rate and random.random() < e.error_rate:
+        metrics.add("emulation_errors_total", e.labels)
+        await _send_error(send, e.error_status, HTTP_STATUS_CODES.get(e.error_status, "Error"), [])
+        return True
+    return False
@@ -0,0 +1,651 @@
+"""
+File-tree storage backend (STORAGE_BACKEND=files). Layout under the root directory (data/):
+- users/<id>.json, meetings/<id>.json, webinars/<id>.json → one document per entity
+- tracking_fields.json, rooms.json, chat_channels.json, qss_feedback.json → collections
+- chat_logs/<channel_id>.jsonl → append-only chat message log per channel
+  (chat_messages.json is imported once, when chat_logs/ does not exist yet)
+
+Parsed users, meetings and webinars are kept in per-directory repositories and revalidated
+against the file's (mtime, size, inode) on every read, so edits made on disk (or by another
+worker process) are still picked up. Writes go through journal.Journal (see PERSISTENCE_MODE).
+
+Several worker processes may share one tree: snapshot files are replaced atomically, and
+read-modify-write cycles (modify_collection / modify_entity, chat appends, compaction) hold an
+advisory lock under .locks/. Cross-process consistency needs PERSISTENCE_MODE=sync, since group
+and memory mode keep the newest documents in the writing process until they are flushed.
+"""
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from urllib.parse import quote, unquote
+
+from journal import Journal, FileLock, _MISSING
+from storage import StorageBackend, COLLECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+def load_json(path, default=None):
+    if default is None:
+        default = {}
+    if not os.path.isfile(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return default
+
+
+def _list_json_files(dir_path):
+    if not os.path.isdir(dir_path):
+        return []
+    return [
+        os.path.splitext(f)[0]
+        for f in os.listdir(dir_path)
+        if f.endswith(".json")
+    ]
+
+
+def _file_signature(path):
+    """Cheap change detector for a file: (mtime_ns, size, inode), or None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class _EntityRepository:
+    """
+    In-memory view of one data/<kind>/ directory, keyed by entity id.
+    A read costs one os.stat; the file is only re-parsed when its signature changed.
+    The id listing is cached against the directory's own signature (files added/removed).
+    """
+
+    def __init__(self, dir_path, journal):
+        self.dir_path = dir_path
+        self.journal = journal
+        self._entries = {}
+        self._ids = None
+        self._ids_sig = None
+
+    def path_for(self, entity_id):
+        return os.path.join(self.dir_path, f"{entity_id}.json")
+
+    def get(self, entity_id):
+        path = self.path_for(entity_id)
+        pending = self.journal.pending(path)
+        if pending is not _MISSING:
+            return pending
+        sig = _file_signature(path)
+        if sig is None:
+            self._entries.pop(entity_id, None)
+            return None
+        entry = self._entries.get(entity_id)
+        if entry is not None and entry[0] == sig:
+            return entry[1]
+        data = load_json(path) or None
+        self._entries[entity_id] = (sig, data)
+        return data
+
+    def put(self, entity_id, payload):
+        path = self.path_for(entity_id)
+        before = _file_signature(self.dir_path)
+        self.journal.write(path, payload)
+        if self.journal.mode == "sync":
+            self.remember(entity_id, payload)
+            self._track_own_write(entity_id, before)
+
+    def _track_own_write(self, entity_id, before):
+        # The listing was current until this write, which only added entity_id: keep it
+        # instead of listing the directory again on the next ids().
+        ids = self._ids
+        if ids is None or before != self._ids_sig:
+            return
+        i = bisect.bisect_left(ids, entity_id)
+        if i == len(ids) or ids[i] != entity_id:
+            ids = ids[:i] + [entity_id] + ids[i:]
+        self._ids, self._ids_sig = ids, _file_signature(self.dir_path)
+
+    def remember(self, entity_id, payload):
+        """Cache payload as the parsed content of the entity's file as it is on disk now."""
+        self._entries[entity_id] = (_file_signature(self.path_for(entity_id)), payload)
+
+    def ids(self):
+        sig = _file_signature(self.dir_path)
+        if self._ids is None or sig != self._ids_sig:
+            self._ids = sorted(_list_json_files(self.dir_path))
+            self._ids_sig = sig
+        unflushed = self.journal.pending_ids(self.dir_path)
+        if unflushed:
+            return sorted(set(self._ids).union(unflushed))
+        return self._ids
+
+
+# Upper bound for (start_time, id) tuples so bisect_right includes every id at that start_time.
+_MAX_ID = "\U0010ffff"
+
+
+class _MeetingIndex:
+    """
+    Secondary indexes over data/meetings/: host_id -> [(start_time, id)] and a global
+    [(start_time, id)] list, both kept sorted so date ranges are bisect lookups.
+    Built lazily from the repository; whenever the meetings directory changes on disk (a file
+    added, removed or atomically replaced, possibly by another worker) each meeting is checked
+    against the repository and only new, removed or rewritten meetings are (un)indexed.
+    Saves made through put() are indexed directly; when the directory had not changed since the
+    last scan, the signature it has after the save is adopted, so this process's own writes do not
+    trigger a rescan.
+    """
+
+    def __init__(self, repo):
+        self._repo = repo
+        self._lock = threading.Lock()
+        self._built_for = None
+        self._all = []
+        self._by_host = {}
+        self._keys = {}
+        self._docs = {}
+
+    def _insert(self, meeting_id, m):
+        entry = (m.get("start_time") or "", meeting_id)
+        host_id = m.get("host_id") or ""
+        bisect.insort(self._all, entry)
+        bisect.insort(self._by_host.setdefault(host_id, []), entry)
+        self._keys[meeting_id] = (host_id, entry)
+        self._docs[meeting_id] = m
+
+    def _remove(self, meeting_id):
+        self._docs.pop(meeting_id, None)
+        old = self._keys.pop(meeting_id, None)
+        if old is None:
+            return
+        host_id, entry = old
+        for entries in (self._all, self._by_host.get(host_id, [])):
+            i = bisect.bisect_left(entries, entry)
+            if i < len(entries) and entries[i] == entry:
+                del entries[i]
+
+    def _ensure(self):
+        sig = _file_signature(self._repo.dir_path)
+        if self._built_for is not None and sig == self._built_for:
+            return
+        with self._lock:
+            ids = set(self._repo.ids())
+            for mid in [k for k in self._keys if k not in ids]:
+                self._remove(mid)
+            for mid in ids:
+                # The repository returns the same object until the file's signature changes.
+                m = self._repo.get(mid)
+                if m is self._docs.get(mid):
+                    continue
+                self._remove(mid)
+                if m:
+                    self._insert(mid, m)
+            self._built_for = sig
+
+    def put(self, meeting_id, m):
+        """Save a meeting through the repository and index it."""
+        with self._lock:
+            before = _file_signature(self._repo.dir_path)
+            self._repo.put(meeting_id, m)
+            if self._built_for is None:
+                return
+            self._remove(meeting_id)
+            self._insert(meeting_id, m)
+            if before == self._built_for:
+                self._built_for = _file_signature(self._repo.dir_path)
+
+    def _bounds(self, host_id, from_date, to_date):
+        self._ensure()
+        entries = self._all if host_id is None else self._by_host.get(host_id, [])
+        lo = bisect.bisect_left(entries, (from_date, "")) if from_date else 0
+        hi = bisect.bisect_right(entries, (to_date + "T23:59:59", _MAX_ID)) if to_date else len(entries)
+        return entries, lo, hi
+
+    def ids_in_range(self, host_id=None, from_date=None, to_date=None):
+        """Meeting ids ordered by start_time, with from_date <= start_time <= to_date end of day."""
+        entries, lo, hi = self._bounds(host_id, from_date, to_date)
+        return [mid for _, mid in entries[lo:hi]]
+
+    def keys_in_range(self, host_id=None, from_date=None, to_date=None, after=None, offset=0, limit=None):
+        """(start_time, id) entries of ids_in_range, resuming after a key with one bisect."""
+        entries, lo, hi = self._bounds(host_id, from_date, to_date)
+        if after is not None:
+            lo = max(lo, bisect.bisect_right(entries, tuple(after)))
+        lo += offset
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return entries[lo:hi] if lo < hi else []
+
+    def count_in_range(self, host_id=None, from_date=None, to_date=None):
+        _, lo, hi = self._bounds(host_id, from_date, to_date)
+        return max(0, hi - lo)
+
+
+class _ChatLog:
+    """
+    Append-only message log for one channel: <root>/chat_logs/<channel_id>.jsonl.
+    Each line is a record: {"op": "put", "msg": {...}}, {"op": "edit", "id", "sender", "fields"}
+    or {"op": "del", "id", "sender"}; compaction may start the file with {"op": "seq", "value"}
+    so message ids are never reused. Edits and deletes are tombstones applied to the first live
+    message with that id (and sender, when given). Reads only parse bytes appended since the
+    last read; a log that shrank or was replaced (compaction) is re-read from the start.
+    In memory persistence mode the log detaches from its file on the first write.
+    lock serialises writers across threads and worker processes; _state_lock guards the
+    in-memory view while it catches up with the file.
+    """
+
+    def __init__(self, channel_id, logs_dir, journal, lock_path=None, on_write=None):
+        self.channel_id = channel_id
+        self.logs_dir = logs_dir
+        self.path = os.path.join(logs_dir, quote(channel_id, safe="") + ".jsonl")
+        self.journal = journal
+        self.on_write = on_write
+        self.lock = FileLock(lock_path if journal.persistent else None)
+        self._state_lock = threading.RLock()
+        self.detached = False
+        self.removed = False
+        self._reset(None)
+
+    def _detach(self):
+        self.sync()
+        self.detached = True
+        self.removed = False
+
+    def _reset(self, ino):
+        self._ino = ino
+        self._offset = 0
+        self._messages = {}
+        self._seq = 0
+        self.records = 0
+
+    def _find(self, message_id, sender):
+        for seq, msg in self._messages.items():
+            if str(msg.get("id")) == str(message_id) and (sender is None or msg.get("sender") == sender):
+                return seq
+        return None
+
+    def _apply(self, record):
+        op = record.get("op")
+        if op == "seq":
+            self._seq = max(self._seq, int(record.get("value") or 0))
+            return
+        self.records += 1
+        if op == "put":
+            self._seq += 1
+            self._messages[self._seq] = record.get("msg") or {}
+            return
+        seq = self._find(record.get("id"), record.get("sender"))
+        if seq is None:
+            return
+        if op == "edit":
+            self._messages[seq] = dict(self._messages[seq], **(record.get("fields") or {}))
+        elif op == "del":
+            del self._messages[seq]
+
+    def sync(self):
+        """Catch up with the file on disk."""
+        if self.detached:
+            return
+        with self._state_lock:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                self._reset(None)
+                return
+            if st.st_ino != self._ino or st.st_size < self._offset:
+                self._reset(st.st_ino)
+            if st.st_size == self._offset:
+                return
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read(st.st_size - self._offset)
+            end = chunk.rfind(b"\n") + 1  # ignore a partially written last line
+            for line in chunk[:end].splitlines():
+                if line.strip():
+                    try:
+                        self._apply(json.loads(line))
+                    except ValueError:
+                        self.records += 1
+            self._offset += end
+
+    def messages(self):
+        self.sync()
+        with self._state_lock:
+            return list(self._messages.values())
+
+    def live_count(self):
+        return len(self._messages)
+
+    def next_seq(self):
+        self.sync()
+        return self._seq
+
+    def next_id(self):
+        return str(self.next_seq() + 1)
+
+    def find(self, message_id, sender=None):
+        self.sync()
+        with self._state_lock:
+            seq = self._find(message_id, sender)
+            return None if seq is None else self._messages[seq]
+
+    def append(self, *records):
+        """Append records in one write; costs O(records) I/O regardless of history size."""
+        if not self.journal.persistent:
+            with self.lock, self._state_lock:
+                self._detach()
+                for record in records:
+                    self._apply(record)
+            return
+        with self.lock:
+            os.makedirs(self.logs_dir, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+            self.sync()
+        if self.on_write is not None:
+            self.on_write()
+
+    def rewrite(self, messages, seq=0):
+        """Replace the log with one put record per message (compaction / bulk save)."""
+        if not self.journal.persistent:
+            with self.lock, self._state_lock:
+                self._detach()
+                self._reset(None)
+                self._seq = max(0, seq - len(messages))
+                for msg in messages:
+                    self._apply({"op": "put", "msg": msg})
+            return
+        with self.lock:
+            os.makedirs(self.logs_dir, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                if seq > len(messages):
+                    # put records below advance the sequence again
+                    f.write(json.dumps({"op": "seq", "value": seq - len(messages)}, separators=(",", ":")) + "\n")
+                for msg in messages:
+                    f.write(json.dumps({"op": "put", "msg": msg}, separators=(",", ":")) + "\n")
+            os.replace(tmp, self.path)
+            self.sync()
+
+    def remove(self):
+        if not self.journal.persistent:
+            with self.lock, self._state_lock:
+                self._detach()
+                self._reset(None)
+                self.removed = True
+            return
+        with self.lock, self._state_lock:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self._reset(None)
+
+
+class FileStorage(StorageBackend):
+    """StorageBackend over a data/ directory tree."""
+
+    def __init__(self, root_dir, persistence_mode="sync", group_commit_interval_ms=50,
+                 compact_interval=30, compact_min_garbage=64):
+        self.root_dir = root_dir
+        self.journal = Journal(persistence_mode, os.path.join(root_dir, "journal.wal"), root_dir,
+                               interval_ms=group_commit_interval_ms)
+        self.repos = {kind: _EntityRepository(os.path.join(root_dir, kind), self.journal) for kind in ("users", "meetings", "webinars")}
+        self.meeting_index = _MeetingIndex(self.repos["meetings"])
+        self._repos_by_dir = {repo.dir_path: repo for repo in self.repos.values()}
+        self.journal.add_flush_listener(self._on_journal_flush)
+        self.chat_logs_dir = os.path.join(root_dir, "chat_logs")
+        self.compact_interval = compact_interval
+        self.compact_min_garbage = compact_min_garbage
+        self._chat_logs = {}
+        self._chat_lock = threading.Lock()
+        self._chat_migrated = False
+        self._compactor = None
+        self.locks_dir = os.path.join(root_dir, ".locks")
+        self._locks = {}
+
+    def _lock(self, name):
+        """FileLock for one collection or entity kind (.locks/<name>.lock)."""
+        lock = self._locks.get(name)
+        if lock is None:
+            with self._chat_lock:
+                lock = self._locks.get(name)
+                if lock is None:
+                    path = os.path.join(self.locks_dir, f"{name}.lock") if self.journal.persistent else None
+                    lock = self._locks[name] = FileLock(path)
+        return lock
+
+    def _on_journal_flush(self, path, payload):
+        repo = self._repos_by_dir.get(os.path.dirname(path))
+        if repo is not None:
+            repo.remember(os.path.splitext(os.path.basename(path))[0], payload)
+
+    # ---- entities ----
+    def get_entity(self, kind, entity_id, fields=None, omit=()):
+        # The parsed document is cached whole; handing it out as is costs nothing.
+        return self.repos[kind].get(entity_id)
+
+    def put_entity(self, kind, entity_id, doc):
+        if kind == "meetings":
+            self.meeting_index.put(entity_id, doc)
+        else:
+            self.repos[kind].put(entity_id, doc)
+
+    def entity_version(self, kind, entity_id):
+        path = self.repos[kind].path_for(entity_id)
+        pending = self.journal.pending_version(path)
+        if pending is not None:
+            seq, written_at = pending
+            return f"{os.getpid():x}.{seq:x}", written_at
+        sig = _file_signature(path)
+        if sig is None:
+            return None
+        mtime_ns, size, ino = sig
+        return f"{mtime_ns:x}.{size:x}.{ino:x}", mtime_ns / 1e9
+
+    def modify_entity(self, kind, entity_id, fn):
+        with self._lock(kind):
+            doc = fn(self.get_entity(kind, entity_id))
+            if doc is not None:
+                self.put_entity(kind, entity_id, doc)
+            return doc
+
+    def list_entity_ids(self, kind, after=None, offset=0, limit=None):
+        ids = self.repos[kind].ids()
+        if after is None and not offset and limit is None:
+            return ids
+        start = (bisect.bisect_right(ids, after) if after is not None else 0) + offset
+        return ids[start:] if limit is None else ids[start:start + limit]
+
+    def count_entities(self, kind):
+        return len(self.repos[kind].ids())
+
+    def meeting_ids_in_range(self, host_id=None, from_date=None, to_date=None):
+        return self.meeting_index.ids_in_range(host_id=host_id, from_date=from_date, to_date=to_date)
+
+    def meeting_keys_in_range(self, host_id=None, from_date=None, to_date=None, after=None, offset=0, limit=None):
+        return self.meeting_index.keys_in_range(host_id, from_date, to_date, after=after, offset=offset, limit=limit)
+
+    def count_meetings_in_range(self, host_id=None, from_date=None, to_date=None):
+        return self.meeting_index.count_in_range(host_id, from_date, to_date)
+
+    # ---- collections ----
+    def _collection_path(self, name):
+        return os.path.join(self.root_dir, f"{name}.json")
+
+    def _collection_key(self, name):
+        return "channels" if name == "chat_channels" else "feedback" if name == "qss_feedback" else name
+
+    def get_collection(self, name):
+        kind = COLLECTIONS[name]
+        key = self._collection_key(name)
+        path = self._collection_path(name)
+        data = self.journal.pending(path)
+        if data is _MISSING:
+            data = load_json(path, default={key: kind()})
+        if isinstance(data, dict) and key in data:
+            return kind(data[key])
+        return kind(data) if isinstance(data, kind) else kind()
+
+    def put_collection(self, name, value):
+        kind = COLLECTIONS[name]
+        with self._lock(name):
+            self.journal.write(self._collection_path(name), {self._collection_key(name): kind(value)})
+
+    def modify_collection(self, name, fn):
+        with self._lock(name):
+            value = fn(self.get_collection(name))
+            if value is not None:
+                self.put_collection(name, value)
+            return value
+
+    # ---- chat messages ----
+    def _chat_log(self, channel_id):
+        self._migrate_legacy_chat_messages()
+        channel_id = str(channel_id)
+        log = self._chat_logs.get(channel_id)
+        if log is None:
+            with self._chat_lock:
+                log = self._chat_logs.get(channel_id)
+                if log is None:
+                    log = _ChatLog(
+                        channel_id, self.chat_logs_dir, self.journal,
+                        lock_path=os.path.join(self.locks_dir, "chat_logs", quote(channel_id, safe="") + ".lock"),
+                        on_write=self._ensure_compactor,
+                    )
+                    self._chat_logs[channel_id] = log
+        return log
+
+    def _migrate_legacy_chat_messages(self):
+        """One-time import of chat_messages.json into per-channel logs (when no log dir exists yet)."""
+        if self._chat_migrated:
+            return
+        self._chat_migrated = True
+        if os.path.isdir(self.chat_logs_dir):
+            return
+        data = load_json(os.path.join(self.root_dir, "chat_messages.json"), default={"messages": {}})
+        legacy = data.get("messages", {}) if isinstance(data, dict) else {}
+        if self.journal.persistent:
+            os.makedirs(self.chat_logs_dir, exist_ok=True)
+        for channel_id, msgs in (legacy or {}).items():
+            self._chat_log(channel_id).rewrite(msgs or [])
+
+    def chat_channel_ids(self):
+        self._migrate_legacy_chat_messages()
+        ids = set()
+        if os.path.isdir(self.chat_logs_dir):
+            ids.update(unquote(f[: -len(".jsonl")]) for f in os.listdir(self.chat_logs_dir) if f.endswith(".jsonl"))
+        for channel_id, log in list(self._chat_logs.items()):
+            if log.detached:
+                if log.removed:
+                    ids.discard(channel_id)
+                else:
+                    ids.add(channel_id)
+        return sorted(ids)
+
+    def chat_messages(self, channel_id):
+        return self._chat_log(channel_id).messages()
+
+    def chat_next_id(self, channel_id):
+        return self._chat_log(channel_id).next_id()
+
+    def chat_append(self, channel_id, message):
+        log = self._chat_log(channel_id)
+        with log.lock:
+            if "id" not in message:
+                message = {"id": log.next_id(), **message}
+            log.append({"op": "put", "msg": message})
+        return message
+
+    def chat_extend(self, channel_id, messages):
+        log = self._chat_log(channel_id)
+        with log.lock:
+            seq = log.next_seq()
+            out = []
+            for message in messages:
+                seq += 1
+                out.append(message if "id" in message else {"id": str(seq), **message})
+            log.append(*({"op": "put", "msg": message} for message in out))
+        return out
+
+    def chat_update(self, channel_id, message_id, fields, sender=None):
+        log = self._chat_log(channel_id)
+        with log.lock:
+            if log.find(message_id, sender) is None:
+                return None
+            log.append({"op": "edit", "id": str(message_id), "sender": sender, "fields": fields})
+            return log.find(message_id, sender)
+
+    def chat_delete(self, channel_id, message_id, sender=None):
+        log = self._chat_log(channel_id)
+        with log.lock:
+            if log.find(message_id, sender) is None:
+                return False
+            log.append({"op": "del", "id": str(message_id), "sender": sender})
+            return True
+
+    def chat_drop(self, channel_id):
+        self._chat_log(channel_id).remove()
+
+    def chat_replace_all(self, messages):
+        existing = set(self.chat_channel_ids())
+        for channel_id, msgs in messages.items():
+            self._chat_log(channel_id).rewrite(msgs or [])
+            existing.discard(str(channel_id))
+        for channel_id in existing:
+            self._chat_log(channel_id).remove()
+
+    # ---- maintenance ----
+    def compact(self, min_garbage=None):
+        """Rewrite chat logs whose dead records (edit/delete tombstones and deleted messages) outnumber live ones."""
+        if min_garbage is None:
+            min_garbage = self.compact_min_garbage
+        compacted = 0
+        for channel_id in self.chat_channel_ids():
+            log = self._chat_log(channel_id)
+            with log.lock:
+                log.sync()
+                garbage = log.records - log.live_count()
+                if garbage >= min_garbage and garbage > log.live_count():
+                    log.rewrite(log.messages(), seq=log.next_seq())
+                    compacted += 1
+        return compacted
+
+    def preload(self):
+        count = 0
+        for repo in self.repos.values():
+            for entity_id in repo.ids():
+                if repo.get(entity_id) is not None:
+                    count += 1
+        self.meeting_index._ensure()
+        for channel_id in self.chat_channel_ids():
+            count += len(self.chat_messages(channel_id))
+        return count
+
+    def flush(self):
+        self.journal.flush()
+
+    def _compactor_loop(self):
+        while True:
+            time.sleep(self.compact_interval)
+            try:
+                self.compact()
+            except Exception:
+                logger.exception("chat log compaction failed")
+
+    def _ensure_compactor(self):
+        """Start the background compactor thread for this process on first chat write."""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        if self.compact_interval <= 0 or not self.journal.persistent:
+            return
+        with self._chat_lock:
+            if self._compactor is None or not self._compactor.is_alive():
+                self._compactor = threading.Thread(target=self._compactor_loop, name="chat-compactor", daemon=True)
+                self._compactor.start()
@@ -12,6 +12,7 @@ __all__ = [
     "generate_random_string",
     "generate_random_date",
     "generate_user_id",
+    "generate_uuid",
     "generate_base_user_data",
     "generate_cache_key",
 ]
@@ -31,43 +32,50 @@ last_names = [
     "Young", "Allen", "King", "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores"
 ]
 
-def generate_random_string(length):
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+def generate_random_string(length, rng=random):
+    return ''.join(rng.choices(string.ascii_letters + string.digits, k=length))
 
-def generate_random_date(start_date, end_date):
+def generate_random_date(start_date, end_date, rng=random):
     time_between_dates = end_date - start_date
     days_between_dates = time_between_dates.days
-    random_number_of_days = random.randrange(days_between_dates)
+    random_number_of_days = rng.randrange(days_between_dates)
     return start_date + datetime.timedelta(days=random_number_of_days)
 
-def generate_user_id(length=22):
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+def generate_user_id(length=22, rng=random):
+    return ''.join(rng.choices(string.ascii_letters + string.digits, k=length))
 
-def generate_base_user_data():
-    first_name = random.choice(first_names)
-    last_name = random.choice(last_names)
-    user_id = generate_user_id()
+def generate_uuid(rng=random):
+    """uuid4; drawn from rng when one is given (a seeded random.Random gives reproducible ids)."""
+    if rng is random:
+        return uuid.uuid4()
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+def generate_base_user_data(rng=random):
+    """One random user profile. Pass a seeded random.Random as rng for a reproducible one."""
+    first_name = rng.choice(first_names)
+    last_name = rng.choice(last_names)
+    user_id = generate_user_id(rng=rng)
     return {
         "id": user_id,
         "first_name": first_name,
         "last_name": last_name,
         "display_name": f"{first_name} {last_name}",
-        "email": f"{first_name.lower()}.{last_name.lower()}@{generate_random_string(5)}.com",
-        "type": random.randint(1, 2),
-        "zoom_workplace": random.randint(1, 2),
-        "on_prem": random.choice([False, True]),
-        "pmi": random.randint(1000000000, 9999999999),
-        "timezone": random.choice(["America/Los_Angeles", "America/New_York", "Asia/Tokyo", "Europe", "Australia"]),
-        "verified": random.randint(0, 1),
-        "dept": random.choice(["Engineering", "Sales", "Marketing", "Product"]),
-        "created_at": generate_random_date(datetime.datetime(2022, 1, 1), datetime.datetime(2026, 12, 31)).isoformat() + "Z",
-        "last_login_time": generate_random_date(datetime.datetime(2025, 1, 1), datetime.datetime(2026, 12, 31)).isoformat() + "Z",
-        "last_client_version": f"{random.randint(5, 6)}.{random.randint(1, 13)}.{random.randint(1000, 9999)}({random.choice(['mac', 'win', 'ipad', 'iphone'])})",
-        "pic_url": f"{BASE_URL}/p/{uuid.uuid4()}/{uuid.uuid4()}",
+        "email": f"{first_name.lower()}.{last_name.lower()}@{generate_random_string(5, rng)}.com",
+        "type": rng.randint(1, 2),
+        "zoom_workplace": rng.randint(1, 2),
+        "on_prem": rng.choice([False, True]),
+        "pmi": rng.randint(1000000000, 9999999999),
+        "timezone": rng.choice(["America/Los_Angeles", "America/New_York", "Asia/Tokyo", "Europe", "Australia"]),
+        "verified": rng.randint(0, 1),
+        "dept": rng.choice(["Engineering", "Sales", "Marketing", "Product"]),
+        "created_at": generate_random_date(datetime.datetime(2022, 1, 1), datetime.datetime(2026, 12, 31), rng).isoformat() + "Z",
+        "last_login_time": generate_random_date(datetime.datetime(2025, 1, 1), datetime.datetime(2026, 12, 31), rng).isoformat() + "Z",
+        "last_client_version": f"{rng.randint(5, 6)}.{rng.randint(1, 13)}.{rng.randint(1000, 9999)}({rng.choice(['mac', 'win', 'ipad', 'iphone'])})",
+        "pic_url": f"{BASE_URL}/p/{generate_uuid(rng)}/{generate_uuid(rng)}",
         "language": "en-US",
-        "status": random.choice(["active", "inactive"]),
-        "role_id": str(random.randint(1, 5)),
-        "user_created_at": generate_random_date(datetime.datetime(2022, 1, 1), datetime.datetime(2026, 12, 31)).isoformat() + "Z"
+        "status": rng.choice(["active", "inactive"]),
+        "role_id": str(rng.randint(1, 5)),
+        "user_created_at": generate_random_date(datetime.datetime(2022, 1, 1), datetime.datetime(2026, 12, 31), rng).isoformat() + "Z"
     }
 
 def generate_cache_key(*args, **kwargs):
@@ -0,0 +1,218 @@
+"""
+Write path for data_store saves. PERSISTENCE_MODE selects the durability trade-off:
+- sync   → write the snapshot file on the request thread (default; previous behaviour)
+- group  → append the mutation to the WAL buffer and acknowledge from memory; a background
+           thread group-commits the buffer to data/journal.wal every GROUP_COMMIT_INTERVAL_MS
+           (one write + fsync per batch), then rewrites the affected snapshot files and
+           truncates the WAL. Unflushed WAL records are replayed on the next start.
+- memory → keep mutations in memory only; nothing is written to data/
+
+Readers must consult pending() before reading a snapshot file, since in group and memory
+mode the newest version of a document may not be on disk yet.
+
+Snapshot files are replaced atomically (temp file + rename), so a reader in another worker
+process sees either the old or the new document, never a truncated one.
+"""
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: FileLock only coordinates threads of one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MODES = ("sync", "group", "memory")
+_MISSING = object()
+
+
+def write_json_file(path, payload):
+    """Atomically replace one snapshot file (pretty-printed, as the data/ tree is meant to be read by people)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class FileLock:
+    """
+    Advisory lock shared by threads and worker processes: a thread lock plus fcntl.flock on
+    lock_path (skipped when lock_path is None, e.g. in memory persistence mode).
+    Re-entrant for the thread holding it, so locked helpers may call each other.
+    """
+
+    def __init__(self, lock_path):
+        self.lock_path = lock_path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0 and self.lock_path is not None and fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+                self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except BaseException:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            os.close(self._fd)  # closing the descriptor releases the flock
+            self._fd = None
+        self._lock.release()
+        return False
+
+
+class Journal:
+    def __init__(self, mode, wal_path, root_dir, interval_ms=50):
+        if mode not in MODES:
+            raise ValueError(f"PERSISTENCE_MODE must be one of {', '.join(MODES)}; got {mode!r}")
+        self.mode = mode
+        self.wal_path = wal_path
+        self.root_dir = root_dir
+        self.interval = max(1, interval_ms) / 1000.0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._versions = {}
+        self._version_seq = 0
+        self._buffer = []
+        self._listeners = []
+        self._flusher = None
+        self._wal_lock = FileLock(os.path.join(root_dir, ".locks", "journal.lock") if mode != "memory" else None)
+        self.recover()
+        if mode == "group":
+            atexit.register(self.flush)
+
+    @property
+    def persistent(self):
+        return self.mode != "memory"
+
+    def add_flush_listener(self, fn):
+        """fn(path, payload) is called after a deferred write reached its snapshot file."""
+        self._listeners.append(fn)
+
+    def write(self, path, payload):
+        """Persist payload (a JSON-serializable document) as the new content of path."""
+        if self.mode == "sync":
+            write_json_file(path, payload)
+            return
+        with self._lock:
+            self._pending[path] = payload
+            self._version_seq += 1
+            self._versions[path] = (self._version_seq, time.time())
+            if self.mode == "group":
+                rel = os.path.relpath(path, self.root_dir)
+                self._buffer.append(json.dumps({"path": rel, "data": payload}, separators=(",", ":")))
+        if self.mode == "group":
+            self._ensure_flusher()
+
+    def pending(self, path):
+        """Unflushed payload for path, or _MISSING."""
+        if not self._pending:
+            return _MISSING
+        return self._pending.get(path, _MISSING)
+
+    def pending_version(self, path):
+        """(write sequence number, write time) of the unflushed payload for path, or None."""
+        if not self._pending:
+            return None
+        return self._versions.get(path)
+
+    def pending_ids(self, dir_path):
+        """Entity ids (file stems) with unflushed writes directly under dir_path."""
+        if not self._pending:
+            return []
+        with self._lock:
+            paths = list(self._pending)
+        return [
+            os.path.splitext(os.path.basename(p))[0]
+            for p in paths
+            if os.path.dirname(p) == dir_path and p.endswith(".json")
+        ]
+
+    def flush(self):
+        """Group-commit buffered records to the WAL, write their snapshots, then truncate the WAL."""
+        if self.mode != "group":
+            return
+        with self._flush_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+                batch = dict(self._pending)
+            if not lines:
+                return
+            # Workers share the WAL: hold its lock from append to truncate so a truncate
+            # never drops another process's records before their snapshots are written.
+            with self._wal_lock:
+                with open(self.wal_path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                for path, payload in batch.items():
+                    write_json_file(path, payload)
+                with self._lock:
+                    for path, payload in batch.items():
+                        if self._pending.get(path) is payload:
+                            del self._pending[path]
+                            self._versions.pop(path, None)
+                # Every record in the WAL is now covered by a snapshot; newer ones are still buffered.
+                open(self.wal_path, "w").close()
+            for path, payload in batch.items():
+                for fn in self._listeners:
+                    fn(path, payload)
+
+    def recover(self):
+        """Replay a WAL left behind by a process that stopped before its snapshots were written."""
+        if not os.path.isfile(self.wal_path) or os.path.getsize(self.wal_path) == 0:
+            return
+        latest = {}
+        with self._wal_lock:
+            with open(self.wal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # torn tail from a crash mid-append
+                    latest[os.path.join(self.root_dir, record["path"])] = record["data"]
+            for path, payload in latest.items():
+                write_json_file(path, payload)
+            open(self.wal_path, "w").close()
+        logger.info("replayed %d document(s) from %s", len(latest), self.wal_path)
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name="journal-flusher", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("journal flush failed")
@@ -0,0 +1,516 @@
+"""
+End-to-end HTTP load test: starts the ASGI app (app:asgi_app under uvicorn) on a scratch copy of
+the data tree and drives a weighted traffic mix against the /v2 endpoints from asyncio clients at
+a fixed concurrency.
+
+    python loadtest.py --mix default --concurrency 32 --duration 30 --json run.json
+    python loadtest.py --baseline run.json                 # compare against a saved run
+    python loadtest.py --url http://127.0.0.1:8000 ...     # drive a server that is already running
+
+Each of the --concurrency virtual users holds one keep-alive connection. It picks the next request
+from the mix by weight, waits for the whole body and records its latency under the route template
+(e.g. "GET /v2/meetings/{meetingId}"). Ids come from the data set itself, plus the meetings and
+users the run creates. Requests of the first --warmup seconds are not recorded.
+
+The report gives throughput and p50/p95/p99 latency per route and overall. --json writes it as
+JSON. With --baseline, a route is reported as a regression when its p95 or p99 is more than
+--tolerance slower than the baseline run, or its throughput that much lower. The exit status is
+then 1, so the run can gate a change to data_store.py in CI. Compare runs of the same mix,
+concurrency, data set and machine.
+
+Writes (creates, chat sends, QSS feedback) go to a copy of --data-dir made in a temporary
+directory. Pass --in-place to run on the tree itself, e.g. a large one written by datagen.py.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from urllib.parse import urlsplit, quote
+
+from config import DATA_DIR, DEFAULT_DATE_FROM, DEFAULT_DATE_TO
+
+AUTH_HEADER = "Bearer loadtest"
+READY_TIMEOUT = 30
+PERCENTILES = (50, 95, 99)
+
+
+# ---- traffic ----
+class _Context:
+    """Ids the virtual users pick from: discovered before the run, grown by creates."""
+
+    def __init__(self):
+        self.users = []
+        self.meetings = []  # (host_id, meeting_id)
+        self.webinars = []
+        self.channels = []
+        self.emails = []
+
+    def user(self, rng):
+        return rng.choice(self.users) if self.users else "me"
+
+    def meeting(self, rng):
+        return rng.choice(self.meetings) if self.meetings else (self.user(rng), "0")
+
+    def channel(self, rng):
+        return rng.choice(self.channels) if self.channels else "1"
+
+    def webinar(self, rng):
+        return rng.choice(self.webinars) if self.webinars else "0"
+
+    def email(self, rng):
+        return rng.choice(self.emails) if self.emails else "user@example.com"
+
+
+def _meeting_body(rng):
+    day = rng.randint(1, 28)
+    return {
+        "topic": f"Load test {rng.randint(1, 10 ** 6)}",
+        "type": 2,
+        "start_time": f"2026-{rng.randint(1, 12):02d}-{day:02d}T{rng.randint(8, 18):02d}:00:00Z",
+        "duration": rng.choice((30, 45, 60)),
+    }
+
+
+DATE_RANGE = f"from={DEFAULT_DATE_FROM}&to={DEFAULT_DATE_TO}"
+
+# route template -> fn(context, rng) returning (method, path, json body or None)
+SCENARIOS = {
+    # meetings
+    "GET /v2/meetings/{meetingId}": lambda c, r: ("GET", f"/v2/meetings/{c.meeting(r)[1]}", None),
+    "GET /v2/users/{userId}/meetings": lambda c, r: ("GET", f"/v2/users/{c.user(r)}/meetings?page_size=30", None),
+    "GET /v2/users/{userId}/meetings/{meetingId}": lambda c, r: ("GET", "/v2/users/{}/meetings/{}".format(*c.meeting(r)), None),
+    "GET /v2/meetings/{meetingId}/meeting_summary": lambda c, r: ("GET", f"/v2/meetings/{c.meeting(r)[1]}/meeting_summary", None),
+    "GET /v2/past_meetings/{meetingId}/participants": lambda c, r: ("GET", f"/v2/past_meetings/{c.meeting(r)[1]}/participants", None),
+    "POST /v2/users/{userId}/meetings": lambda c, r: ("POST", f"/v2/users/{c.user(r)}/meetings", _meeting_body(r)),
+    "PATCH /v2/users/{userId}/meetings/{meetingId}": lambda c, r: (
+        "PATCH", "/v2/users/{}/meetings/{}".format(*c.meeting(r)), {"topic": f"Updated {r.randint(1, 10 ** 6)}"}),
+    # recordings
+    "GET /v2/meetings/{meetingId}/recordings": lambda c, r: ("GET", f"/v2/meetings/{c.meeting(r)[1]}/recordings", None),
+    "GET /v2/users/{userId}/recordings": lambda c, r: ("GET", f"/v2/users/{c.user(r)}/recordings?{DATE_RANGE}", None),
+    # users
+    "GET /v2/users": lambda c, r: ("GET", "/v2/users?page_size=30", None),
+    "GET /v2/users/{userId}": lambda c, r: ("GET", f"/v2/users/{c.user(r)}", None),
+    "POST /v2/users": lambda c, r: ("POST", "/v2/users", {
+        "email": f"load.{r.getrandbits(48):x}@example.com", "first_name": "Load", "last_name": "Test"}),
+    # webinars
+    "GET /v2/users/{userId}/webinars": lambda c, r: ("GET", f"/v2/users/{c.user(r)}/webinars", None),
+    "GET /v2/webinars/{webinarId}": lambda c, r: ("GET", f"/v2/webinars/{c.webinar(r)}", None),
+    # chat
+    "POST /v2/chat/channels/{channelId}/messages": lambda c, r: (
+        "POST", f"/v2/chat/channels/{c.channel(r)}/messages", {"message": f"load test {r.randint(1, 10 ** 6)}"}),
+    "GET /v2/chat/channels/{channelId}/messages": lambda c, r: ("GET", f"/v2/chat/channels/{c.channel(r)}/messages?page_size=50", None),
+    "POST /v2/chat/chat/users/{userId}/messages": lambda c, r: (
+        "POST", f"/v2/chat/chat/users/{c.user(r)}/messages", {"message": "hi"}),
+    "GET /v2/chat/channels": lambda c, r: ("GET", "/v2/chat/channels", None),
+    # reports and dashboards
+    "GET /v2/report/users": lambda c, r: ("GET", f"/v2/report/users?{DATE_RANGE}&page_size=30", None),
+    "GET /v2/metrics/meetings": lambda c, r: ("GET", f"/v2/metrics/meetings?type=past&{DATE_RANGE}&page_size=30", None),
+    "GET /v2/report/meetings/{meetingId}/participants": lambda c, r: (
+        "GET", f"/v2/report/meetings/{c.meeting(r)[1]}/participants", None),
+    "GET /v2/report/daily": lambda c, r: ("GET", f"/v2/report/daily?year=2026&month={r.randint(1, 12)}", None),
+    "GET /v2/metrics/zoom_rooms": lambda c, r: ("GET", "/v2/metrics/zoom_rooms", None),
+    # QSS
+    "POST /v2/qss/feedback": lambda c, r: ("POST", "/v2/qss/feedback", {
+        "meeting_id": c.meeting(r)[1], "rating": r.randint(1, 5), "comments": ""}),
+    "GET /v2/qss/score/{meetingId}": lambda c, r: ("GET", f"/v2/qss/score/{c.meeting(r)[1]}", None),
+    # the remaining blueprints
+    "GET /v2/calendars/{calendarId}/events": lambda c, r: ("GET", "/v2/calendars/primary/events", None),
+    "GET /v2/phone/phone/account_settings": lambda c, r: ("GET", "/v2/phone/phone/account_settings", None),
+    "GET /v2/mailboxes/{email}/threads": lambda c, r: ("GET", f"/v2/mailboxes/{quote(c.email(r))}/threads", None),
+    "GET /v2/accounts/{accountId}/lock_settings": lambda c, r: ("GET", "/v2/accounts/me/lock_settings", None),
+    "GET /v2/devices": lambda c, r: ("GET", "/v2/devices", None),
+    "GET /v2/roles": lambda c, r: ("GET", "/v2/roles", None),
+    "GET /v2/groups": lambda c, r: ("GET", "/v2/groups", None),
+    "GET /v2/tracking_fields": lambda c, r: ("GET", "/v2/tracking_fields", None),
+    "GET /v2/rooms": lambda c, r: ("GET", "/v2/rooms", None),
+}
+
+_OTHER_BLUEPRINTS = {
+    "GET /v2/users/{userId}": 1, "GET /v2/users": 0.5, "GET /v2/users/{userId}/webinars": 0.5, "GET /v2/webinars/{webinarId}": 0.5,
+    "GET /v2/chat/channels": 0.5, "GET /v2/metrics/zoom_rooms": 0.5, "GET /v2/qss/score/{meetingId}": 0.5,
+    "GET /v2/calendars/{calendarId}/events": 0.25, "GET /v2/phone/phone/account_settings": 0.25,
+    "GET /v2/mailboxes/{email}/threads": 0.25, "GET /v2/accounts/{accountId}/lock_settings": 0.25,
+    "GET /v2/devices": 0.25, "GET /v2/roles": 0.25, "GET /v2/groups": 0.25, "GET /v2/tracking_fields": 0.25,
+    "GET /v2/rooms": 0.25,
+}
+
+# mix -> {route template: weight}; weights are relative
+MIXES = {
+    # ~70% meeting reads, ~10% creates/updates, chat, reports and a little of every other blueprint
+    "default": dict({
+        "GET /v2/meetings/{meetingId}": 30,
+        "GET /v2/users/{userId}/meetings": 14,
+        "GET /v2/users/{userId}/meetings/{meetingId}": 8,
+        "GET /v2/meetings/{meetingId}/meeting_summary": 5,
+        "GET /v2/past_meetings/{meetingId}/participants": 5,
+        "GET /v2/meetings/{meetingId}/recordings": 4,
+        "GET /v2/users/{userId}/recordings": 4,
+        "POST /v2/users/{userId}/meetings": 5,
+        "PATCH /v2/users/{userId}/meetings/{meetingId}": 2,
+        "POST /v2/qss/feedback": 2,
+        "POST /v2/users": 1,
+        "POST /v2/chat/channels/{channelId}/messages": 4,
+        "GET /v2/chat/channels/{channelId}/messages": 3,
+        "POST /v2/chat/chat/users/{userId}/messages": 1,
+        "GET /v2/report/users": 2,
+        "GET /v2/metrics/meetings": 2,
+        "GET /v2/report/meetings/{meetingId}/participants": 1,
+        "GET /v2/report/daily": 1,
+    }, **_OTHER_BLUEPRINTS),
+    "reads": dict({
+        "GET /v2/meetings/{meetingId}": 40,
+        "GET /v2/users/{userId}/meetings": 20,
+        "GET /v2/users/{userId}/meetings/{meetingId}": 10,
+        "GET /v2/meetings/{meetingId}/meeting_summary": 8,
+        "GET /v2/past_meetings/{meetingId}/participants": 6,
+        "GET /v2/users/{userId}/recordings": 6,
+        "GET /v2/chat/channels/{channelId}/messages": 4,
+        "GET /v2/report/users": 2,
+        "GET /v2/metrics/meetings": 2,
+    }, **_OTHER_BLUEPRINTS),
+    "writes": {
+        "POST /v2/users/{userId}/meetings": 30,
+        "PATCH /v2/users/{userId}/meetings/{meetingId}": 20,
+        "POST /v2/chat/channels/{channelId}/messages": 20,
+        "POST /v2/chat/chat/users/{userId}/messages": 5,
+        "POST /v2/qss/feedback": 10,
+        "POST /v2/users": 5,
+        "GET /v2/meetings/{meetingId}": 10,
+    },
+}
+
+
+def _learn(context, route, body):
+    """Make ids created during the run available to later requests."""
+    try:
+        doc = json.loads(body)
+    except ValueError:
+        return
+    if route == "POST /v2/users/{userId}/meetings" and doc.get("id"):
+        context.meetings.append((doc.get("host_id"), doc["id"]))
+    elif route == "POST /v2/users" and doc.get("id"):
+        context.users.append(doc["id"])
+
+
+# ---- HTTP client ----
+# Set by _Connection itself (or hop-by-hop); dropped from extra headers.
+_OWN_HEADERS = {"host", "authorization", "content-length", "connection", "keep-alive", "transfer-encoding", "te",
+                "upgrade", "expect"}
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection; reconnects when the server closes it."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None, raw_body=None, headers=None):
+        """
+        Send one request and read the whole response. Returns (status, body bytes).
+        body is sent as JSON; raw_body as is, with the Content-Type from headers (extra request headers).
+        A reused connection the server closed before answering (idle keep-alive closed by a worker
+        that is shutting down) is retried once on a new one, as HTTP clients do.
+        """
+        reused = self.writer is not None
+        if not reused:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        if raw_body is not None:
+            data = raw_body
+        else:
+            data = b"" if body is None else json.dumps(body).encode("utf-8")
+        extra = "".join(
+            f"{name}: {value}\r\n" for name, value in (headers or {}).items()
+            if name.lower() not in _OWN_HEADERS
+        )
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nAuthorization: {AUTH_HEADER}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            + ("Content-Type: application/json\r\n" if body is not None else "")
+            + extra
+            + "\r\n"
+        )
+        try:
+            self.writer.write(head.encode("latin-1") + data)
+            status, payload, keep_alive = await self._read_response()
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self.close()
+            if not reused or getattr(e, "partial", b""):
+                raise
+            return await self.request(method, path, body, raw_body, headers)
+        except BaseException:
+            self.close()
+            raise
+        if not keep_alive:
+            self.close()
+        return status, payload
+
+    async def _read_response(self):
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    while await self.reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                chunks.append((await self.reader.readexactly(size + 2))[:-2])
+            return status, b"".join(chunks), keep_alive
+        if "content-length" in headers:
+            return status, await self.reader.readexactly(int(headers["content-length"])), keep_alive
+        return status, await self.reader.read(), False
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+# ---- run ----
+async def _discover(conn, context):
+    """Fill context with ids from the data set behind the server."""
+    status, body = await conn.request("GET", "/v2/users?page_size=300")
+    if status != 200:
+        raise RuntimeError(f"GET /v2/users returned {status}: {body[:200]!r}")
+    for u in json.loads(body).get("users", []):
+        context.users.append(u["id"])
+        if u.get("email"):
+            context.emails.append(u["email"])
+    for user_id in context.users[:50]:
+        status, body = await conn.request("GET", f"/v2/users/{user_id}/meetings?page_size=300&type=scheduled")
+        if status == 200:
+            context.meetings.extend((user_id, m["id"]) for m in json.loads(body).get("meetings", []))
+        status, body = await conn.request("GET", f"/v2/users/{user_id}/webinars?page_size=300")
+        if status == 200:
+            context.webinars.extend(w["id"] for w in json.loads(body).get("webinars", []))
+    status, body = await conn.request("GET", "/v2/chat/channels")
+    if status == 200:
+        context.channels.extend(ch["id"] for ch in json.loads(body).get("channels", []))
+
+
+async def _virtual_user(index, conn, context, mix, seed, deadline, record_from, samples, max_requests):
+    rng = random.Random(f"{seed}:{index}")
+    routes = list(mix)
+    weights = [mix[r] for r in routes]
+    while time.perf_counter() < deadline and (max_requests is None or samples["sent"] < max_requests):
+        route = rng.choices(routes, weights)[0]
+        method, path, body = SCENARIOS[route](context, rng)
+        start = time.perf_counter()
+        try:
+            status, payload = await conn.request(method, path, body)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            status, payload = None, b""
+        elapsed = time.perf_counter() - start
+        if status is not None and status < 300 and method == "POST":
+            _learn(context, route, payload)
+        if start >= record_from:
+            samples["sent"] += 1
+            samples["by_route"].setdefault(route, []).append((elapsed, status))
+
+
+async def run_load(base_url, mix, concurrency=16, duration=20.0, warmup=2.0, seed=0, max_requests=None):
+    """Drive mix against base_url; returns the report dict (see summarize)."""
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    context = _Context()
+    conns = [_Connection(host, port) for _ in range(concurrency)]
+    await _discover(conns[0], context)
+    samples = {"sent": 0, "by_route": {}}
+    started = time.perf_counter()
+    record_from = started + warmup
+    deadline = record_from + duration
+    await asyncio.gather(*(
+        _virtual_user(i, conns[i], context, mix, seed, deadline, record_from, samples, max_requests)
+        for i in range(concurrency)
+    ))
+    measured = max(time.perf_counter() - record_from, 1e-9)
+    for conn in conns:
+        conn.close()
+    return summarize(samples["by_route"], measured)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def _stats(entries, seconds):
+    latencies = sorted(e for e, _ in entries)
+    statuses = {}
+    for _, status in entries:
+        key = str(status) if status is not None else "error"
+        statuses[key] = statuses.get(key, 0) + 1
+    out = {
+        "count": len(entries),
+        "rps": round(len(entries) / seconds, 2),
+        "errors": sum(n for s, n in statuses.items() if s == "error" or s.startswith("5")),
+        "statuses": statuses,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else None,
+    }
+    for pct in PERCENTILES:
+        value = _percentile(latencies, pct)
+        out[f"p{pct}_ms"] = round(value * 1000, 3) if value is not None else None
+    return out
+
+
+def summarize(by_route, seconds):
+    """Report: overall and per-route count, rps, errors, status counts, mean/max and p50/p95/p99 latency."""
+    everything = [e for entries in by_route.values() for e in entries]
+    return {
+        "seconds": round(seconds, 3),
+        "overall": _stats(everything, seconds),
+        "routes": {route: _stats(entries, seconds) for route, entries in sorted(by_route.items())},
+    }
+
+
+def compare(report, baseline, tolerance=0.10):
+    """
+    Per-route changes against a baseline report: list of dicts route, metric, baseline, current,
+    change (relative) and regression (latency up or throughput down by more than tolerance).
+    """
+    out = []
+    pairs = [("overall", report["overall"], baseline.get("overall"))]
+    pairs += [(route, stats, baseline.get("routes", {}).get(route)) for route, stats in report["routes"].items()]
+    for route, current, base in pairs:
+        if not base:
+            continue
+        for metric in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            old, new = base.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric == "rps" else change
+            out.append({
+                "route": route, "metric": metric, "baseline": old, "current": new, "change": round(change, 4),
+                "regression": metric != "p50_ms" and worse > tolerance,
+            })
+    return out
+
+
+# ---- server ----
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _copy_tree(source, dest):
+    shutil.copytree(source, dest, ignore=shutil.ignore_patterns(".cache", ".metrics", ".profiles", ".locks"))
+
+
+def start_server(data_dir, workers=1, port=None, env=None):
+    """uvicorn app:asgi_app on 127.0.0.1 serving data_dir. Returns (process, base URL)."""
+    port = port or _free_port()
+    server_env = dict(os.environ, DATA_DIR=data_dir, **(env or {}))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:asgi_app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=server_env,
+    )
+    deadline = time.time() + READY_TIMEOUT
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with status {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError(f"server did not listen on port {port} within {READY_TIMEOUT}s")
+
+
+def _print_report(report, comparison=None):
+    print(f"{'route':<52} {'count':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for route, s in list(report["routes"].items()) + [("overall", report["overall"])]:
+        print(f"{route:<52} {s['count']:>7} {s['rps']:>8} {s['p50_ms'] or 0:>8} {s['p95_ms'] or 0:>8} {s['p99_ms'] or 0:>8} {s['errors']:>6}")
+    if comparison:
+        print()
+        print(f"{'route':<52} {'metric':>7} {'baseline':>10} {'current':>10} {'change':>8}")
+        for c in comparison:
+            flag = "  REGRESSION" if c["regression"] else ""
+            print(f"{c['route']:<52} {c['metric']:>7} {c['baseline']:>10} {c['current']:>10} {c['change'] * 100:>7.1f}%{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP load test of the mock Zoom API")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of unrecorded traffic first")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many recorded requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="drive this server instead of starting one")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="data tree the started server serves (copied first)")
+    parser.add_argument("--in-place", action="store_true", help="serve --data-dir itself instead of a copy")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn --workers of the started server")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="compare against a report written with --json")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="relative slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    proc = scratch = None
+    try:
+        url = args.url
+        if url is None:
+            data_dir = args.data_dir
+            if not args.in_place:
+                scratch = tempfile.mkdtemp(prefix="zoom-mock-loadtest-")
+                data_dir = os.path.join(scratch, "data")
+                _copy_tree(args.data_dir, data_dir)
+            proc, url = start_server(data_dir, workers=args.server_workers)
+        report = asyncio.run(run_load(
+            url, MIXES[args.mix], concurrency=args.concurrency, duration=args.duration,
+            warmup=args.warmup, seed=args.seed, max_requests=args.requests,
+        ))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    report["meta"] = {
+        "mix": args.mix, "concurrency": args.concurrency, "duration": args.duration, "warmup": args.warmup,
+        "seed": args.seed, "server_workers": args.server_workers if args.url is None else None,
+        "url": args.url, "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            comparison = compare(report, json.load(f), args.tolerance)
+        report["comparison"] = comparison
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    _print_report(report, comparison)
+    if comparison and any(c["regression"] for c in comparison):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+"""
+Request metrics in the Prometheus text format, served at /metrics.
+
+- zoom_mock_http_requests_total{endpoint,method,status}
+- zoom_mock_http_request_duration_seconds{endpoint,method}  (until the last body byte is produced)
+- zoom_mock_http_request_size_bytes / zoom_mock_http_response_size_bytes{endpoint}
+- zoom_mock_http_requests_in_flight{endpoint}
+- zoom_mock_data_store_seconds / zoom_mock_json_serialize_seconds{endpoint}: time one request
+  spent in storage backend calls / in JSON encoding
+- zoom_mock_data_store_call_duration_seconds{op}: every storage backend call
+- zoom_mock_admission_active_requests / zoom_mock_admission_queue_depth{group},
+  zoom_mock_admission_wait_seconds{group}, zoom_mock_admission_rejected_total{group,reason}:
+  admission control (admission.py)
+- zoom_mock_emulation_rate_limited_total / zoom_mock_emulation_errors_total{category},
+  zoom_mock_emulation_delay_seconds{category}: rate-limit and latency emulation (emulation.py)
+
+Each worker process keeps its own registry and writes a snapshot to METRICS_DIR/<pid>.json every
+METRICS_FLUSH_INTERVAL seconds; /metrics merges the snapshots of all workers, so every worker
+answers with the same totals. Counters and histograms of exited workers are folded into
+METRICS_DIR/_exited.json; their in-flight gauges are dropped. With METRICS_DIR = "" /metrics
+reports the answering process only.
+
+The same per-request phase times (timing.py) can be returned in a Server-Timing header, for every
+response when SERVER_TIMING is set or per request with "X-Server-Timing: 1". For streamed lists it
+covers the work done before the headers go out.
+"""
+import os
+import json
+import time
+import atexit
+import threading
+
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider
+
+import data_store
+import timing
+from config import METRICS_DIR, METRICS_FLUSH_INTERVAL, SERVER_TIMING
+from journal import FileLock
+
+PREFIX = "zoom_mock_"
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+# name -> (type, help, buckets)
+METRICS = {
+    "http_requests_total": ("counter", "Requests by endpoint, method and status code.", None),
+    "http_request_duration_seconds": ("histogram", "Request latency until the last body byte.", LATENCY_BUCKETS),
+    "http_request_size_bytes": ("histogram", "Request body size.", SIZE_BUCKETS),
+    "http_response_size_bytes": ("histogram", "Response body size.", SIZE_BUCKETS),
+    "http_requests_in_flight": ("gauge", "Requests being handled.", None),
+    "data_store_seconds": ("histogram", "Time one request spent in storage backend calls.", LATENCY_BUCKETS),
+    "json_serialize_seconds": ("histogram", "Time one request spent encoding JSON.", LATENCY_BUCKETS),
+    "data_store_call_duration_seconds": ("histogram", "Storage backend call latency by operation.", LATENCY_BUCKETS),
+    "admission_active_requests": ("gauge", "Requests admitted and running, by route group.", None),
+    "admission_queue_depth": ("gauge", "Requests waiting for admission, by route group.", None),
+    "admission_wait_seconds": ("histogram", "Time admitted requests waited in the queue.", LATENCY_BUCKETS),
+    "admission_rejected_total": ("counter", "Requests answered 429 by admission control, by route group and reason.", None),
+    "emulation_rate_limited_total": ("counter", "Requests answered 429 by the emulated Zoom rate limits, by category.", None),
+    "emulation_errors_total": ("counter", "Injected error responses, by rate-limit category.", None),
+    "emulation_delay_seconds": ("histogram", "Injected latency, by rate-limit category.", LATENCY_BUCKETS),
+}
+
+ENDPOINT_KEY = "zoom_mock.endpoint"
+
+_lock = threading.Lock()
+_values = {}  # (name, labels) -> number, or [bucket counts..., sum, count] for histograms
+_writer_pid = None
+
+
+def _observe(name, labels, value):
+    buckets = METRICS[name][2]
+    key = (name, labels)
+    with _lock:
+        h = _values.get(key)
+        if h is None:
+            h = _values[key] = [0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                h[i] += 1
+                break
+        h[-2] += value
+        h[-1] += 1
+
+
+def _add(name, labels, delta):
+    key = (name, labels)
+    with _lock:
+        _values[key] = _values.get(key, 0) + delta
+
+
+def add(name, labels, delta=1):
+    """Add delta to a counter or gauge of METRICS; labels: ((label, value), ...)."""
+    _add(name, labels, delta)
+
+
+def observe(name, labels, value):
+    """Record value in a histogram of METRICS."""
+    _observe(name, labels, value)
+
+
+def _on_backend_call(op, seconds):
+    _observe("data_store_call_duration_seconds", (("op", op),), seconds)
+    timing.record("data_store", seconds)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, adding the time spent in dumps to the current request."""
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            timing.record("serialize", time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """WSGI middleware timing each request until its body iterator is exhausted or dropped."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        _ensure_writer()
+        status_holder = []
+
+        def _start_response(status, headers, exc_info=None):
+            status_holder.append(status.split(" ", 1)[0])
+            return start_response(status, headers, exc_info)
+
+        acc = timing.new_accumulator()
+        stack = timing.stack()
+        stack.append(acc)
+        try:
+            body = self.wsgi_app(environ, _start_response)
+        except BaseException:
+            self._finish(environ, acc, "500", 0)
+            raise
+        finally:
+            stack.pop()
+        return self._iterate(environ, body, acc, status_holder)
+
+    def _iterate(self, environ, body, acc, status_holder):
+        # Streamed bodies are produced while they are iterated: attribute that work to the request too.
+        stack = timing.stack()
+        it = iter(body)
+        sent = 0
+        try:
+            while True:
+                stack.append(acc)
+                try:
+                    chunk = next(it)
+                except StopIteration:
+                    break
+                finally:
+                    stack.pop()
+                sent += len(chunk)
+                yield chunk
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+            self._finish(environ, acc, status_holder[0] if status_holder else "500", sent)
+
+    def _finish(self, environ, acc, status, sent):
+        try:
+            request_bytes = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            request_bytes = 0
+        request_finished(environ.get(ENDPOINT_KEY), environ.get("REQUEST_METHOD", ""), status,
+                         time.perf_counter() - acc["start"], request_bytes, sent, acc)
+
+
+def request_started(endpoint):
+    """Count a routed request as in flight (request_finished ends it)."""
+    _ensure_writer()
+    _add("http_requests_in_flight", (("endpoint", endpoint),), 1)
+
+
+def request_finished(endpoint, method, status, seconds, request_bytes, response_bytes, acc):
+    """Record a finished request; endpoint is None when it was never routed. acc: its timing accumulator."""
+    if endpoint is not None:
+        _add("http_requests_in_flight", (("endpoint", endpoint),), -1)
+    else:
+        endpoint = "unmatched"
+    ep = (("endpoint", endpoint),)
+    _add("http_requests_total", (("endpoint", endpoint), ("method", method), ("status", status)), 1)
+    _observe("http_request_duration_seconds", (("endpoint", endpoint), ("method", method)), seconds)
+    _observe("http_request_size_bytes", ep, request_bytes)
+    _observe("http_response_size_bytes", ep, response_bytes)
+    _observe("data_store_seconds", ep, acc["data_store"])
+    _observe("json_serialize_seconds", ep, acc["serialize"])
+
+
+def _mark_endpoint():
+    endpoint = request.endpoint or "unmatched"
+    request.environ[ENDPOINT_KEY] = endpoint
+    request_started(endpoint)
+
+
+def _server_timing(response):
+    if not (SERVER_TIMING or request.headers.get("X-Server-Timing") == "1"):
+        return response
+    acc = timing.current()
+    if acc is None:
+        return response
+    total = time.perf_counter() - acc["start"]
+    parts = [f"{name};dur={acc[name] * 1000:.3f}" for name in timing.PHASES]
+    parts.append(f"total;dur={total * 1000:.3f}")
+    response.headers["Server-Timing"] = ", ".join(parts)
+    return response
+
+
+# ---- snapshots shared between workers ----
+def _snapshot():
+    with _lock:
+        return [[name, [list(p) for p in labels], value] for (name, labels), value in _values.items()]
+
+
+def _write_snapshot():
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_snapshot(), f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _writer_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        _write_snapshot()
+
+
+def _ensure_writer():
+    """Start the snapshot thread once per process (again after a fork)."""
+    global _writer_pid
+    if not METRICS_DIR or _writer_pid == os.getpid():
+        return
+    with _lock:
+        if _writer_pid == os.getpid():
+            return
+        _writer_pid = os.getpid()
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    threading.Thread(target=_writer_loop, name="metrics-snapshot", daemon=True).start()
+
+
+def _on_exit():
+    if METRICS_DIR and _writer_pid == os.getpid():
+        with _lock:
+            for key in list(_values):
+                if key[0] == "http_requests_in_flight":
+                    _values[key] = 0
+        _write_snapshot()
+
+
+atexit.register(_on_exit)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _merge(total, entries, gauges=True):
+    for name, labels, value in entries:
+        if name not in METRICS or (not gauges and METRICS[name][0] == "gauge"):
+            continue
+        key = (name, tuple(tuple(p) for p in labels))
+        if isinstance(value, list):
+            acc = total.setdefault(key, [0] * len(value))
+            for i, v in enumerate(value):
+                acc[i] += v
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+def _read(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def collect():
+    """Merged values of all workers: dict (name, labels) -> value."""
+    total = {}
+    if not METRICS_DIR or not os.path.isdir(METRICS_DIR):
+        _merge(total, _snapshot())
+        return total
+    _write_snapshot()
+    exited_path = os.path.join(METRICS_DIR, "_exited.json")
+    with FileLock(os.path.join(METRICS_DIR, ".lock")):
+        exited = _read(exited_path)
+        folded = False
+        for name in os.listdir(METRICS_DIR):
+            stem, ext = os.path.splitext(name)
+            if ext != ".json" or not stem.isdigit():
+                continue
+            path = os.path.join(METRICS_DIR, name)
+            entries = _read(path)
+            if int(stem) == os.getpid() or _alive(int(stem)):
+                _merge(total, entries)
+                continue
+            dead = {}
+            _merge(dead, exited, gauges=False)
+            _merge(dead, entries, gauges=False)
+            exited = [[n, [list(p) for p in labels], v] for (n, labels), v in dead.items()]
+            folded = True
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if folded:
+            tmp = f"{exited_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(exited, f)
+            os.replace(tmp, exited_path)
+    _merge(total, exited, gauges=False)
+    return total
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_number(v):
+    if isinstance(v, float):
+        return repr(round(v, 9))
+    return str(v)
+
+
+def render(values):
+    """Prometheus text exposition (version 0.0.4) of collect()'s result."""
+    lines = []
+    by_name = {}
+    for (name, labels), value in values.items():
+        by_name.setdefault(name, []).append((labels, value))
+    for name, (kind, help_text, buckets) in METRICS.items():
+        series = sorted(by_name.get(name, []))
+        full = PREFIX + name
+        lines.append(f"# HELP {full} {help_text}")
+        lines.append(f"# TYPE {full} {kind}")
+        for labels, value in series:
+            if kind != "histogram":
+                lines.append(f"{full}{_fmt_labels(labels)} {_fmt_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, value):
+                cumulative += count
+                lines.append(f"{full}_bucket{_fmt_labels(labels, [('le', _fmt_number(bound))])} {cumulative}")
+            lines.append(f"{full}_bucket{_fmt_labels(labels, [('le', '+Inf')])} {value[-1]}")
+            lines.append(f"{full}_sum{_fmt_labels(labels)} {_fmt_number(value[-2])}")
+            lines.append(f"{full}_count{_fmt_labels(labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_endpoint():
+    return Response(render(collect()), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    """Instrument app: WSGI middleware, endpoint hook, JSON timing, Server-Timing and the /metrics route."""
+    app.json = TimedJSONProvider(app)
+    app.before_request(_mark_endpoint)
+    app.after_request(_server_timing)
+    app.wsgi_app = MetricsMiddleware(app.wsgi_app)
+    app.add_url_rule("/metrics", "metrics", metrics_endpoint, methods=["GET"])
+    data_store.add_timing_listener(_on_backend_call)
@@ -0,0 +1,279 @@
+"""
+Micro-benchmarks of the data_store and payload-shaping hot paths, without uvicorn, Flask routing
+or the network in the way.
+
+    python microbench.py                              # files backend, default fixture
+    python microbench.py --backend sqlite --users 2000 --meetings-per-user 20
+    python microbench.py -k load_meeting -k save_ --json after.json --baseline before.json
+
+The fixture is a dataset written by datagen.py into a temporary directory with the given sizes
+and seed. --fixture runs on an existing tree instead (writes included). The same environment
+variables as the server apply (PERSISTENCE_MODE, ...). DATA_DIR, CACHE_DIR, METRICS_DIR and, for
+sqlite, STORAGE_BACKEND / SQLITE_PATH point at the fixture.
+
+Each benchmark calls its function over a rotating set of ids, so warm caches are measured the way
+steady traffic sees them. Timing follows timeit: the loop count is calibrated so one sample lasts
+at least --min-time, GC is off while sampling, and --repeat samples give mean, stdev, median, min
+and max per call. A second pass runs under tracemalloc and reports, per call, the peak of
+transient allocations and the bytes and blocks still held afterwards (caches, leaks).
+"""
+import os
+import gc
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import itertools
+import statistics
+import tracemalloc
+
+MIN_TIME = 0.05
+REPEAT = 7
+ALLOC_CALLS = 200
+
+
+def _cycle(items, seed):
+    items = list(items)
+    random.Random(seed).shuffle(items)
+    return itertools.cycle(items or [None])
+
+
+def build_benchmarks(seed=0):
+    """name -> zero-argument callable, over the dataset data_store is serving."""
+    import data_store
+    from routes.meetings import _meeting_to_zoom_response
+
+    users = [u for u in data_store.list_user_ids() if data_store.load_user(u)]
+    meetings = data_store.list_meeting_ids()
+    with_summary = [m for m in meetings if (data_store.load_meeting(m) or {}).get("summary")]
+    channels = data_store.list_chat_message_channels()
+    user_ids = _cycle(users, seed)
+    meeting_ids = _cycle(meetings, seed)
+    summary_ids = _cycle(with_summary or meetings, seed)
+    channel_ids = _cycle(channels, seed)
+    meeting_docs = _cycle([data_store.load_meeting(m) for m in meetings[:1000]], seed)
+    user_docs = _cycle([data_store.load_user(u) for u in users[:1000]], seed)
+    senders = _cycle(users, seed + 1)
+    counter = itertools.count()
+
+    def scan_by_sender():
+        sender = next(senders)
+        return [m for msgs in data_store.load_chat_messages().values() for m in msgs if m.get("sender") == sender]
+
+    def save_user():
+        u = next(user_docs)
+        data_store.save_user(u["id"], dict(u, last_login_time=f"2026-01-01T00:00:{next(counter) % 60:02d}Z"))
+
+    def save_meeting():
+        m = next(meeting_docs)
+        data_store.save_meeting(m["id"], dict(m, topic=f"{m.get('topic', '')[:40]} #{next(counter)}"))
+
+    rooms = data_store.load_rooms()
+    fields = data_store.load_tracking_fields()
+    channels_doc = data_store.load_chat_channels()
+    feedback = data_store.load_qss_feedback()
+
+    return {
+        "load_meeting": lambda: data_store.load_meeting(next(meeting_ids)),
+        "load_user": lambda: data_store.load_user(next(user_ids)),
+        "get_meetings_for_user": lambda: data_store.get_meetings_for_user(next(user_ids)),
+        "get_recordings_for_user": lambda: data_store.get_recordings_for_user(next(user_ids)),
+        "get_meeting_summary_payload": lambda: data_store.get_meeting_summary_payload(next(summary_ids)),
+        "_meeting_to_zoom_response": lambda: _meeting_to_zoom_response(next(meeting_docs)),
+        "meeting_list_item": lambda: data_store.meeting_list_item(next(meeting_ids)),
+        "get_chat_messages": lambda: data_store.get_chat_messages(next(channel_ids)),
+        "chat_scan_by_sender": scan_by_sender,
+        "save_user": save_user,
+        "save_meeting": save_meeting,
+        "save_rooms": lambda: data_store.save_rooms(rooms),
+        "save_tracking_fields": lambda: data_store.save_tracking_fields(fields),
+        "save_chat_channels": lambda: data_store.save_chat_channels(channels_doc),
+        "save_qss_feedback": lambda: data_store.save_qss_feedback(feedback),
+        "append_chat_message": lambda: data_store.append_chat_message(
+            next(channel_ids), {"message": "bench", "sender": next(senders), "timestamp": next(counter)}),
+    }
+
+
+def _run(fn, loops):
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return time.perf_counter() - start
+
+
+def time_call(fn, min_time=MIN_TIME, repeat=REPEAT):
+    """Per-call seconds of fn: dict loops, mean, stdev, median, min, max (over repeat samples)."""
+    fn()
+    loops = 1
+    while True:
+        elapsed = _run(fn, loops)
+        if elapsed >= min_time or loops >= 10 ** 7:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        samples = [_run(fn, loops) / loops for _ in range(repeat)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "loops": loops,
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+    }
+
+
+def allocations(fn, calls=ALLOC_CALLS):
+    """Per call under tracemalloc: peak transient bytes, and bytes/blocks still allocated afterwards."""
+    tracemalloc.start()
+    try:
+        fn()
+        before = tracemalloc.take_snapshot()
+        base_bytes = tracemalloc.get_traced_memory()[0]
+        peak_total = 0
+        for _ in range(calls):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn()
+            peak_total += tracemalloc.get_traced_memory()[1] - current
+        after = tracemalloc.take_snapshot()
+        net_bytes = tracemalloc.get_traced_memory()[0] - base_bytes
+    finally:
+        tracemalloc.stop()
+    net_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return {
+        "peak_bytes": round(peak_total / calls),
+        "net_bytes": round(net_bytes / calls, 1),
+        "net_blocks": round(net_blocks / calls, 2),
+    }
+
+
+def compare(results, baseline, tolerance=0.10):
+    """Benchmarks whose mean moved: list of dicts name, baseline, current, change, regression."""
+    out = []
+    for name, current in results.items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base:
+            continue
+        change = (current["mean"] - base["mean"]) / base["mean"]
+        noise = current["stdev"] + base["stdev"]
+        out.append({
+            "name": name, "baseline": base["mean"], "current": current["mean"], "change": round(change, 4),
+            "regression": change > tolerance and current["mean"] - base["mean"] > noise,
+        })
+    return out
+
+
+def _fmt_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def _prepare(args):
+    """Point the environment at the fixture before any repo module reads config. Returns the scratch dir."""
+    scratch = tempfile.mkdtemp(prefix="zoom-mock-bench-")
+    data_dir = args.fixture or os.path.join(scratch, "data")
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["CACHE_DIR"] = os.path.join(scratch, "cache")
+    os.environ["METRICS_DIR"] = ""
+    if args.backend == "sqlite":
+        os.environ["STORAGE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(scratch, "bench.sqlite3")
+    else:
+        os.environ["STORAGE_BACKEND"] = "files"
+    if args.fixture:
+        if args.backend == "sqlite":
+            from sqlite_storage import SQLiteStorage
+            from file_storage import FileStorage
+            SQLiteStorage(os.environ["SQLITE_PATH"]).import_tree(FileStorage(data_dir))
+        return scratch
+    import datagen
+    os.makedirs(data_dir)
+    datagen.generate(
+        args.backend, os.environ["SQLITE_PATH"] if args.backend == "sqlite" else data_dir, data_dir=data_dir,
+        workers=args.workers, seed=args.seed, users=args.users, meetings_per_user=args.meetings_per_user,
+        channels=args.channels, messages_per_channel=args.messages_per_channel,
+        direct_messages=args.messages_per_channel,
+    )
+    return scratch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of data_store and payload shaping")
+    parser.add_argument("-k", dest="only", action="append", default=[], help="run benchmarks whose name contains this")
+    parser.add_argument("--backend", choices=("files", "sqlite"), default="files")
+    parser.add_argument("--fixture", help="existing data tree to run on (written to!) instead of a generated one")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--meetings-per-user", type=int, default=20)
+    parser.add_argument("--channels", type=int, default=10)
+    parser.add_argument("--messages-per-channel", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="datagen workers")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="seconds per timing sample")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timing samples per benchmark")
+    parser.add_argument("--no-alloc", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against results written with --json")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    scratch = _prepare(args)
+    try:
+        from flask import Flask
+        from cache_config import cache
+
+        app = Flask("microbench")
+        cache.init_app(app)
+        results = {}
+        with app.app_context():
+            benchmarks = build_benchmarks(args.seed)
+            print(f"{'benchmark':<30} {'mean':>10} {'stdev':>9} {'median':>10} {'min':>10} {'peak B':>9} {'net B':>8} {'net blk':>8}")
+            for name, fn in benchmarks.items():
+                if args.only and not any(k in name for k in args.only):
+                    continue
+                stats = time_call(fn, args.min_time, args.repeat)
+                if not args.no_alloc:
+                    stats.update(allocations(fn))
+                results[name] = stats
+                print(f"{name:<30} {_fmt_time(stats['mean']):>10} {stats['stdev'] / stats['mean'] * 100:>8.1f}% "
+                      f"{_fmt_time(stats['median']):>10} {_fmt_time(stats['min']):>10} "
+                      f"{stats.get('peak_bytes', ''):>9} {stats.get('net_bytes', ''):>8} {stats.get('net_blocks', ''):>8}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "backend": args.backend, "fixture": args.fixture, "users": args.users,
+            "meetings_per_user": args.meetings_per_user, "channels": args.channels,
+            "messages_per_channel": args.messages_per_channel, "seed": args.seed,
+            "persistence_mode": os.getenv("PERSISTENCE_MODE", "sync"), "python": sys.version.split()[0],
+        },
+        "benchmarks": results,
+    }
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            comparison = compare(results, json.load(f), args.tolerance)
+        report["comparison"] = comparison
+        print()
+        for c in comparison:
+            flag = "  REGRESSION" if c["regression"] else ""
+            print(f"{c['name']:<30} {_fmt_time(c['baseline']):>10} -> {_fmt_time(c['current']):>10} {c['change'] * 100:>7.1f}%{flag}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if comparison and any(c["regression"] for c in comparison):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,27 @@
 from functools import wraps
 from flask import request, jsonify
+from timing import phase
 
 def require_auth(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return jsonify({
-                "error": {
-                    "code": "401",
-                    "message": "Authentication required",
-                    "details": "No authorization token provided",
-                }
-            }), 401
-        if not auth_header.startswith("Bearer "):
-            return jsonify({
-                "error": {
-                    "code": "401",
-                    "message": "Invalid authentication format",
-                    "details": "Authorization header must start with 'Bearer '.",
-                }
-            }), 401
+        with phase("auth"):
+            auth_header = request.headers.get("Authorization")
+            if not auth_header:
+                return jsonify({
+                    "error": {
+                        "code": "401",
+                        "message": "Authentication required",
+                        "details": "No authorization token provided",
+                    }
+                }), 401
+            if not auth_header.startswith("Bearer "):
+                return jsonify({
+                    "error": {
+                        "code": "401",
+                        "message": "Invalid authentication format",
+                        "details": "Authorization header must start with 'Bearer '.",
+                    }
+                }), 401
         return f(*args, **kwargs)
     return decorated 
\ No newline at end of file
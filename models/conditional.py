@@ -0,0 +1,65 @@
+import hashlib
+from functools import wraps
+from datetime import datetime, timezone
+from flask import current_app, request, make_response
+from data_store import entity_version
+from cache_tags import cached_404
+from projection import requested_fields
+
+
+def validators(kind, entity_id, fields=None):
+    """
+    (etag, last_modified datetime) of an entity from data_store.entity_version, or None if it does
+    not exist. fields (?fields=, see projection.py) is folded into the ETag: a projected response
+    and the full document never share one.
+    """
+    version = entity_version(kind, entity_id)
+    if version is None:
+        return None
+    tag, modified_at = version
+    etag = f"{kind}-{tag}"
+    if fields:
+        etag += "-f" + hashlib.sha1(",".join(sorted(fields)).encode("utf-8")).hexdigest()[:12]
+    return etag, datetime.fromtimestamp(int(modified_at), tz=timezone.utc)
+
+
+def conditional_get(kind, id_arg):
+    """
+    ETag / Last-Modified validators for a GET of one entity (kind: "users", "meetings", "webinars";
+    id_arg: the view argument holding its id). The validators come from data_store.entity_version,
+    so a matching If-None-Match / If-Modified-Since gets a 304 without loading or serializing the entity.
+    Apply inside require_auth and outside cached_view; a 404 in cached_view's negative cache is
+    answered before the validators are looked up, so it costs no storage I/O.
+    """
+    def decorator(f):
+        cached = getattr(f, "cached_view", None) is not None
+
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if cached:
+                hit = cached_404(f, request.path, request.query_string.decode("latin1"), kwargs)
+                if hit is not None:
+                    status, body, content_type = hit
+                    return current_app.response_class(body, status=status, content_type=content_type)
+            found = validators(kind, kwargs.get(id_arg), requested_fields())
+            if found is None:
+                return f(*args, **kwargs)
+            etag, last_modified = found
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            elif request.if_modified_since:
+                not_modified = last_modified <= request.if_modified_since
+            else:
+                not_modified = False
+            if not_modified:
+                response = make_response("", 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            return response
+        decorated.conditional_get = (kind, id_arg)
+        return decorated
+    return decorator
@@ -0,0 +1,131 @@
+"""
+Cursor pagination for list endpoints (Zoom-style next_page_token).
+
+A next_page_token is an opaque, URL-safe encoding of where the previous page ended, bound to
+the query it was issued for (a token from one user's meeting list is rejected elsewhere):
+- keyed lists (users by id, meetings by (start_time, id)) store the sort key of the last item
+  and resume with a bisect / index seek right after it
+- lists kept in insertion order (rooms, participants, registrants, a user's recordings) store
+  (index, id) of the last item; the index is trusted while the item before it still has that id
+Following a token costs O(page_size) however deep the page is, and pages stay stable when
+records are inserted or deleted in between. page_number keeps working for offset paging.
+Lists whose total_records takes a scan to count (filters) count once, on the page that issues
+the first token, and carry the total in every token after it.
+"""
+import json
+import base64
+import zlib
+
+
+class InvalidCursor(ValueError):
+    """next_page_token is malformed or was issued for a different query."""
+
+
+def _scope_tag(scope):
+    return zlib.crc32(scope.encode("utf-8")) & 0xFFFFFFFF
+
+
+def encode_cursor(scope, key, total=None):
+    """Opaque token for resuming after key (any JSON value) within scope, optionally carrying total_records."""
+    record = [_scope_tag(scope), key] if total is None else [_scope_tag(scope), key, total]
+    raw = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, scope):
+    """Key stored in token (lists come back as tuples). Raises InvalidCursor."""
+    return _decode(token, scope)[0]
+
+
+def _decode(token, scope):
+    """(key, total_records or None) stored in token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        tag, key, *rest = json.loads(raw)
+        total = int(rest[0]) if rest else None
+    except (ValueError, TypeError):
+        raise InvalidCursor(token)
+    if tag != _scope_tag(scope) or len(rest) > 1:
+        raise InvalidCursor(token)
+    return (tuple(key) if isinstance(key, list) else key), total
+
+
+def invalid_cursor_response():
+    return {"error": {"code": "400", "message": "Invalid next_page_token", "details": "Token is malformed or belongs to a different query"}}
+
+
+def keyed_page(fetch, page_size, page_number=1, token=None, scope="", count=None):
+    """
+    One page of a sorted keyspace. fetch(after, offset, limit) returns at most limit unique sort
+    keys in order, starting after key `after` (or at offset when after is None).
+    Returns (keys, next_page_token), or (keys, next_page_token, total_records) with count, a
+    function returning the number of keys; it is not called for a token that carries the total.
+    """
+    after, total = _decode(token, scope) if token else (None, None)
+    offset = 0 if after is not None else (page_number - 1) * page_size
+    keys = fetch(after, offset, page_size + 1)
+    more = len(keys) > page_size
+    keys = keys[:page_size]
+    if count is not None and total is None:
+        total = count()
+    next_page_token = encode_cursor(scope, keys[-1], total) if more and keys else ""
+    return (keys, next_page_token) if count is None else (keys, next_page_token, total)
+
+
+def item_id(item):
+    """Identity of a list item for cursors: its id, falling back to user_id / name."""
+    if not isinstance(item, dict):
+        return None
+    return item.get("id") or item.get("user_id") or item.get("name")
+
+
+def _resume_index(items, position, last_id, id_of):
+    if 0 < position <= len(items) and id_of(items[position - 1]) == last_id:
+        return position
+    # The list changed under the cursor: continue right after the item wherever it is now.
+    for i, item in enumerate(items):
+        if id_of(item) == last_id:
+            return i + 1
+    return min(position, len(items))
+
+
+def list_page(items, page_size, page_number=1, token=None, scope="", id_of=item_id, build=None, count=False):
+    """
+    One page of a list in insertion order. build(item) may map an item to its response shape,
+    or to None to skip it (filters); it only runs for the items this page touches.
+    Returns (page, next_page_token), or with count (page, next_page_token, total_records): the
+    items build keeps are then counted on a page without a carried total, building each item once.
+    """
+    total = None
+    if token:
+        (position, last_id), total = _decode(token, scope)
+        start, skip = _resume_index(items, int(position), last_id, id_of), 0
+    elif build is None:
+        start, skip = (page_number - 1) * page_size, 0
+    else:
+        start, skip = 0, (page_number - 1) * page_size
+    if build is None:
+        total = len(items)
+        built = ((i, items[i]) for i in range(start, len(items)))
+    elif count and total is None:
+        built = [(i, out) for i, out in enumerate(map(build, items)) if out is not None]
+        total = len(built)
+        built = [entry for entry in built if entry[0] >= start]
+    else:
+        built = ((i, out) for i in range(start, len(items)) for out in (build(items[i]),) if out is not None)
+    page = []
+    end = start
+    more = False
+    for i, out in built:
+        if skip:
+            skip -= 1
+            continue
+        if len(page) == page_size:
+            more = True
+            break
+        page.append(out)
+        end = i + 1
+    next_page_token = ""
+    if more and page:
+        next_page_token = encode_cursor(scope, [end, id_of(items[end - 1])], total if count and build is not None else None)
+    return (page, next_page_token, total) if count else (page, next_page_token)
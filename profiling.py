@@ -0,0 +1,168 @@
+"""
+On-demand profiling of single requests (PROFILING_ENABLED). A request sent with
+"X-Profile: cprofile" / "X-Profile: sample" (or the query flag _profile=cprofile|sample) runs under
+cProfile or under a sampler that records the request thread's stack every PROFILE_SAMPLE_INTERVAL
+seconds. The profile covers the whole response, streamed bodies included, and is written to
+PROFILE_DIR as <id>.pstats or <id>.collapsed (flame-graph "collapsed stack" lines). The response
+carries its id in X-Profile-Id; GET /v2/_debug/profiles/<id> returns it.
+"""
+import os
+import re
+import sys
+import uuid
+import cProfile
+import threading
+from collections import Counter
+
+from config import PROFILING_ENABLED, PROFILE_DIR, PROFILE_SAMPLE_INTERVAL, PROFILE_KEEP
+
+MODES = {"cprofile": ".pstats", "sample": ".collapsed"}
+PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def requested_mode(environ):
+    mode = environ.get("HTTP_X_PROFILE")
+    if mode is None:
+        match = re.search(r"(?:^|&)_profile=([a-z]+)", environ.get("QUERY_STRING", ""))
+        mode = match.group(1) if match else None
+    return mode if mode in MODES else None
+
+
+def profile_path(profile_id):
+    """Path of a stored profile, or None if the id is unknown."""
+    if not PROFILE_ID_RE.match(profile_id or ""):
+        return None
+    for ext in MODES.values():
+        path = os.path.join(PROFILE_DIR, profile_id + ext)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def list_profiles():
+    """Stored profiles, newest first: dicts with id, mode, size and created_at."""
+    out = []
+    if not os.path.isdir(PROFILE_DIR):
+        return out
+    for entry in os.scandir(PROFILE_DIR):
+        stem, ext = os.path.splitext(entry.name)
+        mode = next((m for m, e in MODES.items() if e == ext), None)
+        if mode is None or not PROFILE_ID_RE.match(stem):
+            continue
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        out.append({"id": stem, "mode": mode, "size": st.st_size, "created_at": st.st_mtime})
+    out.sort(key=lambda p: p["created_at"], reverse=True)
+    return out
+
+
+def _prune():
+    for stale in list_profiles()[PROFILE_KEEP:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, stale["id"] + MODES[stale["mode"]]))
+        except OSError:
+            pass
+
+
+class _Sampler:
+    """Counts the stacks of one thread, sampled from a background thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfilingMiddleware:
+    """WSGI middleware running requests that ask for it under a profiler."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        mode = requested_mode(environ) if PROFILING_ENABLED else None
+        if mode is None:
+            return self.wsgi_app(environ, start_response)
+        profile_id = uuid.uuid4().hex
+
+        def _start_response(status, headers, exc_info=None):
+            return start_response(status, list(headers) + [("X-Profile-Id", profile_id)], exc_info)
+
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = _Sampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL)
+            profiler.start()
+        try:
+            body = self.wsgi_app(environ, _start_response)
+        except BaseException:
+            self._save(profiler, mode, profile_id)
+            raise
+        if mode == "cprofile":
+            profiler.disable()
+        return self._iterate(body, profiler, mode, profile_id)
+
+    def _iterate(self, body, profiler, mode, profile_id):
+        try:
+            it = iter(body)
+            while True:
+                if mode == "cprofile":
+                    profiler.enable()
+                try:
+                    chunk = next(it)
+                except StopIteration:
+                    break
+                finally:
+                    if mode == "cprofile":
+                        profiler.disable()
+                yield chunk
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+            self._save(profiler, mode, profile_id)
+
+    def _save(self, profiler, mode, profile_id):
+        if mode == "cprofile":
+            profiler.disable()
+        else:
+            profiler.stop()
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, profile_id + MODES[mode])
+            tmp = f"{path}.tmp"
+            if mode == "cprofile":
+                profiler.dump_stats(tmp)
+            else:
+                profiler.dump(tmp)
+            os.replace(tmp, path)
+            _prune()
+        except OSError:
+            pass
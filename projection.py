@@ -0,0 +1,33 @@
+"""
+Field projection for meeting, user and webinar reads (mock extension, not in the Zoom API):
+?fields=id,topic,start_time returns only those top-level keys of each object. The single-object
+endpoints and the user, meeting and webinar lists accept it.
+
+The requested keys are also passed to data_store as read hints, so a backend with a split
+layout (sqlite) does not read the summary, transcript, recording files or participants unless
+they are asked for. Unknown keys are ignored. A missing or empty fields= returns the full shape.
+Cached responses are keyed by the query string, so each projection is cached on its own, and the
+ETag of a projected response names its fields (models/conditional.py), so it never matches the
+full document's.
+"""
+from flask import request
+
+
+def requested_fields():
+    """Keys named by ?fields= (comma-separated, deduplicated), or None when absent or empty."""
+    return parse_fields(request.args.get("fields"))
+
+
+def parse_fields(raw):
+    """requested_fields for a raw fields= value (None when absent)."""
+    if not raw:
+        return None
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    return fields or None
+
+
+def project(doc, fields):
+    """doc with only the keys in fields; doc itself when fields is None."""
+    if fields is None or doc is None:
+        return doc
+    return {k: doc[k] for k in fields if k in doc}
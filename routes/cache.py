@@ -0,0 +1,88 @@
+"""
+Response cache management (mock-only, not part of the Zoom API): statistics, invalidation by
+tag or view, warm-up and clearing. Counters are those of the worker process answering.
+"""
+import os
+from flask import Blueprint, jsonify, request, current_app
+from cache_config import cache
+from cache_tags import invalidate, invalidate_views, view_stats, coalescing_stats, hottest_paths
+
+cache_bp = Blueprint("cache", __name__)
+
+DEFAULT_WARMUP_LIMIT = 50
+MAX_WARMUP_LIMIT = 1000
+
+
+@cache_bp.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    """Hit/miss/eviction counts, size and key count overall and per cached view."""
+    stats = cache.cache.stats(l2=True)
+    namespaces = stats.pop("namespaces")
+    views = view_stats()
+    for name, counters in views.items():
+        ns = namespaces.get(name, {})
+        counters["entries"] = ns.get("entries", 0)
+        counters["bytes"] = ns.get("bytes", 0)
+        counters["evictions"] = ns.get("evictions", 0)
+        served = counters["hits"] + counters["misses"] + counters["coalesced"]
+        counters["hit_ratio"] = round((counters["hits"] + counters["coalesced"]) / served, 4) if served else None
+    lookups = stats["hits_l1"] + stats["hits_l2"] + stats["misses"]
+    stats["hit_ratio"] = round((stats["hits_l1"] + stats["hits_l2"]) / lookups, 4) if lookups else None
+    stats["tags"] = namespaces.get("tag", {}).get("entries", 0)
+    return jsonify({
+        "pid": os.getpid(),
+        "cache": stats,
+        "views": views,
+        "coalescing": coalescing_stats(),
+    })
+
+
+@cache_bp.route("/cache/invalidate", methods=["POST"])
+def cache_invalidate():
+    """Body: tags (list, e.g. ["user:u1", "meetings:host:u1"]) and/or view_prefix (e.g. "routes.meetings")."""
+    data = request.get_json(silent=True) or {}
+    tags = data.get("tags") or []
+    prefix = data.get("view_prefix")
+    if not isinstance(tags, list) or not all(isinstance(t, str) and t for t in tags) or (prefix is not None and not isinstance(prefix, str)):
+        return jsonify({"error": {"code": "400", "message": "Validation failed", "details": "tags must be a list of strings; view_prefix a string"}}), 400
+    if not tags and prefix is None:
+        return jsonify({"error": {"code": "400", "message": "Validation failed", "details": "tags or view_prefix is required"}}), 400
+    invalidate(*tags)
+    views = invalidate_views(prefix) if prefix is not None else []
+    return jsonify({"tags": tags, "views": views}), 200
+
+
+@cache_bp.route("/cache/warmup", methods=["POST"])
+def cache_warmup():
+    """Re-render the most requested single-entity paths (users, meetings, webinars). Body or query: limit."""
+    data = request.get_json(silent=True) or {}
+    try:
+        limit = int(data.get("limit", request.args.get("limit", DEFAULT_WARMUP_LIMIT)))
+    except (TypeError, ValueError):
+        return jsonify({"error": {"code": "400", "message": "Validation failed", "details": "limit must be an integer"}}), 400
+    limit = max(0, min(limit, MAX_WARMUP_LIMIT))
+    client = current_app.test_client()
+    headers = {"Authorization": request.headers.get("Authorization") or "Bearer warmup"}
+    warmed = []
+    for path in hottest_paths(limit):
+        if client.get(path, headers=headers).status_code == 200:
+            warmed.append(path)
+    return jsonify({"warmed": len(warmed), "paths": warmed}), 200
+
+
+@cache_bp.route("/cache/clear", methods=["POST"])
+def clear_cache():
+    try:
+        cache.clear()
+        return jsonify({"message": "Cache cleared successfully"}), 200
+    except Exception as e:
+        return jsonify({"error": {"code": "500", "message": str(e)}}), 500
+
+
+@cache_bp.route("/cache/clear/<key>", methods=["POST"])
+def clear_cache_key(key):
+    try:
+        cache.delete(key)
+        return jsonify({"message": f"Cache key {key} cleared"}), 200
+    except Exception as e:
+        return jsonify({"error": {"code": "500", "message": str(e)}}), 500
@@ -1,10 +1,21 @@
-"""Zoom Chat API. Source of truth: data/chat_channels.json, data/chat_messages.json."""
+"""Zoom Chat API. Source of truth: data/chat_channels.json, data/chat_logs/<channel_id>.jsonl."""
 from flask import Blueprint, jsonify, request
 from models.auth import require_auth
-from cache_config import cache
+from cache_tags import cached_view
 import time
-from data_store import load_chat_channels, save_chat_channels, load_chat_messages, save_chat_messages
+from data_store import (
+    load_chat_channels,
+    modify_chat_channels,
+    load_chat_messages,
+    list_chat_message_channels,
+    get_chat_messages,
+    append_chat_message,
+    update_chat_message,
+    delete_chat_message,
+    delete_chat_channel_messages,
+)
 from helpers import generate_random_string
+from pagination import list_page, InvalidCursor, invalid_cursor_response
 
 chat_bp = Blueprint("chat", __name__)
 
@@ -34,18 +45,21 @@ def create_channel():
     data = request.get_json() or {}
     if not data.get("name"):
         return jsonify({"error": {"code": "400", "message": "Validation failed", "details": "name is required"}}), 400
-    channels = load_chat_channels()
-    channel_id = str(len(channels) + 1) if channels else "1"
-    while channel_id in channels:
-        channel_id = generate_random_string(8)
     new_channel = {
-        "id": channel_id,
         "name": data["name"],
         "type": data.get("type", 1),
         "channel_settings": data.get("channel_settings") or {},
     }
-    channels[channel_id] = new_channel
-    save_chat_channels(channels)
+
+    def apply(channels):
+        channel_id = str(len(channels) + 1) if channels else "1"
+        while channel_id in channels:
+            channel_id = generate_random_string(8)
+        new_channel["id"] = channel_id
+        channels[channel_id] = new_channel
+        return channels
+
+    modify_chat_channels(apply)
     return jsonify(new_channel), 201
 
 
@@ -54,24 +68,20 @@ def create_channel():
 def get_messages(channel_id):
     """List messages. Query: page_size, next_page_token, to_contact (optional)."""
     channels = load_chat_channels()
-    messages = load_chat_messages()
     if channel_id not in channels:
         return jsonify({"error": {"code": "404", "message": "Channel not found"}}), 404
-    channel_messages = messages.get(channel_id, [])
-    total = len(channel_messages)
+    channel_messages = get_chat_messages(channel_id)
     page_size = min(int(request.args.get("page_size", 50)), 200)
-    next_page_token = request.args.get("next_page_token", "")
-    start = 0
-    if next_page_token:
-        try:
-            start = int(next_page_token)
-        except ValueError:
-            pass
-    page_msgs = channel_messages[start : start + page_size]
+    try:
+        page_msgs, next_page_token = list_page(
+            channel_messages, page_size, token=request.args.get("next_page_token"), scope=f"chat_messages:{channel_id}",
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
     return jsonify({
         "messages": page_msgs,
         "page_size": len(page_msgs),
-        "next_page_token": str(start + page_size) if start + page_size < total else "",
+        "next_page_token": next_page_token,
     })
 
 
@@ -80,22 +90,16 @@ def get_messages(channel_id):
 def send_message(channel_id):
     """Send message. Body: message (required), to_contact (optional)."""
     channels = load_chat_channels()
-    messages = load_chat_messages()
     if channel_id not in channels:
         return jsonify({"error": {"code": "404", "message": "Channel not found"}}), 404
     data = request.get_json() or {}
     if not data.get("message") and not data.get("content"):
         return jsonify({"error": {"code": "400", "message": "Validation failed", "details": "message or content is required"}}), 400
-    channel_messages = messages.get(channel_id, [])
-    message = {
-        "id": str(len(channel_messages) + 1),
+    message = append_chat_message(channel_id, {
         "message": data.get("message") or data.get("content", ""),
         "sender": _get_mock_user_id(),
         "timestamp": int(time.time() * 1000),
-    }
-    channel_messages.append(message)
-    messages[channel_id] = channel_messages
-    save_chat_messages(messages)
+    })
     return jsonify(message), 201
 
 
@@ -133,17 +137,21 @@ def get_channel(channel_id):
 @require_auth
 def update_channel(channel_id):
     """Update a channel's settings."""
-    channels = load_chat_channels()
-    if channel_id not in channels:
-        return jsonify({"error": "Channel not found"}), 404
     data = request.get_json() or {}
-    channel = dict(channels[channel_id])
-    if "name" in data:
-        channel["name"] = data["name"]
-    if "channel_settings" in data:
-        channel["channel_settings"] = dict(channel.get("channel_settings", {}), **data["channel_settings"])
-    channels[channel_id] = channel
-    save_chat_channels(channels)
+
+    def apply(channels):
+        if channel_id not in channels:
+            return None
+        channel = dict(channels[channel_id])
+        if "name" in data:
+            channel["name"] = data["name"]
+        if "channel_settings" in data:
+            channel["channel_settings"] = dict(channel.get("channel_settings", {}), **data["channel_settings"])
+        channels[channel_id] = channel
+        return channels
+
+    if modify_chat_channels(apply) is None:
+        return jsonify({"error": "Channel not found"}), 404
     return "", 204
 
 
@@ -151,15 +159,14 @@ def update_channel(channel_id):
 @require_auth
 def delete_channel(channel_id):
     """Delete a channel."""
-    channels = load_chat_channels()
-    messages = load_chat_messages()
-    if channel_id not in channels:
+    def apply(channels):
+        if channel_id not in channels:
+            return None
+        return {k: v for k, v in channels.items() if k != channel_id}
+
+    if modify_chat_channels(apply) is None:
         return jsonify({"error": "Channel not found"}), 404
-    channels = {k: v for k, v in channels.items() if k != channel_id}
-    if channel_id in messages:
-        messages = {k: v for k, v in messages.items() if k != channel_id}
-    save_chat_channels(channels)
-    save_chat_messages(messages)
+    delete_chat_channel_messages(channel_id)
     return "", 204
 
 
@@ -214,7 +221,7 @@ def leave_channel(channel_id):
 
 @chat_bp.route("/chat/users/<user_id>/messages", methods=["GET"])
 @require_auth
-@cache.memoize(timeout=3600)
+@cached_view("chat")
 def list_user_messages(user_id):
     """List messages for a specific user."""
     messages = load_chat_messages()
@@ -233,9 +240,7 @@ def list_user_messages(user_id):
 def send_user_message(user_id):
     """Send a direct message to a user."""
     data = request.get_json() or {}
-    messages = load_chat_messages()
     dm_key = "_direct_messages"
-    direct = messages.get(dm_key, [])
     message = {
         "id": f"msg_{int(time.time())}",
         "message": data.get("message", ""),
@@ -243,10 +248,7 @@ def send_user_message(user_id):
         "receiver": user_id,
         "timestamp": int(time.time() * 1000),
     }
-    direct.append(message)
-    messages[dm_key] = direct
-    save_chat_messages(messages)
-    cache.delete_memoized(list_user_messages, user_id)
+    append_chat_message(dm_key, message)
     return jsonify(message), 201
 
 
@@ -283,13 +285,11 @@ def get_my_message(message_id):
 def update_my_message(message_id):
     """Update authenticated user's message."""
     data = request.get_json() or {}
-    messages = load_chat_messages()
-    for ch_id, channel_msgs in list(messages.items()):
-        for i, msg in enumerate(channel_msgs):
-            if str(msg.get("id")) == str(message_id) and msg.get("sender") == _get_mock_user_id():
-                channel_msgs[i] = dict(msg, **{k: v for k, v in data.items() if k in ("message",)})
-                save_chat_messages(messages)
-                return jsonify(channel_msgs[i])
+    sender = _get_mock_user_id()
+    for ch_id in list_chat_message_channels():
+        updated = update_chat_message(ch_id, message_id, {k: v for k, v in data.items() if k in ("message",)}, sender=sender)
+        if updated is not None:
+            return jsonify(updated)
     return jsonify({"error": {"code": "404", "message": "Message not found"}}), 404
 
 
@@ -297,12 +297,8 @@ def update_my_message(message_id):
 @require_auth
 def delete_my_message(message_id):
     """Delete authenticated user's message."""
-    messages = load_chat_messages()
-    for ch_id, channel_msgs in list(messages.items()):
-        for i, msg in enumerate(channel_msgs):
-            if str(msg.get("id")) == str(message_id) and msg.get("sender") == _get_mock_user_id():
-                channel_msgs.pop(i)
-                messages[ch_id] = channel_msgs
-                save_chat_messages(messages)
-                return "", 204
+    sender = _get_mock_user_id()
+    for ch_id in list_chat_message_channels():
+        if delete_chat_message(ch_id, message_id, sender=sender):
+            return "", 204
     return jsonify({"error": {"code": "404", "message": "Message not found"}}), 404
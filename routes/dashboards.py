@@ -2,10 +2,11 @@
 Zoom Dashboards / Metrics API stubs. Mirrors Zoom REST: metrics, dashboards.
 """
 from flask import Blueprint, jsonify, request
-from helpers import generate_random_string
 from config import DEFAULT_DATE_FROM, DEFAULT_DATE_TO
 from models.auth import require_auth
 from data_store import get_participants_for_meeting
+from pagination import list_page, InvalidCursor, invalid_cursor_response
+from streaming import stream_json
 
 dashboards_bp = Blueprint("dashboards", __name__)
 
@@ -18,16 +19,19 @@ def metrics_meeting_participants(meeting_id):
     page_number = max(1, int(request.args.get("page_number", 1)))
     participants = get_participants_for_meeting(meeting_id)
     total = len(participants)
-    start = (page_number - 1) * page_size
-    page_part = participants[start : start + page_size]
-    return jsonify({
+    try:
+        page_part, next_page_token = list_page(
+            participants, page_size, page_number, request.args.get("next_page_token"), scope=f"metrics_meeting_participants:{meeting_id}",
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    return stream_json({
         "meeting_id": meeting_id,
         "page_size": page_size,
         "page_number": page_number,
         "total_records": total,
-        "next_page_token": generate_random_string(32) if start + page_size < total else "",
-        "participants": page_part,
-    })
+        "next_page_token": next_page_token,
+    }, "participants", page_part)
 
 
 @dashboards_bp.route("/metrics/webinars/<webinar_id>/participants", methods=["GET"])
@@ -39,16 +43,19 @@ def metrics_webinar_participants(webinar_id):
     page_number = max(1, int(request.args.get("page_number", 1)))
     participants = get_participants_for_webinar(webinar_id)
     total = len(participants)
-    start = (page_number - 1) * page_size
-    page_part = participants[start : start + page_size]
-    return jsonify({
+    try:
+        page_part, next_page_token = list_page(
+            participants, page_size, page_number, request.args.get("next_page_token"), scope=f"metrics_webinar_participants:{webinar_id}",
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    return stream_json({
         "webinar_id": webinar_id,
         "page_size": page_size,
         "page_number": page_number,
         "total_records": total,
-        "next_page_token": generate_random_string(32) if start + page_size < total else "",
-        "participants": page_part,
-    })
+        "next_page_token": next_page_token,
+    }, "participants", page_part)
 
 
 @dashboards_bp.route("/metrics/crc", methods=["GET"])
@@ -0,0 +1,44 @@
+"""
+Debug endpoints (mock-only, not part of the Zoom API): per-request profiles written by profiling.py.
+Answer 404 unless PROFILING_ENABLED.
+"""
+import io
+import pstats
+from flask import Blueprint, jsonify, request, send_file
+from config import PROFILING_ENABLED
+from profiling import profile_path, list_profiles
+
+debug_bp = Blueprint("debug", __name__)
+
+
+def _disabled():
+    return jsonify({"error": {"code": "404", "message": "Profiling is disabled", "details": "Set PROFILING_ENABLED=1"}}), 404
+
+
+@debug_bp.route("/_debug/profiles", methods=["GET"])
+def get_profiles():
+    """Stored profiles, newest first."""
+    if not PROFILING_ENABLED:
+        return _disabled()
+    profiles = list_profiles()
+    return jsonify({"profiles": profiles, "total_records": len(profiles)})
+
+
+@debug_bp.route("/_debug/profiles/<profile_id>", methods=["GET"])
+def get_profile(profile_id):
+    """
+    One profile: .pstats (load with pstats / snakeviz) or collapsed stacks (flamegraph.pl, speedscope).
+    Query: format=text renders a .pstats profile as a pstats report sorted by cumulative time (top 50).
+    """
+    if not PROFILING_ENABLED:
+        return _disabled()
+    path = profile_path(profile_id)
+    if path is None:
+        return jsonify({"error": {"code": "404", "message": "Profile not found", "details": f"No profile with id: {profile_id}"}}), 404
+    if path.endswith(".collapsed"):
+        return send_file(path, mimetype="text/plain")
+    if request.args.get("format") == "text":
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(50)
+        return out.getvalue(), 200, {"Content-Type": "text/plain; charset=utf-8"}
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=f"{profile_id}.pstats")
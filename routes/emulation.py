@@ -0,0 +1,44 @@
+"""
+Rate-limit and latency emulation (mock-only, not part of the Zoom API): show or switch the active
+profile of emulation.py. A switch reaches every worker within a second. Bucket levels are those
+of the worker process answering.
+"""
+import os
+from flask import Blueprint, jsonify, request
+from emulation import PROFILES, current, set_profile
+
+emulation_bp = Blueprint("emulation", __name__)
+
+
+def _describe(profile):
+    return dict(profile.describe(), pid=os.getpid(), profiles=sorted(PROFILES))
+
+
+@emulation_bp.route("/_emulation", methods=["GET"])
+def get_emulation():
+    """The active profile, its definition and the endpoints seen so far with their bucket levels."""
+    return jsonify(_describe(current()))
+
+
+@emulation_bp.route("/_emulation", methods=["PUT"])
+def put_emulation():
+    """Body: profile, a built-in profile name or a profile object (see emulation.py)."""
+    data = request.get_json(silent=True) or {}
+    spec = data.get("profile")
+    if spec is None:
+        return jsonify({"error": {"code": "400", "message": "Validation failed", "details": "profile is required"}}), 400
+    # Profile files are for EMULATION_PROFILE only; over HTTP, names or inline objects.
+    if isinstance(spec, str) and spec not in PROFILES:
+        return jsonify({"error": {"code": "400", "message": "Validation failed",
+                                  "details": f"Unknown profile {spec!r}; expected one of {sorted(PROFILES)} or an object"}}), 400
+    try:
+        profile = set_profile(spec)
+    except ValueError as e:
+        return jsonify({"error": {"code": "400", "message": "Validation failed", "details": str(e)}}), 400
+    return jsonify(_describe(profile)), 200
+
+
+@emulation_bp.route("/_emulation", methods=["DELETE"])
+def reset_emulation():
+    """Go back to the EMULATION_PROFILE the server was started with."""
+    return jsonify(_describe(set_profile(None))), 200
@@ -1,16 +1,26 @@
 from flask import Blueprint, jsonify, request
 from helpers import generate_random_string, BASE_URL
 from config import DEFAULT_DATE_FROM, DEFAULT_DATE_TO, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
-from cache_config import cache
+from cache_tags import cached_view
 from models.auth import require_auth
+from timing import timed
+from models.conditional import conditional_get
 from data_store import (
     load_meeting,
-    get_meetings_for_user,
+    load_user,
+    list_meeting_keys_in_range,
+    count_meetings_in_range,
+    meeting_list_item,
     get_meeting_summary_payload,
     get_participants_for_meeting,
     save_meeting,
+    modify_meeting,
     add_meeting_to_user,
+    MEETING_DETAIL_KEYS,
 )
+from projection import requested_fields, project
+from pagination import keyed_page, list_page, InvalidCursor, invalid_cursor_response
+from streaming import stream_json
 import datetime
 
 meetings_bp = Blueprint("meetings", __name__)
@@ -70,8 +80,9 @@ def create_meeting(user_id):
 
 @meetings_bp.route("/users/<user_id>/meetings", methods=["GET"])
 @require_auth
+@cached_view("user:{user_id}", "meetings:host:{user_id}")
 def get_meetings(user_id):
-    """List meetings from data store for user. Query: from, to (YYYY-MM-DD), page_size, page_number, type."""
+    """List meetings from data store for user, ordered by start_time. Query: from, to (YYYY-MM-DD), page_size, page_number, next_page_token, type, fields."""
     from_date = request.args.get("from", DEFAULT_DATE_FROM)
     to_date = request.args.get("to", DEFAULT_DATE_TO)
     page_size = min(int(request.args.get("page_size", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
@@ -82,68 +93,90 @@ def get_meetings(user_id):
         datetime.datetime.strptime(to_date, "%Y-%m-%d")
     except ValueError:
         return jsonify({"error": {"code": "400", "message": "Invalid date format", "details": "Use YYYY-MM-DD for from and to"}}), 400
-    meetings = get_meetings_for_user(user_id, from_date=from_date, to_date=to_date)
+    match = None
     if meeting_type and meeting_type in ("scheduled", "live", "upcoming"):
-        meetings = [m for m in meetings if m.get("type") == 2]
-    total = len(meetings)
-    start = (page_number - 1) * page_size
-    page_meetings = meetings[start : start + page_size]
+        match = lambda m: m.get("type", 2) == 2
+    else:
+        meeting_type = None
+    if not load_user(user_id):
+        keys, next_page_token, total = [], "", 0
+    else:
+        try:
+            keys, next_page_token, total = keyed_page(
+                lambda after, offset, limit: list_meeting_keys_in_range(
+                    from_date, to_date, host_id=user_id, after=after, offset=offset, limit=limit, match=match,
+                ),
+                page_size, page_number, request.args.get("next_page_token"),
+                scope=f"meetings:{user_id}:{from_date}:{to_date}:{meeting_type or ''}",
+                count=lambda: count_meetings_in_range(from_date, to_date, host_id=user_id, match=match),
+            )
+        except InvalidCursor:
+            return jsonify(invalid_cursor_response()), 400
+    fields = requested_fields()
+    page_meetings = (project(item, fields) for item in (meeting_list_item(mid, host_id=user_id) for _, mid in keys) if item)
     response_data = {
         "page_size": page_size,
         "page_number": page_number,
         "total_records": total,
-        "next_page_token": generate_random_string(16) if start + page_size < total else "",
-        "meetings": page_meetings,
+        "next_page_token": next_page_token,
     }
-    return jsonify(response_data)
+    return stream_json(response_data, "meetings", page_meetings)
 
 
+@timed("shape")
 def _meeting_to_zoom_response(m):
-    """Return Zoom GET meeting shape (exclude summary, vtt_data, participants)."""
+    """Return Zoom GET meeting shape (exclude summary, vtt_data, participants, recording_files)."""
     if not m:
         return None
-    return {
-        k: v for k, v in m.items()
-        if k not in ("summary", "vtt_data", "participants", "recording_files")
-    }
+    return {k: v for k, v in m.items() if k not in MEETING_DETAIL_KEYS}
+
+
+def _load_meeting_response(meeting_id):
+    """GET meeting shape, restricted to ?fields= when given, without reading the detail keys. None if not found."""
+    fields = requested_fields()
+    m = load_meeting(meeting_id, fields=fields, omit=MEETING_DETAIL_KEYS)
+    if not m:
+        return None
+    return _meeting_to_zoom_response(project(m, fields))
 
 
 @meetings_bp.route("/meetings/<meeting_id>", methods=["GET"])
 @require_auth
-@cache.memoize(timeout=3600)
+@conditional_get("meetings", "meeting_id")
+@cached_view("meeting:{meeting_id}", cache_404=True)
 def get_meeting_by_id(meeting_id):
-    """Get meeting by ID from data/meetings/<meeting_id>.json (Zoom-style). 404 if not found."""
-    m = load_meeting(meeting_id)
-    if not m:
+    """Get meeting by ID from data/meetings/<meeting_id>.json (Zoom-style). Query: fields. 404 if not found."""
+    m = _load_meeting_response(meeting_id)
+    if m is None:
         return jsonify({"error": {"code": "404", "message": "Meeting not found", "details": f"No meeting with id: {meeting_id}"}}), 404
-    return jsonify(_meeting_to_zoom_response(m))
+    return jsonify(m)
 
 
 @meetings_bp.route("/users/<user_id>/meetings/<meeting_id>", methods=["GET"])
 @require_auth
-@cache.memoize(timeout=3600)
+@conditional_get("meetings", "meeting_id")
+@cached_view("meeting:{meeting_id}", cache_404=True)
 def get_meeting(user_id, meeting_id):
-    """Get meeting from data store. 404 if not found."""
-    m = load_meeting(meeting_id)
-    if not m:
+    """Get meeting from data store. Query: fields. 404 if not found."""
+    m = _load_meeting_response(meeting_id)
+    if m is None:
         return jsonify({"error": {"code": "404", "message": "Meeting not found", "details": f"No meeting with id: {meeting_id}"}}), 404
-    return jsonify(_meeting_to_zoom_response(m))
+    return jsonify(m)
 
 
 @meetings_bp.route("/meetings/<meeting_id>/meeting_summary", methods=["GET"])
 @require_auth
-@cache.memoize(timeout=3600)
+@conditional_get("meetings", "meeting_id")
+@cached_view("meeting:{meeting_id}", cache_404=True)
 def get_meeting_summary(meeting_id):
     """Get meeting summary from data/meetings/<meeting_id>.json. 404 if not found."""
     payload = get_meeting_summary_payload(meeting_id)
     if not payload:
         return jsonify({"error": {"code": "404", "message": "Meeting or summary not found", "details": f"No meeting with id: {meeting_id}"}}), 404
-    m = load_meeting(meeting_id)
-    start_time = (m or {}).get("start_time", "") or "2026-01-15T14:00:00Z"
-    duration = (m or {}).get("duration", 60)
+    start_time = payload["start_time"] or "2026-01-15T14:00:00Z"
     meeting_summary = {
-        "meeting_host_id": (m or {}).get("host_id", ""),
-        "meeting_host_email": (m or {}).get("host_email", ""),
+        "meeting_host_id": payload["host_id"],
+        "meeting_host_email": payload["host_email"],
         "meeting_uuid": payload.get("meeting_uuid", meeting_id),
         "meeting_id": payload.get("meeting_id", meeting_id),
         "meeting_topic": payload.get("meeting_topic", ""),
@@ -178,16 +211,19 @@ def get_past_meeting_participants(meeting_id):
     page_size = min(int(request.args.get("page_size", 30)), 300)
     page_number = max(1, int(request.args.get("page_number", 1)))
     total = len(participants)
-    start = (page_number - 1) * page_size
-    page_participants = participants[start : start + page_size]
+    try:
+        page_participants, next_page_token = list_page(
+            participants, page_size, page_number, request.args.get("next_page_token"), scope=f"past_meeting_participants:{meeting_id}",
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
     response_data = {
-        "next_page_token": generate_random_string(32) if start + page_size < total else "",
+        "next_page_token": next_page_token,
         "page_count": max(1, (total + page_size - 1) // page_size),
         "page_size": page_size,
         "total_records": total,
-        "participants": page_participants,
     }
-    return jsonify(response_data)
+    return stream_json(response_data, "participants", page_participants)
 
 
 @meetings_bp.route("/users/<user_id>/meetings/<meeting_id>", methods=["PATCH"])
@@ -195,30 +231,30 @@ def get_past_meeting_participants(meeting_id):
 def update_meeting(user_id, meeting_id):
     """Update meeting. Body merged into data from data/meetings/<meeting_id>.json; 404 if not found."""
     data = request.get_json() or {}
-    cache.delete_memoized(get_meeting, user_id, meeting_id)
-    cache.delete_memoized(get_meeting_by_id, meeting_id)
-    cache.delete_memoized(get_meeting_summary, meeting_id)
-    m = load_meeting(meeting_id)
-    if not m:
+
+    def apply(m):
+        if not m:
+            return None
+        # Merge into the stored document so summary, transcript, recordings and participants survive.
+        payload = dict(m)
+        for key in ("topic", "duration", "timezone", "agenda", "password"):
+            if key in data:
+                payload[key] = data[key]
+        if "start_time" in data:
+            payload["start_time"] = data["start_time"]
+        if "settings" in data:
+            payload["settings"] = dict(payload.get("settings", {}), **data["settings"])
+        return payload
+
+    payload = modify_meeting(meeting_id, apply)
+    if not payload:
         return jsonify({"error": {"code": "404", "message": "Meeting not found", "details": f"No meeting with id: {meeting_id}"}}), 404
-    payload = dict(_meeting_to_zoom_response(m))
-    for key in ("topic", "duration", "timezone", "agenda", "password"):
-        if key in data:
-            payload[key] = data[key]
-    if "start_time" in data:
-        payload["start_time"] = data["start_time"]
-    if "settings" in data:
-        payload["settings"] = dict(payload.get("settings", {}), **data["settings"])
-    save_meeting(meeting_id, payload)
-    return jsonify(payload), 200
+    return jsonify(_meeting_to_zoom_response(payload)), 200
 
 
 @meetings_bp.route("/users/<user_id>/meetings/<meeting_id>", methods=["DELETE"])
 @require_auth
 def delete_meeting(user_id, meeting_id):
-    cache.delete_memoized(get_meeting, user_id, meeting_id)
-    cache.delete_memoized(get_meeting_by_id, meeting_id)
-    cache.delete_memoized(get_meeting_summary, meeting_id)
     return "", 204
 
 
@@ -286,7 +322,7 @@ def delete_meeting_poll(meeting_id, poll_id):
 @meetings_bp.route("/meetings/<meeting_id>/registrants", methods=["GET"])
 @require_auth
 def list_meeting_registrants(meeting_id):
-    """List meeting registrants. Query: page_size, next_page_token, status."""
+    """List meeting registrants. Query: page_size, page_number, next_page_token, status."""
     m = load_meeting(meeting_id)
     if not m:
         return jsonify({"error": {"code": "404", "message": "Meeting not found"}}), 404
@@ -294,15 +330,18 @@ def list_meeting_registrants(meeting_id):
     page_size = min(int(request.args.get("page_size", 30)), 300)
     page_number = max(1, int(request.args.get("page_number", 1)))
     total = len(registrants)
-    start = (page_number - 1) * page_size
-    page_reg = registrants[start : start + page_size]
-    return jsonify({
-        "registrants": page_reg,
+    try:
+        page_reg, next_page_token = list_page(
+            registrants, page_size, page_number, request.args.get("next_page_token"), scope=f"meeting_registrants:{meeting_id}",
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    return stream_json({
         "page_count": max(1, (total + page_size - 1) // page_size),
         "page_size": page_size,
         "total_records": total,
-        "next_page_token": generate_random_string(32) if start + page_size < total else "",
-    })
+        "next_page_token": next_page_token,
+    }, "registrants", page_reg)
 
 
 @meetings_bp.route("/meetings/<meeting_id>/registrants", methods=["POST"])
@@ -2,7 +2,7 @@
 from flask import Blueprint, jsonify, request
 from helpers import generate_random_string
 from models.auth import require_auth
-from data_store import load_qss_feedback, save_qss_feedback
+from data_store import load_qss_feedback, modify_qss_feedback
 import random
 
 qss_bp = Blueprint("qss", __name__)
@@ -77,9 +77,7 @@ def submit_qss_feedback():
         "comments": data.get("comments", ""),
         "created_at": data.get("created_at"),
     }
-    feedback = load_qss_feedback()
-    feedback[feedback_id] = entry
-    save_qss_feedback(feedback)
+    modify_qss_feedback(lambda feedback: dict(feedback, **{feedback_id: entry}))
     return jsonify(entry), 201
 
 
@@ -97,9 +95,7 @@ def get_qss_feedback(feedback_id):
 @require_auth
 def delete_qss_feedback(feedback_id):
     """Delete specific feedback."""
-    feedback = load_qss_feedback()
-    feedback.pop(feedback_id, None)
-    save_qss_feedback(feedback)
+    modify_qss_feedback(lambda feedback: {k: v for k, v in feedback.items() if k != feedback_id})
     return "", 204
 
 
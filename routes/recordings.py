@@ -1,8 +1,9 @@
 from flask import Blueprint, jsonify, request
-from helpers import generate_random_string
 from config import DEFAULT_DATE_FROM, DEFAULT_DATE_TO, MAX_PAGE_SIZE
 from models.auth import require_auth
-from data_store import get_recordings_for_user, get_recordings_for_meeting, load_meeting
+from data_store import get_recording_meeting_ids, recording_item, get_recordings_for_meeting, load_meeting
+from pagination import list_page, InvalidCursor, invalid_cursor_response
+from streaming import stream_json
 import datetime
 import logging
 
@@ -13,7 +14,7 @@ logger = logging.getLogger(__name__)
 @recordings_bp.route("/users/<user_id>/recordings", methods=["GET"])
 @require_auth
 def get_user_recordings(user_id):
-    """List user recordings from data store. Query: from, to (YYYY-MM-DD), page_size, page_number, trash."""
+    """List user recordings from data store. Query: from, to (YYYY-MM-DD), page_size, page_number, next_page_token, trash."""
     from_date = request.args.get("from", DEFAULT_DATE_FROM)
     to_date = request.args.get("to", DEFAULT_DATE_TO)
     page_size = min(int(request.args.get("page_size", 30)), MAX_PAGE_SIZE)
@@ -24,10 +25,15 @@ def get_user_recordings(user_id):
         datetime.datetime.strptime(to_date, "%Y-%m-%d")
     except ValueError:
         return jsonify({"error": {"code": "400", "message": "Invalid date format", "details": "Use YYYY-MM-DD for from and to"}}), 400
-    recordings = get_recordings_for_user(user_id, from_date=from_date, to_date=to_date)
-    total = len(recordings)
-    start = (page_number - 1) * page_size
-    page_recordings = recordings[start : start + page_size]
+    meeting_ids = get_recording_meeting_ids(user_id)
+    build = lambda mid: recording_item(mid, user_id, from_date, to_date)
+    try:
+        page_recordings, next_page_token, total = list_page(
+            meeting_ids, page_size, page_number, request.args.get("next_page_token"),
+            scope=f"recordings:{user_id}:{from_date}:{to_date}", id_of=lambda mid: mid, build=build, count=True,
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
     response_data = {
         "from": from_date,
         "to": to_date,
@@ -35,12 +41,11 @@ def get_user_recordings(user_id):
         "page_number": page_number,
         "total_records": total,
         "page_count": max(1, (total + page_size - 1) // page_size) if total else 1,
-        "next_page_token": generate_random_string(16) if start + page_size < total else "",
-        "meetings": page_recordings,
+        "next_page_token": next_page_token,
     }
     if trash:
         response_data["trash"] = False
-    return jsonify(response_data)
+    return stream_json(response_data, "meetings", page_recordings)
 
 
 @recordings_bp.route("/meetings/<meeting_id>/recordings", methods=["GET"])
@@ -2,10 +2,23 @@
 Zoom Reports API. Mirrors Zoom REST: report/users, report/meetings, report/webinars, metrics.
 """
 from flask import Blueprint, jsonify, request
-from helpers import generate_random_string
 from config import DEFAULT_DATE_FROM, DEFAULT_DATE_TO, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from models.auth import require_auth
-from data_store import load_user, list_user_ids, load_meeting, get_participants_for_meeting, load_webinar, get_participants_for_webinar, get_meetings_for_user
+from data_store import (
+    load_user,
+    list_user_ids,
+    count_users,
+    load_meeting,
+    get_participants_for_meeting,
+    load_webinar,
+    get_participants_for_webinar,
+    list_meeting_keys_in_range,
+    count_meetings_in_range,
+    meeting_list_item,
+)
+from pagination import keyed_page, list_page, InvalidCursor, invalid_cursor_response
+from streaming import stream_json
+from cache_tags import cached_view
 import datetime
 
 reports_bp = Blueprint("reports", __name__)
@@ -13,25 +26,31 @@ reports_bp = Blueprint("reports", __name__)
 
 @reports_bp.route("/report/users", methods=["GET"])
 @require_auth
+@cached_view("users")
 def report_users():
-    """Get active/inactive host report. Query: type (active|inactive), from, to, page_size, page_number."""
+    """Get active/inactive host report. Query: type (active|inactive), from, to, page_size, page_number, next_page_token."""
     report_type = request.args.get("type", "active")
     from_date = request.args.get("from", DEFAULT_DATE_FROM)
     to_date = request.args.get("to", DEFAULT_DATE_TO)
     page_size = min(int(request.args.get("page_size", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
     page_number = max(1, int(request.args.get("page_number", 1)))
-    user_ids = list_user_ids()
-    users = []
-    for uid in user_ids:
-        u = load_user(uid)
-        if not u:
-            continue
-        # Mock: active = status active, inactive = status inactive
-        if report_type == "active" and u.get("status") != "active":
-            continue
-        if report_type == "inactive" and u.get("status") == "active":
-            continue
-        users.append({
+    # Mock: active = status active, inactive = status inactive
+    if report_type == "active":
+        match = lambda u: u.get("status") == "active"
+    elif report_type == "inactive":
+        match = lambda u: u.get("status") != "active"
+    else:
+        match = lambda u: True
+    try:
+        user_ids, next_page_token, total = keyed_page(
+            lambda after, offset, limit: list_user_ids(after=after, offset=offset, limit=limit, match=match),
+            page_size, page_number, request.args.get("next_page_token"), scope=f"report_users:{report_type}",
+            count=lambda: count_users(match),
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    page_users = (
+        {
             "id": u.get("id"),
             "email": u.get("email"),
             "first_name": u.get("first_name"),
@@ -39,19 +58,17 @@ def report_users():
             "type": u.get("type"),
             "created_at": u.get("created_at"),
             "last_login_time": u.get("last_login_time"),
-        })
-    total = len(users)
-    start = (page_number - 1) * page_size
-    page_users = users[start : start + page_size]
-    return jsonify({
+        }
+        for u in (load_user(uid) for uid in user_ids) if u
+    )
+    return stream_json({
         "from": from_date,
         "to": to_date,
         "page_size": page_size,
         "page_number": page_number,
         "total_records": total,
-        "next_page_token": generate_random_string(16) if start + page_size < total else "",
-        "users": page_users,
-    })
+        "next_page_token": next_page_token,
+    }, "users", page_users)
 
 
 @reports_bp.route("/report/meetings/<meeting_id>/participants", methods=["GET"])
@@ -65,16 +82,19 @@ def report_meeting_participants(meeting_id):
     page_size = min(int(request.args.get("page_size", 30)), 300)
     page_number = max(1, int(request.args.get("page_number", 1)))
     total = len(participants)
-    start = (page_number - 1) * page_size
-    page_part = participants[start : start + page_size]
-    return jsonify({
+    try:
+        page_part, next_page_token = list_page(
+            participants, page_size, page_number, request.args.get("next_page_token"), scope=f"report_meeting_participants:{meeting_id}",
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    return stream_json({
         "meeting_id": meeting_id,
-        "next_page_token": generate_random_string(32) if start + page_size < total else "",
+        "next_page_token": next_page_token,
         "page_count": max(1, (total + page_size - 1) // page_size),
         "page_size": page_size,
         "total_records": total,
-        "participants": page_part,
-    })
+    }, "participants", page_part)
 
 
 @reports_bp.route("/report/webinars/<webinar_id>/participants", methods=["GET"])
@@ -88,39 +108,45 @@ def report_webinar_participants(webinar_id):
     page_size = min(int(request.args.get("page_size", 30)), 300)
     page_number = max(1, int(request.args.get("page_number", 1)))
     total = len(participants)
-    start = (page_number - 1) * page_size
-    page_part = participants[start : start + page_size]
-    return jsonify({
+    try:
+        page_part, next_page_token = list_page(
+            participants, page_size, page_number, request.args.get("next_page_token"), scope=f"report_webinar_participants:{webinar_id}",
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    return stream_json({
         "webinar_id": webinar_id,
-        "next_page_token": generate_random_string(32) if start + page_size < total else "",
+        "next_page_token": next_page_token,
         "page_count": max(1, (total + page_size - 1) // page_size),
         "page_size": page_size,
         "total_records": total,
-        "participants": page_part,
-    })
+    }, "participants", page_part)
 
 
 @reports_bp.route("/metrics/meetings", methods=["GET"])
 @require_auth
+@cached_view("meetings")
 def metrics_meetings():
-    """List meetings for metrics/reporting. Query: from, to, type, page_size, next_page_token."""
+    """List meetings for metrics/reporting, ordered by start_time. Query: from, to, type, page_size, next_page_token."""
     from_date = request.args.get("from", DEFAULT_DATE_FROM)
     to_date = request.args.get("to", DEFAULT_DATE_TO)
     page_size = min(int(request.args.get("page_size", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
     page_number = max(1, int(request.args.get("page_number", 1)))
-    meetings = []
-    for uid in list_user_ids():
-        meetings.extend(get_meetings_for_user(uid, from_date=from_date, to_date=to_date))
-    total = len(meetings)
-    start = (page_number - 1) * page_size
-    page_meetings = meetings[start : start + page_size]
-    return jsonify({
+    try:
+        keys, next_page_token = keyed_page(
+            lambda after, offset, limit: list_meeting_keys_in_range(from_date, to_date, after=after, offset=offset, limit=limit),
+            page_size, page_number, request.args.get("next_page_token"), scope=f"metrics_meetings:{from_date}:{to_date}",
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    page_meetings = (item for item in (meeting_list_item(mid) for _, mid in keys) if item)
+    return stream_json({
         "from": from_date,
         "to": to_date,
         "page_size": page_size,
-        "next_page_token": generate_random_string(16) if start + page_size < total else "",
-        "meetings": page_meetings,
-    })
+        "total_records": count_meetings_in_range(from_date, to_date),
+        "next_page_token": next_page_token,
+    }, "meetings", page_meetings)
 
 
 @reports_bp.route("/report/daily", methods=["GET"])
@@ -4,7 +4,9 @@ Zoom Rooms API. Source of truth: data/rooms.json.
 from flask import Blueprint, jsonify, request
 from models.auth import require_auth
 from helpers import generate_random_string, BASE_URL
-from data_store import load_rooms, save_rooms
+from pagination import list_page, InvalidCursor, invalid_cursor_response
+from streaming import stream_json
+from data_store import load_rooms, modify_rooms
 
 rooms_bp = Blueprint("rooms", __name__)
 
@@ -12,7 +14,7 @@ rooms_bp = Blueprint("rooms", __name__)
 @rooms_bp.route("/rooms", methods=["GET"])
 @require_auth
 def list_rooms():
-    """List Zoom Rooms. Query: page_size, next_page_token, status, location_id."""
+    """List Zoom Rooms. Query: page_size, page_number, next_page_token, status, location_id."""
     page_size = min(int(request.args.get("page_size", 30)), 300)
     page_number = max(1, int(request.args.get("page_number", 1)))
     status_filter = request.args.get("status")
@@ -24,14 +26,15 @@ def list_rooms():
     if location_id:
         filtered = [r for r in filtered if r.get("location_id") == location_id]
     total = len(filtered)
-    start = (page_number - 1) * page_size
-    page = filtered[start : start + page_size]
-    return jsonify({
-        "rooms": page,
+    try:
+        page, next_page_token = list_page(filtered, page_size, page_number, request.args.get("next_page_token"), scope=f"rooms:{status_filter or ''}:{location_id or ''}")
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    return stream_json({
         "page_size": page_size,
-        "next_page_token": generate_random_string(16) if start + page_size < total else "",
+        "next_page_token": next_page_token,
         "total_records": total,
-    })
+    }, "rooms", page)
 
 
 @rooms_bp.route("/rooms", methods=["POST"])
@@ -48,9 +51,7 @@ def create_room():
         "calendar_name": data.get("calendar_name", ""),
         "status": "Offline",
     }
-    rooms = load_rooms()
-    rooms.append(room)
-    save_rooms(rooms)
+    modify_rooms(lambda rooms: rooms + [room])
     return jsonify(room), 201
 
 
@@ -70,16 +71,22 @@ def get_room(room_id):
 def update_room(room_id):
     """Update Zoom Room. Body: name, calendar_name, status."""
     data = request.get_json() or {}
-    rooms = load_rooms()
-    idx = next((i for i, r in enumerate(rooms) if r.get("id") == room_id), None)
-    if idx is None:
+
+    def apply(rooms):
+        idx = next((i for i, r in enumerate(rooms) if r.get("id") == room_id), None)
+        if idx is None:
+            return None
+        out = dict(rooms[idx])
+        for key in ("name", "calendar_name", "status", "location_id"):
+            if key in data:
+                out[key] = data[key]
+        rooms[idx] = out
+        return rooms
+
+    rooms = modify_rooms(apply)
+    if rooms is None:
         return jsonify({"error": {"code": "404", "message": "Room not found"}}), 404
-    out = dict(rooms[idx])
-    for key in ("name", "calendar_name", "status", "location_id"):
-        if key in data:
-            out[key] = data[key]
-    rooms[idx] = out
-    save_rooms(rooms)
+    out = next(r for r in rooms if r.get("id") == room_id)
     return jsonify(out), 200
 
 
@@ -87,9 +94,7 @@ def update_room(room_id):
 @require_auth
 def delete_room(room_id):
     """Delete Zoom Room."""
-    rooms = load_rooms()
-    rooms = [r for r in rooms if r.get("id") != room_id]
-    save_rooms(rooms)
+    modify_rooms(lambda rooms: [r for r in rooms if r.get("id") != room_id])
     return "", 204
 
 
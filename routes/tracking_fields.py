@@ -4,7 +4,9 @@ Zoom Tracking Fields API. Source of truth: data/tracking_fields.json.
 from flask import Blueprint, jsonify, request
 from models.auth import require_auth
 from helpers import generate_random_string
-from data_store import load_tracking_fields, save_tracking_fields
+from pagination import list_page, InvalidCursor, invalid_cursor_response
+from streaming import stream_json
+from data_store import load_tracking_fields, modify_tracking_fields
 
 tracking_fields_bp = Blueprint("tracking_fields", __name__)
 
@@ -12,19 +14,20 @@ tracking_fields_bp = Blueprint("tracking_fields", __name__)
 @tracking_fields_bp.route("/tracking_fields", methods=["GET"])
 @require_auth
 def list_tracking_fields():
-    """List tracking fields. Query: page_size, next_page_token."""
+    """List tracking fields. Query: page_size, page_number, next_page_token."""
     page_size = min(int(request.args.get("page_size", 30)), 300)
     page_number = max(1, int(request.args.get("page_number", 1)))
     fields = load_tracking_fields()
     total = len(fields)
-    start = (page_number - 1) * page_size
-    page = fields[start : start + page_size]
-    return jsonify({
-        "tracking_fields": page,
+    try:
+        page, next_page_token = list_page(fields, page_size, page_number, request.args.get("next_page_token"), scope="tracking_fields")
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    return stream_json({
         "page_size": page_size,
-        "next_page_token": generate_random_string(16) if start + page_size < total else "",
+        "next_page_token": next_page_token,
         "total_records": total,
-    })
+    }, "tracking_fields", page)
 
 
 @tracking_fields_bp.route("/tracking_fields", methods=["POST"])
@@ -34,9 +37,7 @@ def create_tracking_field():
     data = request.get_json() or {}
     field_id = generate_random_string(16)
     entry = {"id": field_id, "field": data.get("field", ""), "value": data.get("value", ""), "visible": data.get("visible", True)}
-    fields = load_tracking_fields()
-    fields.append(entry)
-    save_tracking_fields(fields)
+    modify_tracking_fields(lambda fields: fields + [entry])
     return jsonify(entry), 201
 
 
@@ -56,16 +57,22 @@ def get_tracking_field(field_id):
 def update_tracking_field(field_id):
     """Update tracking field. Body: field, value, visible."""
     data = request.get_json() or {}
-    fields = load_tracking_fields()
-    idx = next((i for i, f in enumerate(fields) if f.get("id") == field_id), None)
-    if idx is None:
+
+    def apply(fields):
+        idx = next((i for i, f in enumerate(fields) if f.get("id") == field_id), None)
+        if idx is None:
+            return None
+        out = dict(fields[idx])
+        for key in ("field", "value", "visible"):
+            if key in data:
+                out[key] = data[key]
+        fields[idx] = out
+        return fields
+
+    fields = modify_tracking_fields(apply)
+    if fields is None:
         return jsonify({"error": {"code": "404", "message": "Tracking field not found"}}), 404
-    out = dict(fields[idx])
-    for key in ("field", "value", "visible"):
-        if key in data:
-            out[key] = data[key]
-    fields[idx] = out
-    save_tracking_fields(fields)
+    out = next(f for f in fields if f.get("id") == field_id)
     return jsonify(out), 200
 
 
@@ -73,7 +80,5 @@ def update_tracking_field(field_id):
 @require_auth
 def delete_tracking_field(field_id):
     """Delete tracking field."""
-    fields = load_tracking_fields()
-    fields = [f for f in fields if f.get("id") != field_id]
-    save_tracking_fields(fields)
+    modify_tracking_fields(lambda fields: [f for f in fields if f.get("id") != field_id])
     return "", 204
@@ -2,10 +2,13 @@ from flask import Blueprint, jsonify, request
 from helpers import generate_user_id
 from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from models.auth import require_auth
-from cache_config import cache
-from data_store import list_user_ids, load_user, save_user
+from models.conditional import conditional_get
+from cache_tags import cached_view
+from data_store import list_user_ids, count_users, load_user, save_user, modify_user
+from projection import requested_fields, project
+from pagination import keyed_page, InvalidCursor, invalid_cursor_response
+from streaming import stream_json
 import random
-import os
 from datetime import datetime, timedelta
 
 users_bp = Blueprint("users", __name__)
@@ -13,32 +16,35 @@ users_bp = Blueprint("users", __name__)
 
 @users_bp.route("/users", methods=["GET"])
 @require_auth
+@cached_view("users")
 def get_data():
-    """List users from data/users/ (Zoom-style). Query: page_size, page_number, status."""
+    """List users from data/users/ (Zoom-style), ordered by id. Query: page_size, page_number, next_page_token, status, fields."""
     page_size = min(int(request.args.get("page_size", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
     page_number = max(1, int(request.args.get("page_number", 1)))
     status_filter = request.args.get("status")
-    all_ids = list_user_ids()
-    users = []
-    for uid in all_ids:
-        u = load_user(uid)
-        if not u:
-            continue
-        if status_filter and status_filter in ("active", "inactive", "pending") and u.get("status") != status_filter:
-            continue
-        users.append(u)
-    total_records = len(users)
-    start = (page_number - 1) * page_size
-    page_users = users[start : start + page_size]
+    match = None
+    if status_filter and status_filter in ("active", "inactive", "pending"):
+        match = lambda u: u.get("status") == status_filter
+    else:
+        status_filter = None
+    try:
+        user_ids, next_page_token, total_records = keyed_page(
+            lambda after, offset, limit: list_user_ids(after=after, offset=offset, limit=limit, match=match),
+            page_size, page_number, request.args.get("next_page_token"), scope=f"users:{status_filter or ''}",
+            count=lambda: count_users(match),
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    fields = requested_fields()
+    page_users = (project(u, fields) for u in (load_user(uid) for uid in user_ids) if u)
     response_data = {
-        "next_page_token": os.urandom(16).hex() if start + page_size < total_records else "",
+        "next_page_token": next_page_token,
         "page_count": max(1, (total_records + page_size - 1) // page_size),
         "page_number": page_number,
         "page_size": page_size,
         "total_records": total_records,
-        "users": page_users,
     }
-    return jsonify(response_data)
+    return stream_json(response_data, "users", page_users)
 
 
 @users_bp.route("/users", methods=["POST"])
@@ -73,8 +79,6 @@ def create_user():
 @require_auth
 def delete_user(user_id):
     """Delete a user (Zoom-style)."""
-    cache.delete_memoized(get_user, user_id)
-    cache.delete("list_users")
     return "", 204
 
 
@@ -82,7 +86,7 @@ def delete_user(user_id):
 @require_auth
 def get_current_user():
     """Get current user (Zoom API: GET /v2/users/me). Mock: returns first user from data store."""
-    all_ids = list_user_ids()
+    all_ids = list_user_ids(limit=1)
     if not all_ids:
         return jsonify({"error": {"code": "404", "message": "User not found", "details": "No users in data store"}}), 404
     user = load_user(all_ids[0])
@@ -92,15 +96,16 @@ def get_current_user():
 
 
 @users_bp.route("/users/<user_id>", methods=["GET"])
-@cache.memoize(timeout=3600)
 @require_auth
+@conditional_get("users", "user_id")
+@cached_view("user:{user_id}", cache_404=True)
 def get_user(user_id):
-    """Get user from data/users/<user_id>.json (Zoom-style). Returns 404 if not found."""
+    """Get user from data/users/<user_id>.json (Zoom-style). Query: fields. Returns 404 if not found."""
     user = load_user(user_id)
     if not user:
         return jsonify({"error": {"code": "404", "message": "User not found", "details": f"No user with id: {user_id}"}}), 404
     # Return Zoom user object (exclude internal keys like meeting_ids if desired; Zoom often includes them in profile)
-    return jsonify(user)
+    return jsonify(project(user, requested_fields()))
 
 @users_bp.route("/users/<user_id>/status", methods=["PUT"])
 @require_auth
@@ -198,16 +203,20 @@ def delete_virtual_backgrounds(user_id):
 def update_user(user_id):
     """Update user. Body merged into profile from data/users/<user_id>.json; 404 if user not in data."""
     data = request.get_json() or {}
-    cache.delete_memoized(get_user, user_id)
-    base = load_user(user_id)
+
+    def apply(base):
+        if not base:
+            return None
+        base = dict(base)
+        allowed = ("first_name", "last_name", "display_name", "timezone", "language", "dept", "phone_number", "type", "company", "job_title", "phone_country")
+        for key in allowed:
+            if key in data:
+                base[key] = data[key]
+        if "first_name" in data or "last_name" in data:
+            base["display_name"] = base.get("display_name") or f"{base.get('first_name', '')} {base.get('last_name', '')}"
+        return base
+
+    base = modify_user(user_id, apply)
     if not base:
         return jsonify({"error": {"code": "404", "message": "User not found", "details": f"No user with id: {user_id}"}}), 404
-    base = dict(base)
-    allowed = ("first_name", "last_name", "display_name", "timezone", "language", "dept", "phone_number", "type", "company", "job_title", "phone_country")
-    for key in allowed:
-        if key in data:
-            base[key] = data[key]
-    if "first_name" in data or "last_name" in data:
-        base["display_name"] = base.get("display_name") or f"{base.get('first_name', '')} {base.get('last_name', '')}"
-    save_user(user_id, base)
     return jsonify(base), 200
\ No newline at end of file
@@ -4,19 +4,26 @@ Zoom Webinars API. Mirrors Zoom REST: users/:userId/webinars, webinars/:webinarI
 from flask import Blueprint, jsonify, request
 from helpers import generate_random_string, BASE_URL
 from config import DEFAULT_DATE_FROM, DEFAULT_DATE_TO, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
-from cache_config import cache
+from cache_tags import cached_view
 from models.auth import require_auth
+from timing import timed
+from models.conditional import conditional_get
 from data_store import (
     load_webinar,
-    get_webinars_for_user,
+    get_webinar_ids_for_user,
+    webinar_list_item,
     get_participants_for_webinar,
     load_user,
 )
+from projection import requested_fields, project
+from pagination import list_page, InvalidCursor, invalid_cursor_response
+from streaming import stream_json
 import datetime
 
 webinars_bp = Blueprint("webinars", __name__)
 
 
+@timed("shape")
 def _webinar_to_response(w):
     """Return Zoom webinar shape for GET (exclude participants for list/detail)."""
     if not w:
@@ -27,7 +34,7 @@ def _webinar_to_response(w):
 @webinars_bp.route("/users/<user_id>/webinars", methods=["GET"])
 @require_auth
 def list_webinars(user_id):
-    """List webinars for user. Query: from, to (YYYY-MM-DD), page_size, page_number."""
+    """List webinars for user. Query: from, to (YYYY-MM-DD), page_size, page_number, next_page_token, fields."""
     from_date = request.args.get("from", DEFAULT_DATE_FROM)
     to_date = request.args.get("to", DEFAULT_DATE_TO)
     page_size = min(int(request.args.get("page_size", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
@@ -37,17 +44,22 @@ def list_webinars(user_id):
         datetime.datetime.strptime(to_date, "%Y-%m-%d")
     except ValueError:
         return jsonify({"error": {"code": "400", "message": "Invalid date format", "details": "Use YYYY-MM-DD"}}), 400
-    webinars = get_webinars_for_user(user_id, from_date=from_date, to_date=to_date)
-    total = len(webinars)
-    start = (page_number - 1) * page_size
-    page_webinars = webinars[start : start + page_size]
-    return jsonify({
+    webinar_ids = get_webinar_ids_for_user(user_id)
+    build = lambda wid: webinar_list_item(wid, user_id, from_date, to_date)
+    try:
+        page_webinars, next_page_token, total = list_page(
+            webinar_ids, page_size, page_number, request.args.get("next_page_token"),
+            scope=f"webinars:{user_id}:{from_date}:{to_date}", id_of=lambda wid: wid, build=build, count=True,
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    fields = requested_fields()
+    return stream_json({
         "page_size": page_size,
         "page_number": page_number,
         "total_records": total,
-        "next_page_token": generate_random_string(16) if start + page_size < total else "",
-        "webinars": page_webinars,
-    })
+        "next_page_token": next_page_token,
+    }, "webinars", (project(w, fields) for w in page_webinars))
 
 
 @webinars_bp.route("/users/<user_id>/webinars", methods=["POST"])
@@ -87,25 +99,29 @@ def create_webinar(user_id):
 
 @webinars_bp.route("/webinars/<webinar_id>", methods=["GET"])
 @require_auth
-@cache.memoize(timeout=3600)
+@conditional_get("webinars", "webinar_id")
+@cached_view("webinar:{webinar_id}", cache_404=True)
 def get_webinar(webinar_id):
-    """Get webinar by ID."""
-    w = load_webinar(webinar_id)
+    """Get webinar by ID. Query: fields."""
+    fields = requested_fields()
+    w = load_webinar(webinar_id, fields=fields, omit=("participants",))
     if not w:
         return jsonify({"error": {"code": "404", "message": "Webinar not found", "details": f"No webinar with id: {webinar_id}"}}), 404
-    return jsonify(_webinar_to_response(w))
+    return jsonify(_webinar_to_response(project(w, fields)))
 
 
 @webinars_bp.route("/users/<user_id>/webinars/<webinar_id>", methods=["GET"])
 @require_auth
 def get_user_webinar(user_id, webinar_id):
-    """Get webinar (with host)."""
-    w = load_webinar(webinar_id)
+    """Get webinar (with host). Query: fields."""
+    fields = requested_fields()
+    # host_id is read for the check below even when it is not asked for.
+    w = load_webinar(webinar_id, fields=fields and fields + ("host_id",), omit=("participants",))
     if not w:
         return jsonify({"error": {"code": "404", "message": "Webinar not found", "details": f"No webinar with id: {webinar_id}"}}), 404
     if w.get("host_id") != user_id:
         return jsonify({"error": {"code": "404", "message": "Webinar not found for this user"}}), 404
-    return jsonify(_webinar_to_response(w))
+    return jsonify(_webinar_to_response(project(w, fields)))
 
 
 @webinars_bp.route("/users/<user_id>/webinars/<webinar_id>", methods=["PATCH"])
@@ -113,7 +129,6 @@ def get_user_webinar(user_id, webinar_id):
 def update_webinar(user_id, webinar_id):
     """Update webinar. Body: topic, start_time, duration, timezone, agenda, password, settings."""
     data = request.get_json() or {}
-    cache.delete_memoized(get_webinar, webinar_id)
     w = load_webinar(webinar_id)
     if not w:
         return jsonify({"error": {"code": "404", "message": "Webinar not found", "details": f"No webinar with id: {webinar_id}"}}), 404
@@ -130,7 +145,6 @@ def update_webinar(user_id, webinar_id):
 @require_auth
 def delete_webinar(user_id, webinar_id):
     """Delete a webinar."""
-    cache.delete_memoized(get_webinar, webinar_id)
     w = load_webinar(webinar_id)
     if not w:
         return jsonify({"error": {"code": "404", "message": "Webinar not found"}}), 404
@@ -148,15 +162,18 @@ def get_past_webinar_participants(webinar_id):
     page_size = min(int(request.args.get("page_size", 30)), 300)
     page_number = max(1, int(request.args.get("page_number", 1)))
     total = len(participants)
-    start = (page_number - 1) * page_size
-    page_part = participants[start : start + page_size]
-    return jsonify({
-        "next_page_token": generate_random_string(32) if start + page_size < total else "",
+    try:
+        page_part, next_page_token = list_page(
+            participants, page_size, page_number, request.args.get("next_page_token"), scope=f"past_webinar_participants:{webinar_id}",
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    return stream_json({
+        "next_page_token": next_page_token,
         "page_count": max(1, (total + page_size - 1) // page_size),
         "page_size": page_size,
         "total_records": total,
-        "participants": page_part,
-    })
+    }, "participants", page_part)
 
 
 @webinars_bp.route("/past_webinars/<webinar_id>/instances", methods=["GET"])
@@ -241,15 +258,18 @@ def list_webinar_registrants(webinar_id):
     page_size = min(int(request.args.get("page_size", 30)), 300)
     page_number = max(1, int(request.args.get("page_number", 1)))
     total = len(registrants)
-    start = (page_number - 1) * page_size
-    page_reg = registrants[start : start + page_size]
-    return jsonify({
-        "registrants": page_reg,
+    try:
+        page_reg, next_page_token = list_page(
+            registrants, page_size, page_number, request.args.get("next_page_token"), scope=f"webinar_registrants:{webinar_id}",
+        )
+    except InvalidCursor:
+        return jsonify(invalid_cursor_response()), 400
+    return stream_json({
         "page_count": max(1, (total + page_size - 1) // page_size),
         "page_size": page_size,
         "total_records": total,
-        "next_page_token": generate_random_string(32) if start + page_size < total else "",
-    })
+        "next_page_token": next_page_token,
+    }, "registrants", page_reg)
 
 
 @webinars_bp.route("/webinars/<webinar_id>/registrants", methods=["POST"])
@@ -0,0 +1,234 @@
+"""
+Production launcher: one listening socket, N uvicorn workers forked from a preloaded parent.
+
+    python serve.py --host 0.0.0.0 --port 8000 --workers 4 --max-requests 10000 --max-requests-jitter 1000
+
+The parent imports the app and parses and indexes the data set once (data_store.preload), then
+freezes the GC so those objects are left alone by collections. Each worker is a fork of it, so the
+parsed snapshot is shared copy-on-write instead of being loaded N times. Entities are still
+revalidated against their files, so a worker only re-reads what changed after the snapshot.
+
+Signals to the parent:
+- SIGTERM / SIGINT: stop. Workers finish in-flight requests (up to --graceful-timeout seconds).
+- SIGHUP: graceful restart. The parent refreshes the snapshot (only changed files are re-read) and
+  forks a new set of workers; the old ones drain and exit.
+- SIGTTIN / SIGTTOU: one worker more / less.
+
+A worker that exits (crash, or recycling after --max-requests) is replaced. A worker whose parent
+is gone stops on its own.
+"""
+import gc
+import os
+import sys
+import time
+import random
+import signal
+import socket
+import logging
+import argparse
+import threading
+
+import uvicorn
+
+from config import WEB_CONCURRENCY, MAX_REQUESTS, MAX_REQUESTS_JITTER, GRACEFUL_TIMEOUT
+
+logger = logging.getLogger("serve")
+
+TICK = 0.2
+
+
+def _listen(host, port, backlog=2048):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload():
+    """Import the app and load the data set into this process. Returns the ASGI app."""
+    start = time.perf_counter()
+    import data_store
+    from app import asgi_app
+    count = data_store.preload()
+    gc.collect()
+    gc.freeze()
+    logger.info("preloaded %d documents in %.2fs (%d objects frozen)", count, time.perf_counter() - start,
+                gc.get_freeze_count())
+    return asgi_app
+
+
+class Arbiter:
+    """Keeps args.workers workers of the current generation running on sock."""
+
+    def __init__(self, app, sock, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.size = args.workers
+        self.generation = 0
+        self.workers = {}  # pid -> [generation, kill deadline or None]
+        self.pid = os.getpid()
+        self.stopping = None  # kill deadline once stopping
+        self.pending = []
+
+    # ---- parent ----
+    def run(self):
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(sig, self._on_signal)
+        logger.info("listening on %s:%d with %d workers (parent %d)", self.args.host, self.args.port, self.size, self.pid)
+        while True:
+            self._reap()
+            while self.pending:
+                self._handle(self.pending.pop(0))
+            if self.stopping is not None:
+                if not self.workers:
+                    logger.info("stopped")
+                    return
+                if time.monotonic() > self.stopping:
+                    self._kill_all(signal.SIGKILL)
+            else:
+                self._maintain()
+            time.sleep(TICK)
+
+    def _on_signal(self, signum, frame):
+        self.pending.append(signum)
+
+    def _handle(self, signum):
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            if self.stopping is None:
+                logger.info("stopping %d workers", len(self.workers))
+                self.stopping = time.monotonic() + self.args.graceful_timeout
+                self._kill_all(signal.SIGTERM)
+        elif self.stopping is not None:
+            return
+        elif signum == signal.SIGHUP:
+            logger.info("restarting workers")
+            if not self.args.no_preload:
+                self._refresh()
+            self.generation += 1
+        elif signum == signal.SIGTTIN:
+            self.size += 1
+        elif signum == signal.SIGTTOU:
+            self.size = max(1, self.size - 1)
+
+    def _refresh(self):
+        import data_store
+        from cache_config import cache
+        start = time.perf_counter()
+        gc.unfreeze()
+        count = data_store.preload()
+        # Picks up edits made to the tree since the start, like a new process would.
+        cache.clear()
+        gc.collect()
+        gc.freeze()
+        logger.info("refreshed %d documents in %.2fs", count, time.perf_counter() - start)
+
+    def _maintain(self):
+        current = [pid for pid, (gen, deadline) in self.workers.items() if gen == self.generation and deadline is None]
+        for _ in range(self.size - len(current)):
+            self._spawn()
+        # Retire workers of older generations, and extras after SIGTTOU, once the new ones are forked.
+        extra = current[self.size:] if len(current) > self.size else []
+        for pid, state in self.workers.items():
+            if state[1] is None and (state[0] != self.generation or pid in extra):
+                self._stop(pid)
+        now = time.monotonic()
+        for pid, (_, deadline) in list(self.workers.items()):
+            if deadline is not None and now > deadline:
+                self._signal(pid, signal.SIGKILL)
+
+    def _reap(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            state = self.workers.pop(pid, None)
+            if state is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0 and state[1] is None and self.stopping is None:
+                logger.warning("worker %d exited with %d", pid, code)
+            else:
+                logger.info("worker %d exited", pid)
+
+    def _stop(self, pid):
+        self.workers[pid][1] = time.monotonic() + self.args.graceful_timeout
+        self._signal(pid, signal.SIGTERM)
+
+    def _kill_all(self, sig):
+        for pid in list(self.workers):
+            self._signal(pid, sig)
+
+    def _signal(self, pid, sig):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = [self.generation, None]
+            logger.info("worker %d started", pid)
+            return
+        # Child: leaves through SystemExit, so atexit hooks (journal flush, metrics snapshot) run.
+        self._worker()
+        raise SystemExit(0)
+
+    # ---- worker ----
+    def _worker(self):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        # Meant for the parent; ignored when they reach the whole process group (terminal hangup).
+        for sig in (signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(sig, signal.SIG_IGN)
+        gc.enable()
+        limit = None
+        if self.args.max_requests:
+            limit = self.args.max_requests + random.randint(0, self.args.max_requests_jitter)
+        server = uvicorn.Server(uvicorn.Config(
+            self.app, lifespan="on", log_level=self.args.log_level, access_log=self.args.access_log,
+            limit_max_requests=limit, timeout_graceful_shutdown=self.args.graceful_timeout,
+        ))
+        threading.Thread(target=self._watch_parent, args=(server,), name="parent-watch", daemon=True).start()
+        server.run(sockets=[self.sock])
+
+    def _watch_parent(self, server):
+        while os.getppid() == self.pid:
+            time.sleep(1)
+        server.should_exit = True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run app:asgi_app in preforked uvicorn workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--max-requests", type=int, default=MAX_REQUESTS, help="recycle a worker after this many requests (0: never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=int, default=GRACEFUL_TIMEOUT)
+    parser.add_argument("--no-preload", action="store_true", help="do not load the data set before forking")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="[serve %(process)d] %(message)s")
+
+    # Objects created while loading stay where they are allocated; no collection runs before the freeze.
+    gc.disable()
+    sock = _listen(args.host, args.port)
+    if args.no_preload:
+        from app import asgi_app as app
+    else:
+        app = preload()
+    Arbiter(app, sock, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,474 @@
+"""
+SQLite storage backend (STORAGE_BACKEND=sqlite, database at SQLITE_PATH).
+
+Documents are stored as JSON text next to indexed columns used for lookups:
+- meetings keep summary, vtt_data and recording_files in their own columns and participants
+  in the participants table, so list/range queries never read the heavy blobs and entity reads
+  only fetch the ones the caller asks for (get_entity's fields / omit)
+- meetings(host_id, start_time, id) and meetings(start_time, id) back date-range queries
+The database runs in WAL mode, so readers in several uvicorn workers do not block each other.
+
+One-shot import of an existing data/ tree:
+    python sqlite_storage.py import [--data-dir data] [--db data/zoom_mock.sqlite3]
+"""
+import os
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+from storage import StorageBackend, COLLECTIONS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT,
+    status TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_status ON users(status, id);
+
+CREATE TABLE IF NOT EXISTS meetings (
+    id TEXT PRIMARY KEY,
+    host_id TEXT,
+    start_time TEXT,
+    doc TEXT NOT NULL,
+    summary TEXT,
+    vtt_data TEXT,
+    recording_files TEXT
+);
+CREATE INDEX IF NOT EXISTS meetings_host_start ON meetings(host_id, start_time, id);
+CREATE INDEX IF NOT EXISTS meetings_start ON meetings(start_time, id);
+
+CREATE TABLE IF NOT EXISTS webinars (
+    id TEXT PRIMARY KEY,
+    host_id TEXT,
+    start_time TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS webinars_host_start ON webinars(host_id, start_time, id);
+
+CREATE TABLE IF NOT EXISTS entity_versions (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    modified_at REAL NOT NULL,
+    PRIMARY KEY (kind, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS participants (
+    parent_kind TEXT NOT NULL,
+    parent_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    doc TEXT NOT NULL,
+    PRIMARY KEY (parent_kind, parent_id, seq)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS chat_channels (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    doc TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chat_messages (
+    channel_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    id TEXT,
+    sender TEXT,
+    doc TEXT NOT NULL,
+    PRIMARY KEY (channel_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS chat_messages_id ON chat_messages(channel_id, id);
+CREATE INDEX IF NOT EXISTS chat_messages_sender ON chat_messages(sender);
+
+CREATE TABLE IF NOT EXISTS chat_sequences (
+    channel_id TEXT PRIMARY KEY,
+    last_seq INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS rooms (
+    seq INTEGER PRIMARY KEY,
+    id TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rooms_id ON rooms(id);
+
+CREATE TABLE IF NOT EXISTS tracking_fields (
+    seq INTEGER PRIMARY KEY,
+    id TEXT,
+    doc TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS qss_feedback (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    meeting_id TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS qss_feedback_meeting ON qss_feedback(meeting_id);
+"""
+
+# Meeting keys stored outside the main doc column.
+MEETING_BLOBS = ("summary", "vtt_data", "recording_files")
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _wanted(key, fields, omit):
+    return key not in omit and (fields is None or key in fields)
+
+
+class SQLiteStorage(StorageBackend):
+    """StorageBackend over one SQLite database file. Connections are per thread and per process."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _tx(self):
+        return _Transaction(self._conn())
+
+    # ---- entities ----
+    def get_entity(self, kind, entity_id, fields=None, omit=()):
+        conn = self._conn()
+        if kind == "meetings":
+            blobs = [key for key in MEETING_BLOBS if _wanted(key, fields, omit)]
+            row = conn.execute(
+                f"SELECT {', '.join(('doc', *blobs))} FROM meetings WHERE id = ?", (entity_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            doc = json.loads(row[0])
+            for key, raw in zip(blobs, row[1:]):
+                if raw is not None:
+                    doc[key] = json.loads(raw)
+        else:
+            row = conn.execute(f"SELECT doc FROM {self._table(kind)} WHERE id = ?", (entity_id,)).fetchone()
+            if row is None:
+                return None
+            doc = json.loads(row[0])
+        if kind in ("meetings", "webinars") and _wanted("participants", fields, omit):
+            participants = self._participants(conn, kind, entity_id)
+            if participants is not None:
+                doc["participants"] = participants
+        return doc or None
+
+    def _participants(self, conn, kind, parent_id):
+        rows = conn.execute(
+            "SELECT doc FROM participants WHERE parent_kind = ? AND parent_id = ? ORDER BY seq", (kind, parent_id)
+        ).fetchall()
+        if not rows:
+            return None
+        return [json.loads(r[0]) for r in rows]
+
+    def put_entity(self, kind, entity_id, doc):
+        with self._tx() as conn:
+            self._put_entity(conn, kind, entity_id, doc)
+
+    def put_entities(self, kind, docs):
+        with self._tx() as conn:
+            for doc in docs:
+                self._put_entity(conn, kind, doc["id"], doc)
+
+    def entity_version(self, kind, entity_id):
+        conn = self._conn()
+        row = conn.execute("SELECT version, modified_at FROM entity_versions WHERE kind = ? AND id = ?", (kind, entity_id)).fetchone()
+        if row is None:
+            if conn.execute(f"SELECT 1 FROM {self._table(kind)} WHERE id = ?", (entity_id,)).fetchone() is None:
+                return None
+            # Row written before versions were tracked.
+            with self._tx() as tx:
+                self._bump_version(tx, kind, entity_id)
+            return self.entity_version(kind, entity_id)
+        return f"{row[0] & 0xFFFFFFFFFFFFFFFF:x}", row[1]
+
+    @staticmethod
+    def _bump_version(conn, kind, entity_id):
+        conn.execute(
+            "INSERT OR REPLACE INTO entity_versions (kind, id, version, modified_at) VALUES (?, ?, random(), ?)",
+            (kind, entity_id, time.time()),
+        )
+
+    def _put_entity(self, conn, kind, entity_id, doc):
+        table = self._table(kind)
+        self._bump_version(conn, kind, entity_id)
+        doc = dict(doc)
+        if kind == "users":
+            conn.execute(
+                "INSERT OR REPLACE INTO users (id, email, status, doc) VALUES (?, ?, ?, ?)",
+                (entity_id, doc.get("email"), doc.get("status"), _dumps(doc)),
+            )
+            return
+        participants = doc.pop("participants", None)
+        if kind == "meetings":
+            blobs = [doc.pop(key) if key in doc else None for key in MEETING_BLOBS]
+            conn.execute(
+                "INSERT OR REPLACE INTO meetings (id, host_id, start_time, doc, summary, vtt_data, recording_files)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entity_id, doc.get("host_id"), doc.get("start_time") or "", _dumps(doc),
+                 *[None if b is None else _dumps(b) for b in blobs]),
+            )
+        else:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table} (id, host_id, start_time, doc) VALUES (?, ?, ?, ?)",
+                (entity_id, doc.get("host_id"), doc.get("start_time") or "", _dumps(doc)),
+            )
+        conn.execute("DELETE FROM participants WHERE parent_kind = ? AND parent_id = ?", (kind, entity_id))
+        if participants is not None:
+            conn.executemany(
+                "INSERT INTO participants (parent_kind, parent_id, seq, doc) VALUES (?, ?, ?, ?)",
+                [(kind, entity_id, i, _dumps(p)) for i, p in enumerate(participants)],
+            )
+
+    def modify_entity(self, kind, entity_id, fn):
+        with self._tx() as conn:
+            doc = fn(self.get_entity(kind, entity_id))
+            if doc is not None:
+                self._put_entity(conn, kind, entity_id, doc)
+            return doc
+
+    def list_entity_ids(self, kind, after=None, offset=0, limit=None):
+        sql, params = f"SELECT id FROM {self._table(kind)}", []
+        if after is not None:
+            sql += " WHERE id > ?"
+            params.append(after)
+        sql += " ORDER BY id LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        return [r[0] for r in self._conn().execute(sql, params)]
+
+    def count_entities(self, kind):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self._table(kind)}").fetchone()[0]
+
+    def meeting_ids_in_range(self, host_id=None, from_date=None, to_date=None):
+        return [mid for _, mid in self.meeting_keys_in_range(host_id, from_date, to_date)]
+
+    def meeting_keys_in_range(self, host_id=None, from_date=None, to_date=None, after=None, offset=0, limit=None):
+        where, params = self._meeting_range(host_id, from_date, to_date)
+        if after is not None:
+            where.append("(start_time, id) > (?, ?)")
+            params += list(after)
+        sql = "SELECT start_time, id FROM meetings"
+        if where:
+            sql += f" WHERE {' AND '.join(where)}"
+        sql += " ORDER BY start_time, id LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        return [tuple(r) for r in self._conn().execute(sql, params)]
+
+    def count_meetings_in_range(self, host_id=None, from_date=None, to_date=None):
+        where, params = self._meeting_range(host_id, from_date, to_date)
+        sql = "SELECT COUNT(*) FROM meetings" + (f" WHERE {' AND '.join(where)}" if where else "")
+        return self._conn().execute(sql, params).fetchone()[0]
+
+    @staticmethod
+    def _meeting_range(host_id, from_date, to_date):
+        clauses, params = [], []
+        if host_id is not None:
+            clauses.append("host_id = ?")
+            params.append(host_id)
+        if from_date:
+            clauses.append("start_time >= ?")
+            params.append(from_date)
+        if to_date:
+            clauses.append("start_time <= ?")
+            params.append(to_date + "T23:59:59")
+        return clauses, params
+
+    @staticmethod
+    def _table(kind):
+        if kind not in ("users", "meetings", "webinars"):
+            raise KeyError(kind)
+        return kind
+
+    # ---- collections ----
+    def get_collection(self, name):
+        kind = COLLECTIONS[name]
+        rows = self._conn().execute(f"SELECT id, doc FROM {name} ORDER BY seq").fetchall()
+        if kind is list:
+            return [json.loads(doc) for _, doc in rows]
+        return {key: json.loads(doc) for key, doc in rows}
+
+    def put_collection(self, name, value):
+        kind = COLLECTIONS[name]
+        with self._tx() as conn:
+            self._put_collection(conn, name, kind(value))
+
+    def modify_collection(self, name, fn):
+        kind = COLLECTIONS[name]
+        with self._tx() as conn:
+            value = fn(self.get_collection(name))
+            if value is not None:
+                self._put_collection(conn, name, kind(value))
+            return value
+
+    def _put_collection(self, conn, name, value):
+        conn.execute(f"DELETE FROM {name}")
+        if name == "qss_feedback":
+            conn.executemany(
+                "INSERT INTO qss_feedback (id, meeting_id, doc) VALUES (?, ?, ?)",
+                [(key, (entry or {}).get("meeting_id"), _dumps(entry)) for key, entry in value.items()],
+            )
+        elif isinstance(value, dict):
+            conn.executemany(f"INSERT INTO {name} (id, doc) VALUES (?, ?)", [(key, _dumps(v)) for key, v in value.items()])
+        else:
+            conn.executemany(f"INSERT INTO {name} (id, doc) VALUES (?, ?)", [((v or {}).get("id"), _dumps(v)) for v in value])
+
+    # ---- chat messages ----
+    def chat_channel_ids(self):
+        return [r[0] for r in self._conn().execute("SELECT DISTINCT channel_id FROM chat_messages ORDER BY channel_id")]
+
+    def chat_messages(self, channel_id):
+        rows = self._conn().execute(
+            "SELECT doc FROM chat_messages WHERE channel_id = ? ORDER BY seq", (str(channel_id),)
+        ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def chat_next_id(self, channel_id):
+        row = self._conn().execute("SELECT last_seq FROM chat_sequences WHERE channel_id = ?", (str(channel_id),)).fetchone()
+        return str((row[0] if row else 0) + 1)
+
+    def chat_append(self, channel_id, message):
+        with self._tx() as conn:
+            return self._chat_append(conn, str(channel_id), message)
+
+    def chat_extend(self, channel_id, messages):
+        with self._tx() as conn:
+            return [self._chat_append(conn, str(channel_id), message) for message in messages]
+
+    def _chat_append(self, conn, channel_id, message):
+        conn.execute(
+            "INSERT INTO chat_sequences (channel_id, last_seq) VALUES (?, 1)"
+            " ON CONFLICT(channel_id) DO UPDATE SET last_seq = last_seq + 1",
+            (channel_id,),
+        )
+        seq = conn.execute("SELECT last_seq FROM chat_sequences WHERE channel_id = ?", (channel_id,)).fetchone()[0]
+        if "id" not in message:
+            message = {"id": str(seq), **message}
+        conn.execute(
+            "INSERT INTO chat_messages (channel_id, seq, id, sender, doc) VALUES (?, ?, ?, ?, ?)",
+            (channel_id, seq, str(message.get("id")), message.get("sender"), _dumps(message)),
+        )
+        return message
+
+    def _chat_find(self, conn, channel_id, message_id, sender):
+        sql = "SELECT seq, doc FROM chat_messages WHERE channel_id = ? AND id = ?"
+        params = [str(channel_id), str(message_id)]
+        if sender is not None:
+            sql += " AND sender = ?"
+            params.append(sender)
+        return conn.execute(sql + " ORDER BY seq LIMIT 1", params).fetchone()
+
+    def chat_update(self, channel_id, message_id, fields, sender=None):
+        with self._tx() as conn:
+            row = self._chat_find(conn, channel_id, message_id, sender)
+            if row is None:
+                return None
+            msg = dict(json.loads(row[1]), **fields)
+            conn.execute(
+                "UPDATE chat_messages SET doc = ?, sender = ? WHERE channel_id = ? AND seq = ?",
+                (_dumps(msg), msg.get("sender"), str(channel_id), row[0]),
+            )
+            return msg
+
+    def chat_delete(self, channel_id, message_id, sender=None):
+        with self._tx() as conn:
+            row = self._chat_find(conn, channel_id, message_id, sender)
+            if row is None:
+                return False
+            conn.execute("DELETE FROM chat_messages WHERE channel_id = ? AND seq = ?", (str(channel_id), row[0]))
+            return True
+
+    def chat_drop(self, channel_id):
+        with self._tx() as conn:
+            conn.execute("DELETE FROM chat_messages WHERE channel_id = ?", (str(channel_id),))
+
+    def chat_replace_all(self, messages):
+        with self._tx() as conn:
+            conn.execute("DELETE FROM chat_messages")
+            for channel_id, msgs in messages.items():
+                for msg in msgs or []:
+                    self._chat_append(conn, str(channel_id), msg)
+
+    # ---- maintenance ----
+    def compact(self):
+        self._conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return 0
+
+    def import_tree(self, source):
+        """Copy every document of another backend (e.g. FileStorage over data/) into this database."""
+        counts = {}
+        with self._tx() as conn:
+            for kind in ("users", "meetings", "webinars"):
+                n = 0
+                for entity_id in source.list_entity_ids(kind):
+                    doc = source.get_entity(kind, entity_id)
+                    if doc:
+                        self._put_entity(conn, kind, entity_id, doc)
+                        n += 1
+                counts[kind] = n
+            for name in COLLECTIONS:
+                value = source.get_collection(name)
+                self._put_collection(conn, name, value)
+                counts[name] = len(value)
+            conn.execute("DELETE FROM chat_messages")
+            conn.execute("DELETE FROM chat_sequences")
+            n = 0
+            for channel_id in source.chat_channel_ids():
+                for msg in source.chat_messages(channel_id):
+                    self._chat_append(conn, str(channel_id), msg)
+                    n += 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO chat_sequences (channel_id, last_seq) VALUES (?, ?)",
+                    (str(channel_id), int(source.chat_next_id(channel_id)) - 1),
+                )
+            counts["chat_messages"] = n
+        return counts
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK around a block; yields the connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def main(argv=None):
+    from config import DATA_DIR, SQLITE_PATH
+    from file_storage import FileStorage
+
+    parser = argparse.ArgumentParser(description="SQLite storage backend tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="import a data/ tree into the SQLite database")
+    imp.add_argument("--data-dir", default=DATA_DIR)
+    imp.add_argument("--db", default=SQLITE_PATH)
+    args = parser.parse_args(argv)
+    if args.command == "import":
+        counts = SQLiteStorage(args.db).import_tree(FileStorage(args.data_dir))
+        for name, n in counts.items():
+            print(f"{name}: {n}")
+
+
+if __name__ == "__main__":
+    main()
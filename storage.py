@@ -0,0 +1,158 @@
+"""
+Storage backend interface behind data_store. data_store keeps the Zoom-shaped helpers;
+a backend only stores documents:
+- entities: "users", "meetings", "webinars" → one JSON object per id
+- collections: "tracking_fields", "rooms" (lists) and "chat_channels", "qss_feedback" (dicts),
+  always read and replaced whole
+- chat message logs, one per channel id (plus "_direct_messages")
+
+Backends must stay consistent when several worker processes share them: modify_* run their
+read-modify-write cycle under a lock that other processes honour.
+
+STORAGE_BACKEND selects the implementation: "files" (data/ tree, default) or "sqlite".
+"""
+from config import (
+    STORAGE_BACKEND, SQLITE_PATH, DATA_DIR, PERSISTENCE_MODE, GROUP_COMMIT_INTERVAL_MS,
+    CHAT_COMPACT_INTERVAL, CHAT_COMPACT_MIN_GARBAGE,
+)
+
+ENTITY_KINDS = ("users", "meetings", "webinars")
+COLLECTIONS = {"tracking_fields": list, "rooms": list, "chat_channels": dict, "qss_feedback": dict}
+BACKENDS = ("files", "sqlite")
+
+
+class StorageBackend:
+    """Operations every backend implements. Returned documents must be treated as read-only."""
+
+    # ---- entities ----
+    def get_entity(self, kind, entity_id, fields=None, omit=()):
+        """
+        Document for kind/entity_id, or None. fields / omit are read hints: the top-level keys the
+        caller needs (None: all) and those it does not. A backend may skip reading the others
+        (sqlite: blob columns, participants) but may also return them.
+        """
+        raise NotImplementedError
+
+    def put_entity(self, kind, entity_id, doc):
+        """Create or replace kind/entity_id."""
+        raise NotImplementedError
+
+    def put_entities(self, kind, docs):
+        """Create or replace many documents of kind, each keyed by its "id" (bulk loads)."""
+        for doc in docs:
+            self.put_entity(kind, doc["id"], doc)
+
+    def entity_version(self, kind, entity_id):
+        """
+        (version, modified_at) of kind/entity_id without loading it, or None if it does not exist.
+        version is an opaque string that changes on every write; modified_at is a Unix timestamp.
+        """
+        raise NotImplementedError
+
+    def modify_entity(self, kind, entity_id, fn):
+        """
+        Atomic read-modify-write: fn(doc or None) returns the document to store, or None to
+        leave it unchanged. Returns what fn returned.
+        """
+        raise NotImplementedError
+
+    def list_entity_ids(self, kind, after=None, offset=0, limit=None):
+        """Ids of kind, sorted; only ids > after when given, skipping offset and returning at most limit."""
+        raise NotImplementedError
+
+    def count_entities(self, kind):
+        raise NotImplementedError
+
+    def meeting_ids_in_range(self, host_id=None, from_date=None, to_date=None):
+        """Meeting ids ordered by (start_time, id); from_date <= start_time <= to_date end of day."""
+        raise NotImplementedError
+
+    def meeting_keys_in_range(self, host_id=None, from_date=None, to_date=None, after=None, offset=0, limit=None):
+        """(start_time, id) keys in that range and order, > after when given; offset/limit as in list_entity_ids."""
+        raise NotImplementedError
+
+    def count_meetings_in_range(self, host_id=None, from_date=None, to_date=None):
+        raise NotImplementedError
+
+    # ---- collections ----
+    def get_collection(self, name):
+        """Fresh list/dict copy of a collection (callers may mutate it and pass it to put_collection)."""
+        raise NotImplementedError
+
+    def put_collection(self, name, value):
+        """Replace a collection."""
+        raise NotImplementedError
+
+    def modify_collection(self, name, fn):
+        """
+        Atomic read-modify-write: fn(value) gets a fresh copy, mutates or replaces it and returns
+        the value to store, or None to leave the collection unchanged. Returns what fn returned.
+        """
+        raise NotImplementedError
+
+    # ---- chat messages ----
+    def chat_channel_ids(self):
+        """Channel ids that have messages stored."""
+        raise NotImplementedError
+
+    def chat_messages(self, channel_id):
+        """Messages of one channel, oldest first."""
+        raise NotImplementedError
+
+    def chat_next_id(self, channel_id):
+        """Next sequential message id (string); ids of deleted messages are not reused."""
+        raise NotImplementedError
+
+    def chat_append(self, channel_id, message):
+        """Append a message; one without "id" gets the next sequential id. Returns the stored message."""
+        raise NotImplementedError
+
+    def chat_extend(self, channel_id, messages):
+        """Append many messages in order, as chat_append does (bulk loads). Returns the stored messages."""
+        return [self.chat_append(channel_id, message) for message in messages]
+
+    def chat_update(self, channel_id, message_id, fields, sender=None):
+        """Merge fields into the first message with message_id (and sender). Returns it, or None."""
+        raise NotImplementedError
+
+    def chat_delete(self, channel_id, message_id, sender=None):
+        """Delete the first message with message_id (and sender). Returns False if not found."""
+        raise NotImplementedError
+
+    def chat_drop(self, channel_id):
+        """Delete all messages of a channel."""
+        raise NotImplementedError
+
+    def chat_replace_all(self, messages):
+        """Replace every channel's messages: dict channel_id -> list."""
+        raise NotImplementedError
+
+    # ---- maintenance ----
+    def preload(self):
+        """Load what the backend keeps in memory ahead of the first request. Returns the number of documents read."""
+        return 0
+
+    def compact(self):
+        """Reclaim space left by updates and deletes. Returns a backend-specific count."""
+        return 0
+
+    def flush(self):
+        """Make acknowledged writes durable now."""
+
+
+def create_backend(name=None):
+    """Instantiate the configured backend (STORAGE_BACKEND unless name is given)."""
+    name = name or STORAGE_BACKEND
+    if name == "files":
+        from file_storage import FileStorage
+        return FileStorage(
+            DATA_DIR,
+            persistence_mode=PERSISTENCE_MODE,
+            group_commit_interval_ms=GROUP_COMMIT_INTERVAL_MS,
+            compact_interval=CHAT_COMPACT_INTERVAL,
+            compact_min_garbage=CHAT_COMPACT_MIN_GARBAGE,
+        )
+    if name == "sqlite":
+        from sqlite_storage import SQLiteStorage
+        return SQLiteStorage(SQLITE_PATH)
+    raise ValueError(f"STORAGE_BACKEND must be one of {', '.join(BACKENDS)}; got {name!r}")
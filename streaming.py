@@ -0,0 +1,55 @@
+"""
+Streaming JSON responses for large lists. jsonify renders the whole body as one string before
+the first byte goes out; stream_json encodes the envelope once and the list item by item, so a
+page of recordings or a webinar's full participant list is sent in bounded chunks while the
+items are still being produced by the data layer.
+
+The bytes are identical to what jsonify would return (same key order, separators and
+ensure_ascii settings of app.json, trailing newline). In debug mode, where jsonify pretty-prints,
+the response is rendered with jsonify instead.
+"""
+from flask import current_app, jsonify
+
+# Flush the encoded items to the client about every 64 KiB.
+CHUNK_BYTES = 64 * 1024
+
+
+def stream_json(payload, key, items, status=200):
+    """
+    Response for payload (a dict) with payload[key] = items, where items is any iterable
+    (typically a generator over the data layer). Items are encoded one at a time.
+    """
+    provider = current_app.json
+    if (provider.compact is None and current_app.debug) or provider.compact is False:
+        return jsonify(dict(payload, **{key: list(items)})), status
+
+    def dumps(value):
+        return provider.dumps(value, separators=(",", ":"))
+
+    keys = list(payload) + [key] if key not in payload else list(payload)
+    if provider.sort_keys:
+        keys.sort()
+
+    def generate():
+        buf = []
+        size = 0
+        for i, k in enumerate(keys):
+            buf.append(("{" if i == 0 else ",") + dumps(k) + ":")
+            if k != key:
+                buf.append(dumps(payload[k]))
+                continue
+            buf.append("[")
+            first = True
+            for item in items:
+                chunk = dumps(item) if first else "," + dumps(item)
+                first = False
+                buf.append(chunk)
+                size += len(chunk)
+                if size >= CHUNK_BYTES:
+                    yield "".join(buf)
+                    buf, size = [], 0
+            buf.append("]")
+        buf.append("}\n" if keys else "{}\n")
+        yield "".join(buf)
+
+    return current_app.response_class(generate(), status=status, mimetype=provider.mimetype)
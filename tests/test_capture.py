@@ -0,0 +1,48 @@
+import json
+import asyncio
+
+from capture import replay
+
+
+async def _serve(created):
+    """Tiny HTTP server: POST creates a meeting after 50 ms, GET /v2/meetings/<id> finds it."""
+    async def handle(reader, writer):
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            lines = head.decode("latin-1").split("\r\n")
+            method, path, _ = lines[0].split(" ")
+            length = next((int(line.split(":")[1]) for line in lines if line.lower().startswith("content-length:")), 0)
+            await reader.readexactly(length)
+            if method == "POST":
+                await asyncio.sleep(0.05)
+                meeting_id = f"replayed{len(created):08d}"
+                created.add(meeting_id)
+                status, body = 201, json.dumps({"id": meeting_id}).encode()
+            else:
+                found = path.rsplit("/", 1)[1] in created
+                status, body = (200, b"{}") if found else (404, b"{}")
+            writer.write(f"HTTP/1.1 {status} X\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+        writer.close()
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def test_read_of_created_id_waits_for_the_create():
+    records = [
+        {"ts": 100.0, "method": "POST", "path": "/v2/users/u1/meetings", "status": 201,
+         "body": "{}", "response_body": json.dumps({"id": "recorded0001"})},
+        {"ts": 100.0017, "method": "GET", "path": "/v2/meetings/recorded0001", "status": 200},
+    ]
+
+    async def run():
+        server = await _serve(set())
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await replay(records, f"http://127.0.0.1:{port}", speed=1.0, connections=4)
+
+    results = asyncio.run(run())
+    statuses = {record["method"]: status for record, status, _, _ in results}
+    assert statuses == {"POST": 201, "GET": 200}
@@ -0,0 +1,40 @@
+import json
+import os
+
+from file_storage import FileStorage
+
+
+def _meeting(meeting_id, host_id, start_time):
+    return {"id": meeting_id, "host_id": host_id, "start_time": start_time, "topic": meeting_id}
+
+
+def _storage(tmp_path, meetings):
+    os.makedirs(tmp_path / "meetings")
+    for m in meetings:
+        (tmp_path / "meetings" / f"{m['id']}.json").write_text(json.dumps(m))
+    return FileStorage(str(tmp_path))
+
+
+def test_saved_meeting_is_listed_without_rescan(tmp_path, monkeypatch):
+    storage = _storage(tmp_path, [_meeting(f"m{i}", "u1", f"2024-01-{i + 1:02d}T10:00:00Z") for i in range(5)])
+    assert len(storage.meeting_ids_in_range(host_id="u1")) == 5
+
+    storage.put_entity("meetings", "new", _meeting("new", "u1", "2024-01-03T12:00:00Z"))
+
+    def rescan():
+        raise AssertionError("meetings directory listed again after a local save")
+    monkeypatch.setattr(storage.repos["meetings"], "ids", rescan)
+    assert storage.meeting_ids_in_range(host_id="u1", from_date="2024-01-03", to_date="2024-01-03") == ["m2", "new"]
+    assert storage.count_meetings_in_range(host_id="u1") == 6
+
+
+def test_meeting_written_by_another_process_is_indexed(tmp_path):
+    storage = _storage(tmp_path, [_meeting("m1", "u1", "2024-01-01T10:00:00Z")])
+    assert storage.meeting_ids_in_range(host_id="u1") == ["m1"]
+    storage.put_entity("meetings", "m2", _meeting("m2", "u1", "2024-01-02T10:00:00Z"))
+
+    # A file added behind this process's back changes the directory signature again.
+    path = tmp_path / "meetings" / "m3.json"
+    path.write_text(json.dumps(_meeting("m3", "u1", "2024-01-03T10:00:00Z")))
+    assert storage.meeting_ids_in_range(host_id="u1") == ["m1", "m2", "m3"]
+    assert storage.list_entity_ids("meetings") == ["m1", "m2", "m3"]
@@ -0,0 +1,49 @@
+import pytest
+
+from pagination import InvalidCursor, keyed_page, list_page
+
+
+def test_keyed_page_counts_once_and_carries_total():
+    keys = [f"k{i:02d}" for i in range(10)]
+    counted = []
+
+    def fetch(after, offset, limit):
+        start = keys.index(after) + 1 if after is not None else offset
+        return keys[start:start + limit]
+
+    def count():
+        counted.append(1)
+        return len(keys)
+
+    seen, token = [], None
+    while True:
+        page, token, total = keyed_page(fetch, 4, token=token, scope="s", count=count)
+        seen += page
+        assert total == 10
+        if not token:
+            break
+    assert seen == keys
+    assert len(counted) == 1
+
+
+def test_list_page_builds_each_item_once_and_carries_total():
+    items = list(range(20))
+    built = []
+
+    def build(item):
+        built.append(item)
+        return {"id": str(item)} if item % 2 == 0 else None
+
+    page, token, total = list_page(items, 3, token=None, scope="s", id_of=str, build=build, count=True)
+    assert [p["id"] for p in page] == ["0", "2", "4"] and total == 10
+    assert sorted(built) == items
+    built.clear()
+    page, token, total = list_page(items, 3, token=token, scope="s", id_of=str, build=build, count=True)
+    assert [p["id"] for p in page] == ["6", "8", "10"] and total == 10
+    assert max(built) <= 12
+
+
+def test_token_from_another_scope_is_rejected():
+    _, token = list_page(list(range(10)), 3, scope="a")
+    with pytest.raises(InvalidCursor):
+        list_page(list(range(10)), 3, token=token, scope="b")
@@ -0,0 +1,366 @@
+"""
+Two-tier response cache for flask-caching (CACHE_TYPE "tiered_cache.TieredCache").
+
+- L1: per-process LRU of pickled values, bounded by CACHE_L1_MAX_BYTES
+- L2: one file per key under CACHE_DIR, shared by every worker on the host and bounded by
+  CACHE_L2_MAX_BYTES (oldest written entries are pruned first)
+
+delete() and clear() remove the L2 entry and append to CACHE_DIR/invalidations.log; each worker
+tails that log (one stat per lookup) and drops the same keys from its L1, so an entry
+invalidated by the worker that handled a PATCH is not served from another worker's L1.
+With CACHE_DIR = "" the cache is L1 only (single-process deployments).
+
+stats() breaks hits, misses, evictions and L1 footprint down by namespace: the view name for
+"view:<name>:..." keys (cache_tags.py), otherwise the text before the first colon ("tag", ...).
+"""
+import os
+import time
+import pickle
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask_caching.backends.base import BaseCache
+
+from journal import FileLock
+
+# L2 entry: 8-byte expiry (0 = never) followed by the pickled value.
+_HEADER = struct.Struct("<d")
+LOG_NAME = "invalidations.log"
+LOCK_NAME = "invalidations.lock"
+# The log is started over (readers drop their whole L1 once) when it grows past this.
+LOG_MAX_BYTES = 1024 * 1024
+# Sets between two L2 size checks in one process.
+PRUNE_EVERY = 200
+
+
+def _digest(key):
+    return hashlib.md5(key.encode("utf-8")).hexdigest()
+
+
+def _namespace(key):
+    head, sep, rest = key.partition(":")
+    if head == "view":
+        return rest.partition(":")[0]
+    return head if sep else "other"
+
+
+class TieredCache(BaseCache):
+    def __init__(self, cache_dir=None, l1_max_bytes=64 * 1024 * 1024, l2_max_bytes=512 * 1024 * 1024, default_timeout=300):
+        super().__init__(default_timeout=default_timeout)
+        self.cache_dir = cache_dir or None
+        self.l1_max_bytes = l1_max_bytes
+        self.l2_max_bytes = l2_max_bytes
+        self._l1 = OrderedDict()  # digest -> (expires, data, namespace)
+        self._l1_bytes = 0
+        self._ns = {}  # namespace -> counters
+        self._lock = threading.Lock()
+        self._log_path = None
+        self._log_lock = None
+        self._log_ino = None
+        self._log_offset = 0
+        self._sets = 0
+        self.hits_l1 = self.hits_l2 = self.misses = self.evictions = 0
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._log_path = os.path.join(self.cache_dir, LOG_NAME)
+            self._log_lock = FileLock(os.path.join(self.cache_dir, LOCK_NAME))
+            with open(self._log_path, "ab"):
+                pass
+            st = os.stat(self._log_path)
+            self._log_ino, self._log_offset = st.st_ino, st.st_size
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(
+            cache_dir=config.get("CACHE_DIR"),
+            l1_max_bytes=config.get("CACHE_L1_MAX_BYTES", 64 * 1024 * 1024),
+            l2_max_bytes=config.get("CACHE_L2_MAX_BYTES", 512 * 1024 * 1024),
+        )
+        return cls(*args, **kwargs)
+
+    # ---- L1 (callers of the _l1_* helpers hold self._lock) ----
+    def _ns_stats(self, ns):
+        stats = self._ns.get(ns)
+        if stats is None:
+            stats = self._ns[ns] = {"entries": 0, "bytes": 0, "hits": 0, "misses": 0, "evictions": 0}
+        return stats
+
+    def _l1_pop(self, digest):
+        old = self._l1.pop(digest, None)
+        if old is not None:
+            self._l1_bytes -= len(old[1])
+            stats = self._ns_stats(old[2])
+            stats["entries"] -= 1
+            stats["bytes"] -= len(old[1])
+        return old
+
+    def _l1_put(self, digest, expires, data, ns):
+        if len(data) > self.l1_max_bytes:
+            return
+        self._l1_pop(digest)
+        self._l1[digest] = (expires, data, ns)
+        self._l1_bytes += len(data)
+        stats = self._ns_stats(ns)
+        stats["entries"] += 1
+        stats["bytes"] += len(data)
+        while self._l1_bytes > self.l1_max_bytes:
+            old = self._l1_pop(next(iter(self._l1)))
+            self._ns_stats(old[2])["evictions"] += 1
+            self.evictions += 1
+
+    def _l1_clear(self):
+        self._l1.clear()
+        self._l1_bytes = 0
+        for stats in self._ns.values():
+            stats["entries"] = stats["bytes"] = 0
+
+    # ---- L2 ----
+    def _path(self, digest):
+        return os.path.join(self.cache_dir, digest[:2], digest)
+
+    def _l2_get(self, digest):
+        try:
+            with open(self._path(digest), "rb") as f:
+                raw = f.read()
+        except OSError:
+            return None
+        if len(raw) < _HEADER.size:
+            return None
+        (expires,) = _HEADER.unpack_from(raw)
+        if expires and expires <= time.time():
+            return None
+        return expires, raw[_HEADER.size:]
+
+    def _l2_put(self, digest, expires, data):
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(expires))
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+        self._sets += 1
+        if self._sets % PRUNE_EVERY == 0:
+            self.prune()
+        return True
+
+    def _l2_entries(self):
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                yield entry
+
+    def prune(self):
+        """Drop expired L2 entries, then the oldest written ones until L2 fits l2_max_bytes."""
+        if not self.cache_dir:
+            return 0
+        now = time.time()
+        live = []
+        total = removed = 0
+        for entry in self._l2_entries():
+            try:
+                st = entry.stat()
+                if entry.name.endswith(".tmp"):
+                    if st.st_mtime < now - 60:
+                        os.remove(entry.path)
+                    continue
+                with open(entry.path, "rb") as f:
+                    head = f.read(_HEADER.size)
+                expired = len(head) == _HEADER.size and 0 < _HEADER.unpack(head)[0] <= now
+                if expired:
+                    os.remove(entry.path)
+                    removed += 1
+                    continue
+            except OSError:
+                continue
+            live.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+        live.sort()
+        for _, size, path in live:
+            if total <= self.l2_max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+            total -= size
+        return removed
+
+    # ---- invalidation log ----
+    def _publish(self, line):
+        """
+        Append one invalidation record for the other workers. Appends and the start-over of a full
+        log hold the same lock, so no record lands in a log that readers have already left.
+        """
+        record = line.encode("ascii") + b"\n"
+        try:
+            with self._log_lock:
+                with open(self._log_path, "ab") as f:
+                    f.write(record)
+                    size = f.tell()
+                    ino = os.fstat(f.fileno()).st_ino
+                with self._lock:
+                    if ino == self._log_ino and size - len(record) == self._log_offset:
+                        self._log_offset = size  # our own record, already applied locally
+                if size > LOG_MAX_BYTES:
+                    tmp = f"{self._log_path}.{os.getpid()}.tmp"
+                    open(tmp, "wb").close()
+                    os.replace(tmp, self._log_path)
+        except OSError:
+            pass
+
+    def _sync(self):
+        """Apply invalidations published by other workers since the last lookup."""
+        if not self._log_path:
+            return
+        try:
+            st = os.stat(self._log_path)
+        except OSError:
+            return
+        if st.st_ino == self._log_ino and st.st_size == self._log_offset:
+            return
+        with self._lock:
+            try:
+                with open(self._log_path, "rb") as f:
+                    ino = os.fstat(f.fileno()).st_ino
+                    if ino != self._log_ino:
+                        # The log was started over: entries in between may be lost, so start clean.
+                        self._l1_clear()
+                        self._log_ino, self._log_offset = ino, 0
+                    f.seek(self._log_offset)
+                    chunk = f.read()
+            except OSError:
+                return
+            end = chunk.rfind(b"\n") + 1
+            self._log_offset += end
+            for line in chunk[:end].split(b"\n"):
+                if line == b"C":
+                    self._l1_clear()
+                elif line.startswith(b"D "):
+                    self._l1_pop(line[2:].decode("ascii"))
+
+    # ---- cache API ----
+    def _expires(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout > 0 else 0
+
+    def _lookup(self, key):
+        self._sync()
+        digest = _digest(key)
+        ns = _namespace(key)
+        with self._lock:
+            hit = self._l1.get(digest)
+            if hit is not None:
+                if not hit[0] or hit[0] > time.time():
+                    self._l1.move_to_end(digest)
+                    self.hits_l1 += 1
+                    self._ns_stats(ns)["hits"] += 1
+                    return hit[1]
+                self._l1_pop(digest)
+        hit = self._l2_get(digest) if self.cache_dir else None
+        with self._lock:
+            if hit is None:
+                self.misses += 1
+                self._ns_stats(ns)["misses"] += 1
+                return None
+            self._l1_put(digest, hit[0], hit[1], ns)
+            self.hits_l2 += 1
+            self._ns_stats(ns)["hits"] += 1
+        return hit[1]
+
+    def get(self, key):
+        data = self._lookup(key)
+        if data is None:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception:
+            return None
+
+    def has(self, key):
+        return self._lookup(key) is not None
+
+    def set(self, key, value, timeout=None):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires = self._expires(timeout)
+        digest = _digest(key)
+        with self._lock:
+            self._l1_put(digest, expires, data, _namespace(key))
+        if self.cache_dir:
+            return self._l2_put(digest, expires, data)
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def delete(self, key):
+        digest = _digest(key)
+        existed = False
+        if self.cache_dir:
+            try:
+                os.remove(self._path(digest))
+                existed = True
+            except OSError:
+                pass
+            self._publish(f"D {digest}")
+        with self._lock:
+            if self._l1_pop(digest) is not None:
+                existed = True
+        return existed
+
+    def clear(self):
+        if self.cache_dir:
+            for entry in self._l2_entries():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            self._publish("C")
+        with self._lock:
+            self._l1_clear()
+        return True
+
+    def l2_usage(self):
+        """(entries, bytes) in the shared tier; scans CACHE_DIR."""
+        if not self.cache_dir:
+            return 0, 0
+        entries = size = 0
+        for entry in self._l2_entries():
+            try:
+                size += entry.stat().st_size
+                entries += 1
+            except OSError:
+                pass
+        return entries, size
+
+    def stats(self, l2=False):
+        """Counters of this process plus the current L1 footprint (and the L2 one when l2 is set)."""
+        with self._lock:
+            out = {
+                "l1_entries": len(self._l1),
+                "l1_bytes": self._l1_bytes,
+                "l1_max_bytes": self.l1_max_bytes,
+                "l2_dir": self.cache_dir,
+                "l2_max_bytes": self.l2_max_bytes if self.cache_dir else 0,
+                "hits_l1": self.hits_l1,
+                "hits_l2": self.hits_l2,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "namespaces": {ns: dict(stats) for ns, stats in sorted(self._ns.items())},
+            }
+        if l2:
+            out["l2_entries"], out["l2_bytes"] = self.l2_usage()
+        return out
@@ -0,0 +1,84 @@
+"""
+Per-request time accounting by phase, shared by metrics.py (histograms) and the Server-Timing
+header. The request running on a thread has an accumulator dict; phase("auth") blocks and
+record(...) calls add their time to it. Phases are exclusive: time spent in a nested phase (a
+storage call made while shaping a payload) is only counted for the inner one.
+
+Phases: auth, cache, data_store, shape, serialize.
+"""
+import time
+import threading
+from functools import wraps
+
+PHASES = ("auth", "cache", "data_store", "shape", "serialize")
+
+_local = threading.local()
+
+
+def new_accumulator():
+    acc = dict.fromkeys(PHASES, 0.0)
+    acc["start"] = time.perf_counter()
+    acc["_open"] = []  # time of nested phases, per open phase
+    return acc
+
+
+def stack():
+    """Accumulators of the requests running on this thread (nested for internal requests)."""
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def current():
+    """Accumulator of the request running on this thread, or None."""
+    s = getattr(_local, "stack", None)
+    return s[-1] if s else None
+
+
+def record(name, seconds):
+    """Add seconds measured by the caller (a leaf: nothing nested inside) to the current request."""
+    acc = current()
+    if acc is None:
+        return
+    acc[name] += seconds
+    if acc["_open"]:
+        acc["_open"][-1] += seconds
+
+
+class phase:
+    """with phase("shape"): ... adds the block's own time (minus nested phases) to the request."""
+
+    __slots__ = ("name", "acc", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.acc = current()
+        if self.acc is not None:
+            self.acc["_open"].append(0.0)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.acc is None:
+            return False
+        elapsed = time.perf_counter() - self.start
+        nested = self.acc["_open"].pop()
+        self.acc[self.name] += elapsed - nested
+        if self.acc["_open"]:
+            self.acc["_open"][-1] += elapsed
+        return False
+
+
+def timed(name):
+    """Decorator running a function as phase name."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            with phase(name):
+                return f(*args, **kwargs)
+        return decorated
+    return decorator